@@ -6,9 +6,12 @@ from sqlalchemy.exc import NoResultFound
 
 from app.accounts.models import *  # noqa
 from app.auth.routers import router as auth_router
+from app.monitoring.routers import router as monitoring_router
+from app.settings import settings
 from app.shared.exceptions import ServiceValidationError
 from app.tasks.models import *  # noqa
 from app.tasks.routers import router as tasks_router
+from app.tasks.routers import task_async_read_router, task_read_router
 
 
 def create_app():
@@ -17,6 +20,11 @@ def create_app():
     api = APIRouter(prefix="/api")
     api.include_router(auth_router)
     api.include_router(tasks_router)
+    # The task reads go through the async session when it is enabled
+    api.include_router(
+        task_async_read_router if settings.ASYNC_DATABASE_ENABLED else task_read_router
+    )
+    api.include_router(monitoring_router)
     app.include_router(api)
 
     @app.exception_handler(RequestValidationError)
@@ -9,6 +9,7 @@ from app.auth.services.auth_service.service import (
     get_authenticated_user as _get_authenticated_user,
 )
 from app.database import SessionType, get_session
+from app.settings import settings
 
 security = HTTPBearer(auto_error=False)
 
@@ -35,3 +36,13 @@ def unauthenticated_user_required(
 ) -> None:
     if authenticated_user:
         raise HTTPException(status_code=403, detail="Already authenticated")
+
+
+def operator_user_required(
+    authenticated_user: Optional[User] = Depends(get_authenticated_user),
+) -> None:
+    if not authenticated_user:
+        raise HTTPException(status_code=401, detail="Authentication required")
+
+    if authenticated_user.email not in settings.MONITORING_OPERATOR_EMAILS:
+        raise HTTPException(status_code=403, detail="Operator access required")
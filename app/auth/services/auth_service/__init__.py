@@ -0,0 +1 @@
+import app.auth.services.auth_service.listeners  # noqa
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional, Set, Tuple
+
+from redis import Redis
+
+
+def hash_token(token: str) -> str:
+    # The tokens themselves are never stored
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class TokenCache:
+    """Identity of the user authenticated by an access token.
+
+    Entries live for at most ttl_seconds, or less if the token expires
+    sooner, so that an expired token is never accepted from the cache."""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+
+    def get_ttl(self, token_expires_in: Optional[float] = None) -> float:
+        if token_expires_in is None:
+            return self.ttl_seconds
+
+        return max(min(self.ttl_seconds, token_expires_in), 0)
+
+    def get(self, token: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    def set(
+        self, token: str, identity: dict, token_expires_in: Optional[float] = None
+    ) -> None:
+        raise NotImplementedError
+
+    def invalidate_user(self, user_id: int) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class NullTokenCache(TokenCache):
+    def __init__(self):
+        super().__init__(ttl_seconds=0)
+
+    def get(self, token: str) -> Optional[dict]:
+        return None
+
+    def set(
+        self, token: str, identity: dict, token_expires_in: Optional[float] = None
+    ) -> None:
+        pass
+
+    def invalidate_user(self, user_id: int) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+
+class MemoryTokenCache(TokenCache):
+    """In-process LRU cache, bounded in size, with a ttl per entry.
+
+    Only invalidated in the current process, for a single worker"""
+
+    def __init__(self, ttl_seconds: float, maxsize: int):
+        super().__init__(ttl_seconds=ttl_seconds)
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, Tuple[float, dict]] = OrderedDict()
+        self._user_keys: Dict[int, Set[str]] = {}
+        self._lock = Lock()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = hash_token(token)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, identity = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+
+            self._entries.move_to_end(key)
+            return identity
+
+    def set(
+        self, token: str, identity: dict, token_expires_in: Optional[float] = None
+    ) -> None:
+        key = hash_token(token)
+        expires_at = time.monotonic() + self.get_ttl(token_expires_in)
+
+        with self._lock:
+            self._entries[key] = (expires_at, identity)
+            self._entries.move_to_end(key)
+            self._user_keys.setdefault(identity["id"], set()).add(key)
+
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            for key in list(self._user_keys.get(user_id, ())):
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._user_keys.clear()
+
+    def _remove(self, key: str):
+        _, identity = self._entries.pop(key)
+        user_keys = self._user_keys.get(identity["id"])
+        if user_keys is not None:
+            user_keys.discard(key)
+            if not user_keys:
+                del self._user_keys[identity["id"]]
+
+
+class RedisTokenCache(TokenCache):
+    """Cache shared by all the processes, entries expire through redis ttls"""
+
+    def __init__(self, ttl_seconds: float, client: Redis, prefix: str = "auth"):
+        super().__init__(ttl_seconds=ttl_seconds)
+        self.client = client
+        self.prefix = prefix
+
+    def _token_key(self, key: str) -> str:
+        return f"{self.prefix}:token:{key}"
+
+    def _user_key(self, user_id: int) -> str:
+        return f"{self.prefix}:user:{user_id}"
+
+    def get(self, token: str) -> Optional[dict]:
+        value = self.client.get(self._token_key(hash_token(token)))
+        return json.loads(value) if value is not None else None
+
+    def set(
+        self, token: str, identity: dict, token_expires_in: Optional[float] = None
+    ) -> None:
+        ttl_milliseconds = int(self.get_ttl(token_expires_in) * 1000)
+        if ttl_milliseconds <= 0:
+            return
+
+        key = hash_token(token)
+        user_key = self._user_key(identity["id"])
+
+        pipeline = self.client.pipeline()
+        pipeline.set(self._token_key(key), json.dumps(identity), px=ttl_milliseconds)
+        # No token of the user outlives the ttl of the cache
+        pipeline.sadd(user_key, key)
+        pipeline.expire(user_key, int(self.ttl_seconds) + 1)
+        pipeline.execute()
+
+    def invalidate_user(self, user_id: int) -> None:
+        user_key = self._user_key(user_id)
+        keys = self.client.smembers(user_key)
+        self.client.delete(user_key, *[self._token_key(key.decode()) for key in keys])
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(f"{self.prefix}:*"))
+        if keys:
+            self.client.delete(*keys)
@@ -1,5 +1,11 @@
+from functools import lru_cache
+
+from redis import Redis
+
 from app.settings import settings
 
+from ._cache import MemoryTokenCache, NullTokenCache, RedisTokenCache, TokenCache
+
 
 def get_authentication_secret_key() -> str:
     return settings.AUTH_SECRET_KEY
@@ -7,3 +13,20 @@ def get_authentication_secret_key() -> str:
 
 def get_access_token_lifespan_minutes() -> int:
     return settings.ACCESS_TOKEN_LIFESPAN_MINUTES
+
+
+@lru_cache
+def get_token_cache() -> TokenCache:
+    if settings.AUTH_TOKEN_CACHE_BACKEND == "redis":
+        return RedisTokenCache(
+            ttl_seconds=settings.AUTH_TOKEN_CACHE_TTL_SECONDS,
+            client=Redis.from_url(settings.AUTH_TOKEN_CACHE_REDIS_URL),
+        )
+
+    if settings.AUTH_TOKEN_CACHE_BACKEND == "memory":
+        return MemoryTokenCache(
+            ttl_seconds=settings.AUTH_TOKEN_CACHE_TTL_SECONDS,
+            maxsize=settings.AUTH_TOKEN_CACHE_MAXSIZE,
+        )
+
+    return NullTokenCache()
@@ -1,3 +1,4 @@
+import time
 from datetime import datetime, timedelta
 from typing import Optional, Tuple
 
@@ -9,13 +10,20 @@ from app.accounts.services.user_service.service import (
     get_user_from_credentials,
 )
 from app.auth.schemas.login_schema import LoginSchema
+from app.auth.services.auth_service._cache import TokenCache
 from app.auth.services.auth_service._dependencies import (
     get_access_token_lifespan_minutes,
     get_authentication_secret_key,
+    get_token_cache,
 )
 from app.database import SessionType
 
-from ._utils import create_access_token, decode_access_token
+from ._utils import (
+    attach_cached_user,
+    create_access_token,
+    decode_access_token,
+    get_cached_identity,
+)
 
 
 @inject
@@ -48,10 +56,21 @@ def _get_authenticated_user(
     access_token: str,
     # Injected
     secret_key: str = Depends(get_authentication_secret_key),
+    token_cache: TokenCache = Depends(get_token_cache),
 ) -> Optional[User]:
+    identity = token_cache.get(access_token)
+    if identity:
+        return attach_cached_user(session=session, identity=identity)
+
     payload = decode_access_token(
         token=access_token, secret_key=secret_key, raise_exc=False
     )
 
     if payload:
-        return get_user(session=session, user_id=payload["sub"])
+        user = get_user(session=session, user_id=payload["sub"])
+        token_cache.set(
+            access_token,
+            get_cached_identity(user),
+            token_expires_in=payload["exp"] - time.time(),
+        )
+        return user
@@ -2,6 +2,10 @@ from datetime import datetime
 from typing import Optional
 
 import jwt
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.accounts.models.user import User
+from app.database import SessionType
 
 
 def create_access_token(
@@ -25,3 +29,15 @@ def decode_access_token(
     except (jwt.ExpiredSignatureError, jwt.InvalidTokenError):
         if raise_exc:
             raise
+
+
+def get_cached_identity(user: User) -> dict:
+    return {"id": user.id, "email": user.email}
+
+
+def attach_cached_user(session: SessionType, identity: dict) -> User:
+    """Attach the cached user to the session without loading it, any
+    attribute missing from the cache is lazy loaded on access"""
+    user = User(**identity)
+    make_transient_to_detached(user)
+    return session.merge(user, load=False)
@@ -0,0 +1,28 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.accounts.models.user import User
+from app.auth.services.auth_service._dependencies import get_token_cache
+
+# The users changed by the transaction of a session, in its info
+_CHANGED_USER_IDS = "changed_user_ids"
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def collect_changed_user(mapper, connection, user: User):
+    # Invalidated once committed, as a request reading the user before the
+    # commit would cache its previous row again
+    object_session(user).info.setdefault(_CHANGED_USER_IDS, set()).add(user.id)
+
+
+@event.listens_for(Session, "after_commit")
+def invalidate_cached_users(session: Session):
+    for user_id in session.info.pop(_CHANGED_USER_IDS, ()):
+        get_token_cache().invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def forget_changed_users(session: Session, previous_transaction):
+    if not session.in_transaction():
+        session.info.pop(_CHANGED_USER_IDS, None)
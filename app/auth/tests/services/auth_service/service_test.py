@@ -1,9 +1,13 @@
 from datetime import datetime
+from unittest.mock import patch
 
 import pytest
 
 from app.accounts.tests.factories import TEST_PASSWORD, UserFactory
 from app.auth.schemas.login_schema import LoginSchema
+from app.auth.services.auth_service import _service
+from app.auth.services.auth_service._cache import MemoryTokenCache
+from app.auth.services.auth_service._dependencies import get_token_cache
 from app.auth.services.auth_service.service import get_authenticated_user, login_user
 from app.shared.exceptions import ServiceValidationError
 
@@ -47,6 +51,101 @@ def test_get_authenticated_user_ok(session):
     assert authenticated_user == user
 
 
+def test_get_authenticated_user_ok__cached(session):
+    user = UserFactory()
+
+    access_token, _ = login_user(
+        session=session,
+        user_credentials=LoginSchema(email=user.email, password=TEST_PASSWORD),
+    )
+
+    get_authenticated_user(session=session, access_token=access_token)
+
+    with patch.object(_service, "get_user") as m_get_user:
+        authenticated_user = get_authenticated_user(
+            session=session, access_token=access_token
+        )
+
+    m_get_user.assert_not_called()
+    assert authenticated_user == user
+
+
+def test_get_authenticated_user_ok__invalidated_on_user_update(session):
+    user = UserFactory()
+
+    access_token, _ = login_user(
+        session=session,
+        user_credentials=LoginSchema(email=user.email, password=TEST_PASSWORD),
+    )
+
+    get_authenticated_user(session=session, access_token=access_token)
+    assert get_token_cache().get(access_token) is not None
+
+    user.email = "updated@email.com"
+    session.flush()
+
+    # Kept until committed, the previous row being the one read meanwhile
+    assert get_token_cache().get(access_token) is not None
+
+    session.commit()
+
+    assert get_token_cache().get(access_token) is None
+
+
+def test_get_authenticated_user_ok__invalidated_on_user_delete(session):
+    user = UserFactory()
+
+    access_token, _ = login_user(
+        session=session,
+        user_credentials=LoginSchema(email=user.email, password=TEST_PASSWORD),
+    )
+
+    get_authenticated_user(session=session, access_token=access_token)
+
+    session.delete(user)
+    session.commit()
+
+    assert get_token_cache().get(access_token) is None
+
+
+def test_get_authenticated_user_ok__kept_on_rolled_back_user_update(session):
+    user = UserFactory()
+
+    access_token, _ = login_user(
+        session=session,
+        user_credentials=LoginSchema(email=user.email, password=TEST_PASSWORD),
+    )
+
+    get_authenticated_user(session=session, access_token=access_token)
+
+    user.email = "updated@email.com"
+    session.flush()
+    session.rollback()
+    session.commit()
+
+    assert get_token_cache().get(access_token) is not None
+
+
+def test_memory_token_cache_evicts_least_recently_used():
+    cache = MemoryTokenCache(ttl_seconds=60, maxsize=2)
+    cache.set("token-1", {"id": 1, "email": "one@email.com"})
+    cache.set("token-2", {"id": 2, "email": "two@email.com"})
+
+    cache.get("token-1")
+    cache.set("token-3", {"id": 3, "email": "three@email.com"})
+
+    assert cache.get("token-1") == {"id": 1, "email": "one@email.com"}
+    assert cache.get("token-2") is None
+    assert cache.get("token-3") == {"id": 3, "email": "three@email.com"}
+
+
+def test_memory_token_cache_expires_with_token():
+    cache = MemoryTokenCache(ttl_seconds=60, maxsize=2)
+    cache.set("token-1", {"id": 1, "email": "one@email.com"}, token_expires_in=-1)
+
+    assert cache.get("token-1") is None
+
+
 @pytest.mark.skip("Not written")
 def test_get_authenticated_user_failure_invalid_access_token():
     ...
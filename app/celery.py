@@ -14,6 +14,14 @@ celery = Celery(__name__, broker=settings.CELERY_BROKER_URL)
 celery.conf.beat_schedule = {
     "trigger_mark_ongoing_date_tasks_as_completed__every_midnight": {
         "task": "app.tasks.services.task_service.tasks.trigger_mark_ongoing_date_tasks_as_completed",
-        "schedule": crontab(),
+        "schedule": crontab(minute=0, hour=0),
+    },
+    "trigger_recompute_ongoing_tasks_state__every_night": {
+        "task": "app.tasks.services.task_service.tasks.trigger_recompute_ongoing_tasks_state",
+        "schedule": crontab(minute=30, hour=0),
+    },
+    "trigger_create_task_event_partitions__every_night": {
+        "task": "app.tasks.services.task_event_service.tasks.trigger_create_task_event_partitions",
+        "schedule": crontab(minute=0, hour=1),
     },
 }
@@ -1,10 +1,19 @@
+import gzip
 import json
 import logging
+import sys
+from contextlib import nullcontext
+from typing import List, Optional
 
 import typer
 
 from app.accounts.cli import app as accounts_cli
-from app.database import Base, engine
+from app.accounts.services.user_service.service import get_user
+from app.database import Base, engine, using_get_session
+from app.tasks.schemas.export_schema import ExportFormat, ExportRecordType
+from app.tasks.services.export_service import service as export_service
+from app.tasks.services.task_event_service import service as task_event_service
+from app.tasks.services.task_metric_service import service as task_metric_service
 
 logger = logging.getLogger(__name__)
 
@@ -36,5 +45,62 @@ def init_db():
     logger.info("Database tables created")
 
 
+@app.command("repair-task-event-counters")
+def repair_task_event_counters(batch_size: int = typer.Option(1000)):
+    """Recompute the denormalised event columns of every task from its events"""
+    with using_get_session() as session:
+        repaired = task_event_service.repair_task_event_counters(
+            session=session, batch_size=batch_size
+        )
+
+    logger.info(f"Event counters repaired for {repaired} tasks")
+
+
+@app.command("rebuild-task-metric-rollups")
+def rebuild_task_metric_rollups(batch_size: int = typer.Option(1000)):
+    """Recompute the daily and weekly rollups of every metric from its values"""
+    with using_get_session() as session:
+        rebuilt = task_metric_service.rebuild_task_metric_rollups(
+            session=session, batch_size=batch_size
+        )
+
+    logger.info(f"Rollups rebuilt for {rebuilt} task metrics")
+
+
+@app.command("export-user-history")
+def export_user_history(
+    user_id: int,
+    output_path: Optional[str] = typer.Option(None, help="Defaults to stdout"),
+    export_format: ExportFormat = typer.Option(ExportFormat.ndjson, "--format"),
+    record_types: List[ExportRecordType] = typer.Option(
+        list(ExportRecordType), "--record-type"
+    ),
+    compress: bool = typer.Option(False, "--gzip"),
+    batch_size: int = typer.Option(1000),
+):
+    """Stream the tasks, metrics, events and event metrics of the user"""
+    with using_get_session() as session:
+        chunks = export_service.export_user_history(
+            session=session,
+            authenticated_user=get_user(session=session, user_id=user_id),
+            export_format=export_format,
+            record_types=record_types,
+            batch_size=batch_size,
+        )
+
+        output = open(output_path, "wb") if output_path else sys.stdout.buffer
+        try:
+            with (
+                gzip.GzipFile(fileobj=output, mode="wb")
+                if compress
+                else nullcontext(output)
+            ) as writer:
+                for chunk in chunks:
+                    writer.write(chunk)
+        finally:
+            if output_path:
+                output.close()
+
+
 if __name__ == "__main__":
     app()
@@ -1,22 +1,76 @@
+import time
 from contextlib import contextmanager
-from typing import Generator
+from typing import AsyncGenerator, Generator, Optional
 
 from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession as AsyncSessionType
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 from sqlalchemy.orm import Session as SessionType
 from sqlalchemy.orm.scoping import scoped_session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 
 from app.settings import settings
+from app.shared.metrics import PoolMetrics, get_pool_metrics
 
 
 class Base(DeclarativeBase):
     pass
 
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI)
+class _TimedPoolMixin:
+    """Record how long each checkout waited for a connection"""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_checkout(time.perf_counter() - start, timed_out=True)
+            raise
+
+        self.metrics.record_checkout(time.perf_counter() - start)
+        return connection
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    metrics = get_pool_metrics("sync")
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    metrics = get_pool_metrics("async")
+
+
+engine = create_engine(
+    settings.SQLALCHEMY_DATABASE_URI,
+    poolclass=NullPool if settings.DB_POOL_DISABLED else TimedQueuePool,
+    **settings.SQLALCHEMY_ENGINE_OPTIONS,
+)
 session_factory = sessionmaker(engine, autocommit=False, autoflush=False)
 Session: SessionType = scoped_session(session_factory)
 
+# Only created when the async stack is enabled, none of its pool being opened
+# otherwise
+async_engine: Optional[AsyncEngine] = None
+async_session_factory: Optional[async_sessionmaker] = None
+
+if settings.ASYNC_DATABASE_ENABLED:
+    async_engine = create_async_engine(
+        settings.ASYNC_SQLALCHEMY_DATABASE_URI,
+        poolclass=NullPool if settings.DB_POOL_DISABLED else TimedAsyncAdaptedQueuePool,
+        **settings.SQLALCHEMY_ENGINE_OPTIONS,
+    )
+    async_session_factory = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
+
 
 def get_session() -> Generator[SessionType, None, None]:
     session = Session()
@@ -24,9 +78,22 @@ def get_session() -> Generator[SessionType, None, None]:
     session.close()
 
 
+async def get_async_session() -> AsyncGenerator[AsyncSessionType, None]:
+    async with async_session_factory() as session:
+        yield session
+
+
 @contextmanager
 def using_get_session():
     return get_session()
 
 
-__all__ = ["get_session", "Base", "Session", "SessionType", "using_get_session"]
+__all__ = [
+    "get_session",
+    "get_async_session",
+    "AsyncSessionType",
+    "Base",
+    "Session",
+    "SessionType",
+    "using_get_session",
+]
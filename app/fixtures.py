@@ -1,11 +1,16 @@
 from contextlib import contextmanager
 
 import pytest
+from anyio.from_thread import start_blocking_portal
 from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 
 from app.application import create_app
 from app.auth.routers.dependencies import get_authenticated_user
-from app.database import Session, engine, get_session
+from app.auth.services.auth_service._dependencies import get_token_cache
+from app.database import AsyncSessionType, Session, engine, get_session
+from app.settings import settings
 
 
 @pytest.fixture(scope="function")
@@ -23,6 +28,53 @@ def session():
     engine.dispose()
 
 
+@pytest.fixture(scope="function")
+def portal():
+    # An event loop running for the whole test, the async connections being
+    # bound to the loop they were opened in
+    with start_blocking_portal() as portal:
+        yield portal
+
+
+@pytest.fixture(scope="function")
+def async_session(portal):
+    async_engine = create_async_engine(
+        settings.ASYNC_SQLALCHEMY_DATABASE_URI, poolclass=NullPool
+    )
+    connection = portal.call(async_engine.connect)
+    transaction = portal.call(connection.begin)
+
+    yield AsyncSessionType(bind=connection, autoflush=False, expire_on_commit=False)
+
+    portal.call(transaction.rollback)
+    portal.call(connection.close)
+    portal.call(async_engine.dispose)
+
+
+@pytest.fixture(scope="function")
+def async_add(portal, async_session):
+    """Persist the built instances through the async session, in a transaction
+    separate from the sync session. They are detached afterwards so that the
+    queries under test load them like in a request."""
+
+    def _async_add(*instances):
+        async def _add():
+            async_session.add_all(instances)
+            await async_session.flush()
+            async_session.expunge_all()
+
+        portal.call(_add)
+        return instances
+
+    return _async_add
+
+
+@pytest.fixture(scope="function", autouse=True)
+def clear_token_cache():
+    yield
+    get_token_cache().clear()
+
+
 @pytest.fixture(scope="function")
 def app():
     return create_app()
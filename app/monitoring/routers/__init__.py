@@ -0,0 +1,7 @@
+from fastapi.routing import APIRouter
+
+from .monitoring_router import router as monitoring_router
+
+router = APIRouter()
+
+router.include_router(monitoring_router)
@@ -0,0 +1,65 @@
+from typing import List
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.pool import QueuePool
+
+from app.auth.routers.dependencies import operator_user_required
+from app.database import async_engine, engine
+from app.monitoring.schemas.memoization_schema import MemoizationSchema
+from app.monitoring.schemas.pool_schema import DatabasePoolSchema
+from app.shared.metrics import get_pool_metrics, memoization_metrics
+
+# The internals of the process are only exposed to the operators
+router = APIRouter(tags=["Monitoring"], dependencies=[Depends(operator_user_required)])
+
+
+@router.get(
+    "/monitoring/database-pools",
+    status_code=200,
+    response_model=List[DatabasePoolSchema],
+    description="Get the state and checkout wait times of the database pools",
+)
+def get_database_pools() -> List[DatabasePoolSchema]:
+    database_pools = []
+
+    engines = {"sync": engine}
+    if async_engine is not None:
+        engines["async"] = async_engine
+
+    for name, database_engine in engines.items():
+        pool = database_engine.pool
+        metrics = get_pool_metrics(name)
+        pool_status = (
+            dict(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                overflow=pool.overflow(),
+            )
+            if isinstance(pool, QueuePool)
+            else {}
+        )
+        database_pools.append(
+            DatabasePoolSchema(
+                name=name,
+                checkouts=metrics.checkouts,
+                timeouts=metrics.timeouts,
+                mean_wait_seconds=metrics.mean_wait_seconds,
+                max_wait_seconds=metrics.max_wait_seconds,
+                **pool_status,
+            )
+        )
+
+    return database_pools
+
+
+@router.get(
+    "/monitoring/memoization",
+    status_code=200,
+    response_model=MemoizationSchema,
+    description="Get the number of service lookups answered from the session memo",
+)
+def get_memoization() -> MemoizationSchema:
+    return MemoizationSchema(
+        hits=memoization_metrics.hits,
+        misses=memoization_metrics.misses,
+    )
@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+class MemoizationSchema(BaseModel):
+    # Each hit is a query avoided
+    hits: int
+    misses: int
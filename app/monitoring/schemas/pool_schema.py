@@ -0,0 +1,16 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class DatabasePoolSchema(BaseModel):
+    name: str
+    # Not available when pooling is disabled
+    size: Optional[int] = None
+    checked_out: Optional[int] = None
+    overflow: Optional[int] = None
+
+    checkouts: int
+    timeouts: int
+    mean_wait_seconds: float
+    max_wait_seconds: float
@@ -0,0 +1,51 @@
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.accounts.tests.factories import UserFactory
+from app.settings import settings
+from app.shared.metrics import PoolMetrics, pool_metrics
+
+
+def test_get_database_pools_ok(client: TestClient, using_user):
+    user = UserFactory()
+    metrics = PoolMetrics()
+    metrics.record_checkout(0.5)
+    metrics.record_checkout(1.5, timed_out=True)
+
+    with using_user(user), patch.dict(pool_metrics, {"sync": metrics}), patch.object(
+        settings, "MONITORING_OPERATOR_EMAILS", [user.email]
+    ):
+        response = client.get("/api/monitoring/database-pools")
+
+    assert response.status_code == 200
+    json = response.json()
+    # Without the async database, only the pool of the sync engine
+    assert [pool["name"] for pool in json] == ["sync"]
+    assert json[0]["checkouts"] == 1
+    assert json[0]["timeouts"] == 1
+    assert json[0]["mean_wait_seconds"] == 1.0
+    assert json[0]["max_wait_seconds"] == 1.5
+    assert json[0]["size"] is not None
+
+
+def test_get_database_pools_failure_unauthenticated(client: TestClient):
+    response = client.get("/api/monitoring/database-pools")
+
+    assert response.status_code == 401
+
+
+def test_get_database_pools_failure_not_operator(client: TestClient, using_user):
+    with using_user(UserFactory()), patch.object(
+        settings, "MONITORING_OPERATOR_EMAILS", ["operator@example.com"]
+    ):
+        response = client.get("/api/monitoring/database-pools")
+
+    assert response.status_code == 403
+
+
+def test_get_memoization_failure_not_operator(client: TestClient, using_user):
+    with using_user(UserFactory()):
+        response = client.get("/api/monitoring/memoization")
+
+    assert response.status_code == 403
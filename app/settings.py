@@ -1,4 +1,4 @@
-from typing import ClassVar, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import ValidationInfo, field_validator
 from pydantic_settings import BaseSettings
@@ -10,7 +10,19 @@ class Settings(BaseSettings):
     # DB config
     POSTGRES_DB_URI: str
     SQLALCHEMY_DATABASE_URI: Optional[str] = None
-    SQLALCHEMY_ENGINE_OPTIONS: ClassVar = {"pool_size": 100}
+
+    # DB connection pool
+    DB_POOL_SIZE: int = 100
+    DB_POOL_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30
+    DB_POOL_RECYCLE_SECONDS: int = 30 * 60
+    DB_POOL_PRE_PING: bool = True
+    # Open a connection per checkout, for when a PgBouncer does the pooling
+    DB_POOL_DISABLED: bool = False
+
+    # Async DB config, used by the read routes when enabled
+    ASYNC_DATABASE_ENABLED: bool = False
+    ASYNC_SQLALCHEMY_DATABASE_URI: Optional[str] = None
 
     # Redis
     CELERY_BROKER_URL: str
@@ -19,6 +31,33 @@ class Settings(BaseSettings):
     # Application
     AUTH_SECRET_KEY: str = "CHANGEME"
     ACCESS_TOKEN_LIFESPAN_MINUTES: int = 60 * 24 * 30  # Around a month, dummy value
+    # The users allowed to read the monitoring endpoints, none by default
+    MONITORING_OPERATOR_EMAILS: List[str] = []
+
+    # Cache of the users authenticated by access tokens. The memory backend is
+    # only invalidated in the process changing the user, so it is only safe
+    # with a single worker, a changed or deleted user still being accepted by
+    # the others for up to the ttl. Use redis with several workers
+    AUTH_TOKEN_CACHE_BACKEND: Literal["memory", "redis", "none"] = "memory"
+    AUTH_TOKEN_CACHE_TTL_SECONDS: int = 5 * 60
+    AUTH_TOKEN_CACHE_MAXSIZE: int = 10_000
+    # Defaults to the celery broker
+    AUTH_TOKEN_CACHE_REDIS_URL: Optional[str] = None
+
+    # Recompute of the task states following their changes, either within the
+    # request, in a background thread of the process, or on the celery workers
+    TASK_STATE_RECOMPUTE_MODE: Literal["sync", "thread", "celery"] = "sync"
+    # The changes of a task within the window are coalesced in a single recompute
+    TASK_STATE_RECOMPUTE_WINDOW_SECONDS: float = 2
+    TASK_STATE_RECOMPUTE_BATCH_SIZE: int = 500
+    # Defaults to the celery broker
+    TASK_STATE_RECOMPUTE_REDIS_URL: Optional[str] = None
+
+    # Tasks completed per transaction by the midnight sweep
+    TASK_COMPLETION_SWEEP_BATCH_SIZE: int = 500
+
+    # Monthly partitions of the events created ahead of the current month
+    TASK_EVENT_PARTITIONS_MONTHS_AHEAD: int = 3
 
     @field_validator("SQLALCHEMY_DATABASE_URI", mode="before")
     @classmethod
@@ -30,6 +69,39 @@ class Settings(BaseSettings):
         parallel_worker = info.data.get("PYTEST_XDIST_WORKER", "")
         return base_uri + parallel_worker[-1] if parallel_worker else base_uri
 
+    @field_validator("ASYNC_SQLALCHEMY_DATABASE_URI", mode="before")
+    @classmethod
+    def set_async_uri(cls, value, info: ValidationInfo):
+        if value:
+            return value
+
+        # Same database as the sync engine, through the asyncpg driver
+        _, _, location = info.data["SQLALCHEMY_DATABASE_URI"].partition("://")
+        return f"postgresql+asyncpg://{location}"
+
+    @field_validator("AUTH_TOKEN_CACHE_REDIS_URL", mode="before")
+    @classmethod
+    def set_auth_token_cache_redis_url(cls, value, info: ValidationInfo):
+        return value or info.data["CELERY_BROKER_URL"]
+
+    @field_validator("TASK_STATE_RECOMPUTE_REDIS_URL", mode="before")
+    @classmethod
+    def set_task_state_recompute_redis_url(cls, value, info: ValidationInfo):
+        return value or info.data["CELERY_BROKER_URL"]
+
+    @property
+    def SQLALCHEMY_ENGINE_OPTIONS(self) -> Dict[str, Any]:
+        if self.DB_POOL_DISABLED:
+            return {"pool_pre_ping": self.DB_POOL_PRE_PING}
+
+        return {
+            "pool_size": self.DB_POOL_SIZE,
+            "max_overflow": self.DB_POOL_MAX_OVERFLOW,
+            "pool_timeout": self.DB_POOL_TIMEOUT_SECONDS,
+            "pool_recycle": self.DB_POOL_RECYCLE_SECONDS,
+            "pool_pre_ping": self.DB_POOL_PRE_PING,
+        }
+
 
 settings = Settings()
 
@@ -1,17 +1,35 @@
 from __future__ import annotations
 
-from collections.abc import Iterable
+import base64
+import binascii
+import enum
+import json
+from collections.abc import Iterable, Iterator, Sequence
 from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
 from math import ceil
-from typing import Any, Dict, Generic, List, Optional, TypeVar
+from typing import Any, Dict, Generic, List, Optional, Tuple, TypeVar
 
 from fastapi import Query
 from pydantic import BaseModel
-from sqlalchemy import select
-from sqlalchemy.orm import lazyload
+from sqlalchemy import (
+    and_,
+    column,
+    false,
+    func,
+    literal,
+    or_,
+    select,
+    table,
+    text,
+    update,
+)
 from sqlalchemy.orm.exc import MultipleResultsFound, NoResultFound
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import UnaryExpression
 
-from app.database import Base, SessionType
+from app.database import AsyncSessionType, Base, SessionType
+from app.shared.exceptions import ServiceValidationError
 
 T_Model = TypeVar("T_Model", bound=Base)
 
@@ -21,16 +39,30 @@ class PaginationFilters(BaseModel):
     per_page: int = Query(default=50)
 
 
+class CountMode(str, enum.Enum):
+    # A separate count query
+    exact = "exact"
+    # count(*) over () in the page query itself
+    window = "window"
+    # The planner row estimate, or an exact count below the estimate threshold
+    estimate = "estimate"
+    # No total, an extra row is fetched to know whether there is a next page
+    none = "none"
+
+
 @dataclass
 class Pagination(Generic[T_Model]):
     page: int
     per_page: int
-    total: int
+    total: Optional[int]
     items: list[T_Model]
+    total_is_estimate: bool = False
+    # Only needed when there is no total
+    has_more: Optional[bool] = None
 
     first: int = field(init=False)
     last: int = field(init=False)
-    pages: int = field(init=False)
+    pages: Optional[int] = field(init=False)
 
     has_prev: bool = field(init=False)
     has_next: bool = field(init=False)
@@ -41,13 +73,131 @@ class Pagination(Generic[T_Model]):
         """Workaround for the FastAPI response serialisation because PyDantic ignores the properties"""
         self.first = (self.page - 1) * self.per_page + 1
         self.last = max(self.first, self.first + len(self.items) - 1)
-        self.pages = 0 if self.total == 0 else ceil(self.total / self.per_page)
         self.has_prev = self.page > 1
-        self.has_next = self.page < self.pages
+
+        if self.total is None:
+            self.pages = None
+            self.has_next = bool(self.has_more)
+        else:
+            self.pages = 0 if self.total == 0 else ceil(self.total / self.per_page)
+            self.has_next = self.page < self.pages
+
         self.prev_num = self.page - 1 if self.has_prev else None
         self.next_num = self.page + 1 if self.has_next else None
 
 
+class CursorPaginationFilters(BaseModel):
+    cursor: Optional[str] = Query(default=None)
+    per_page: int = Query(default=50)
+    with_total: bool = Query(default=False)
+
+
+@dataclass
+class CursorPagination(Generic[T_Model]):
+    per_page: int
+    items: list[T_Model]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+    has_prev: bool = field(init=False)
+    has_next: bool = field(init=False)
+
+    def __post_init__(self):
+        """Workaround for the FastAPI response serialisation because PyDantic ignores the properties"""
+        self.has_prev = self.prev_cursor is not None
+        self.has_next = self.next_cursor is not None
+
+
+@dataclass
+class SortKey:
+    column: Any
+    descending: bool
+    nulls_at_end: bool
+
+    @classmethod
+    def from_order_expression(cls, expression) -> SortKey:
+        nulls_at_end = None
+        if isinstance(expression, UnaryExpression) and expression.modifier in (
+            operators.nulls_first_op,
+            operators.nulls_last_op,
+        ):
+            nulls_at_end = expression.modifier is operators.nulls_last_op
+            expression = expression.element
+
+        descending = False
+        if isinstance(expression, UnaryExpression) and expression.modifier in (
+            operators.asc_op,
+            operators.desc_op,
+        ):
+            descending = expression.modifier is operators.desc_op
+            expression = expression.element
+
+        # Postgres sorts nulls as larger than any value by default
+        if nulls_at_end is None:
+            nulls_at_end = not descending
+
+        return cls(column=expression, descending=descending, nulls_at_end=nulls_at_end)
+
+    def order_expression(self, reverse: bool = False):
+        descending = self.descending != reverse
+        nulls_at_end = self.nulls_at_end != reverse
+        expression = self.column.desc() if descending else self.column.asc()
+        return expression.nulls_last() if nulls_at_end else expression.nulls_first()
+
+    def equals(self, value):
+        return self.column.is_(None) if value is None else self.column == value
+
+    def follows(self, value, reverse: bool = False):
+        """Expression matching the rows sorted strictly after the value,
+        or strictly before it when reversed"""
+        nulls_at_end = self.nulls_at_end != reverse
+
+        if value is None:
+            return false() if nulls_at_end else self.column.is_not(None)
+
+        comparison = (
+            self.column < value if self.descending != reverse else self.column > value
+        )
+        if nulls_at_end and getattr(self.column, "nullable", True):
+            return or_(comparison, self.column.is_(None))
+        return comparison
+
+
+def _encode_cursor_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    if isinstance(value, enum.Enum):
+        # Enum columns accept the member names
+        return value.name
+    return value
+
+
+def _decode_cursor_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+    return value
+
+
+def encode_cursor(values: Tuple[Any, ...], backwards: bool = False) -> str:
+    payload = {"v": [_encode_cursor_value(value) for value in values], "b": backwards}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[Tuple[Any, ...], bool]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        values = tuple(_decode_cursor_value(value) for value in payload["v"])
+        return values, bool(payload["b"])
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise ServiceValidationError("Invalid pagination cursor")
+
+
 def human_name(class_name: str) -> str:
     return "".join([c if c.islower() else f" {c}" for c in class_name]).strip()
 
@@ -57,6 +207,12 @@ class BaseDao(Generic[T_Model]):
         model: T_Model = NotImplemented
         order_options: Optional[Dict[Any, Any]]
         default_order_by: Optional[List[Any]]
+        # The many-to-one relationships leading from the model to the model
+        # owning it through its user_id, empty if the model has a user_id
+        owner_path: List[Any]
+        # The column the table is range partitioned by, a partition per month,
+        # the rows outside of them falling in the <table>_default partition
+        partition_column: Optional[Any]
 
     def __init__(self, session: SessionType | None = None):
         self.session = session
@@ -73,9 +229,86 @@ class BaseDao(Generic[T_Model]):
     def query(self, *args, **kwargs):
         return select(self.Meta.model)
 
+    def join_criteria(self, *relationships) -> List[Any]:
+        """Equalities joining the models along the many-to-one relationships.
+
+        Unlike EXISTS subqueries, they are resolved by a single index probe
+        per table, and are kept in the UPDATE statements built from the
+        query, the joined tables becoming part of its FROM clause."""
+        criteria = []
+        for relationship in relationships:
+            for local, remote in relationship.property.local_remote_pairs:
+                criteria.append(local == remote)
+
+        return criteria
+
+    def owned_by(self, user_id: int):
+        """Criteria restricting the model to the rows owned by the user"""
+        owner_path = getattr(self.Meta, "owner_path", [])
+        owner = owner_path[-1].property.mapper.class_ if owner_path else self.Meta.model
+        return and_(*self.join_criteria(*owner_path), owner.user_id == user_id)
+
+    def create_month_partition(self, month: date) -> bool:
+        """Create the partition of the table holding the rows of the month,
+        unless it exists.
+
+        It is skipped while the default partition holds rows of the month,
+        as they would have to be moved along with the rows referencing them,
+        those rows staying in the default partition."""
+        table_name = self.Meta.model.__tablename__
+        partition_column = self.Meta.partition_column
+
+        start = month.replace(day=1)
+        end = (start + timedelta(days=31)).replace(day=1)
+        partition_name = f"{table_name}_{start:%Y_%m}"
+
+        if self.session.scalar(select(func.to_regclass(partition_name))):
+            return False
+
+        default_column = column(partition_column.key)
+        if self.session.scalar(
+            select(literal(True))
+            .select_from(table(f"{table_name}_default", default_column))
+            .where(default_column >= start, default_column < end)
+            .limit(1)
+        ):
+            return False
+
+        # The bounds are dates, safe to inline in the DDL
+        self.session.execute(
+            text(
+                f'CREATE TABLE "{partition_name}" PARTITION OF "{table_name}" '
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            )
+        )
+        return True
+
+    def update_statement(self, *args, **kwargs):
+        """An UPDATE of the model restricted to the rows matched by the query"""
+        statement = update(self.Meta.model)
+        whereclause = self.query(*args, **kwargs).whereclause
+
+        if whereclause is not None:
+            statement = statement.where(whereclause)
+
+        return statement
+
+    def perform_update(self, values: Dict[str, Any], *args, **kwargs) -> int:
+        """Update the single row matched by the query in one round-trip,
+        returning its id. Raise NoResultFound if no row matched."""
+        row_id = self.session.scalars(
+            self.update_statement(*args, **kwargs)
+            .values(**values)
+            .returning(self.Meta.model.id)
+        ).one_or_none()
+
+        if row_id is None:
+            raise NoResultFound(f"{human_name(self.Meta.model.__name__)} not found")
+
+        return row_id
+
     def bulk_update(self, where: dict, fields: dict):
-        query = self.query(**where)
-        query.update(fields)
+        self.session.execute(self.update_statement(**where).values(**fields))
         self.session.flush()
 
     def list_query(self, *args, **kwargs):
@@ -85,7 +318,7 @@ class BaseDao(Generic[T_Model]):
         query = self.list_query(*args, **kwargs)
         return self.apply_ordering(query, order_by=order_by)
 
-    def apply_ordering(self, query, order_by: Optional[List[Any]] = None):
+    def get_order_expressions(self, order_by: Optional[List[Any]] = None) -> List[Any]:
         if order_by and hasattr(self.Meta, "order_options"):
             order_expressions = []
             for _order_by in order_by:
@@ -100,7 +333,29 @@ class BaseDao(Generic[T_Model]):
         else:
             order_expressions = [self.Meta.model.id.asc()]
 
-        return query.order_by(*order_expressions)
+        return list(order_expressions)
+
+    def apply_ordering(self, query, order_by: Optional[List[Any]] = None):
+        return query.order_by(*self.get_order_expressions(order_by=order_by))
+
+    def get_sort_keys(self, order_by: Optional[List[Any]] = None) -> List[SortKey]:
+        sort_keys = [
+            SortKey.from_order_expression(expression)
+            for expression in self.get_order_expressions(order_by=order_by)
+        ]
+
+        # The primary key is used as a tie breaker so that each cursor is unique
+        primary_key = self.Meta.model.id.expression
+        if not any(sort_key.column.compare(primary_key) for sort_key in sort_keys):
+            sort_keys.append(
+                SortKey(
+                    column=primary_key,
+                    descending=sort_keys[-1].descending if sort_keys else False,
+                    nulls_at_end=not sort_keys[-1].descending if sort_keys else True,
+                )
+            )
+
+        return sort_keys
 
     def list(self, *args, **kwargs) -> list[T_Model]:
         return (
@@ -122,18 +377,334 @@ class BaseDao(Generic[T_Model]):
     def get(self, *args, raise_exc: bool = True, **kwargs) -> Optional[T_Model]:
         return self.perform_get(self.get_query(*args, **kwargs), raise_exc=raise_exc)
 
-    def paginate(self, *args, pagination: PaginationFilters, **kwargs) -> Pagination:
+    def iter_id_batches(
+        self, *args, batch_size: int = 1000, **kwargs
+    ) -> Iterator[List[int]]:
+        """Yield the ids matching the query in ascending batches, each batch
+        being a keyset query continuing from the last id of the previous one"""
+        model = self.Meta.model
+        query = (
+            self.query(*args, **kwargs).with_only_columns(model.id).order_by(model.id)
+        )
+
+        last_id = None
+        while True:
+            batch_query = query if last_id is None else query.where(model.id > last_id)
+            ids = list(self.session.scalars(batch_query.limit(batch_size)).all())
+
+            if not ids:
+                return
+
+            yield ids
+            last_id = ids[-1]
+
+    def stream(self, *args, batch_size: int = 1000, **kwargs) -> Iterator[T_Model]:
+        """Yield the instances matching the query in ascending id order,
+        fetched batch by batch through a server side cursor so that only a
+        batch is held in memory at a time"""
+        query = (
+            self.query(*args, **kwargs)
+            .order_by(self.Meta.model.id)
+            .execution_options(yield_per=batch_size)
+        )
+        yield from self.session.scalars(query)
+
+    def count(self, query) -> int:
+        return self.session.scalar(
+            select(func.count()).select_from(query.order_by(None).subquery())
+        )
+
+    def get_planner_estimate(self, session: SessionType, query) -> int:
+        """The number of rows the planner expects the query to return, derived
+        from the table statistics rather than from scanning the rows"""
+        statement = query.order_by(None).compile(
+            dialect=session.get_bind().dialect,
+            compile_kwargs={"literal_binds": True},
+        )
+        plan = (
+            session.connection()
+            .exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}")
+            .scalar()
+        )
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    def paginate(
+        self,
+        *args,
+        pagination: PaginationFilters | CursorPaginationFilters,
+        count_mode: CountMode = CountMode.exact,
+        estimate_threshold: int = 10_000,
+        **kwargs,
+    ) -> Pagination | CursorPagination:
+        if isinstance(pagination, CursorPaginationFilters):
+            return self.cursor_paginate(*args, pagination=pagination, **kwargs)
+
         query = self.build_list_query(*args, **kwargs)
-        items = self.session.scalars(
-            query.limit(pagination.per_page).offset(
-                (pagination.page - 1) * pagination.per_page
+        items, total, has_more = self.read_page(
+            self.session.execute(
+                self.build_page_query(
+                    query, pagination=pagination, count_mode=count_mode
+                )
+            ),
+            pagination=pagination,
+            count_mode=count_mode,
+        )
+
+        total_is_estimate = False
+        if count_mode is CountMode.estimate:
+            estimate = self.get_planner_estimate(self.session, query)
+            if estimate >= estimate_threshold:
+                total, total_is_estimate = estimate, True
+
+        if count_mode is not CountMode.none and total is None:
+            total = self.count(query)
+
+        return Pagination(
+            page=pagination.page,
+            per_page=pagination.per_page,
+            items=items,
+            total=total,
+            total_is_estimate=total_is_estimate,
+            has_more=has_more,
+        )
+
+    def build_page_query(
+        self,
+        query,
+        pagination: PaginationFilters,
+        count_mode: CountMode = CountMode.exact,
+    ):
+        limit = pagination.per_page
+        if count_mode is CountMode.none:
+            # An extra row is fetched to know whether there is a following page
+            limit += 1
+
+        query = query.limit(limit).offset((pagination.page - 1) * pagination.per_page)
+
+        if count_mode is CountMode.window:
+            # Window functions are evaluated before the limit, so this is
+            # the total of the whole query
+            query = query.add_columns(func.count().over().label("total"))
+
+        return query
+
+    def read_page(
+        self,
+        result,
+        pagination: PaginationFilters,
+        count_mode: CountMode = CountMode.exact,
+    ) -> Tuple[List[T_Model], Optional[int], Optional[bool]]:
+        """The items of the page, with the total and whether there are more
+        items when the page query provides them"""
+        if count_mode is CountMode.window:
+            rows = result.unique().all()
+            # A page past the end has no row to read the total from
+            total = rows[0].total if rows else (0 if pagination.page == 1 else None)
+            return [row[0] for row in rows], total, None
+
+        items = list(result.scalars().unique().all())
+
+        if count_mode is CountMode.none:
+            has_more = len(items) > pagination.per_page
+            return items[: pagination.per_page], None, has_more
+
+        return items, None, None
+
+    def cursor_paginate(
+        self,
+        *args,
+        pagination: CursorPaginationFilters,
+        order_by: Optional[List[Any]] = None,
+        **kwargs,
+    ) -> CursorPagination:
+        """Keyset pagination over the ordering of the dao.
+
+        Rather than skipping the previous rows with an offset, each page
+        continues from the sort key values of the row at the edge of the
+        previous page, so the cost of a page doesn't depend on its depth."""
+        query = self.list_query(*args, **kwargs)
+        sort_keys = self.get_sort_keys(order_by=order_by)
+        total = self.count(query) if pagination.with_total else None
+
+        page_query, backwards = self.build_cursor_page_query(
+            query, sort_keys=sort_keys, pagination=pagination
+        )
+        items = self.session.scalars(page_query).unique().all()
+
+        return self.build_cursor_pagination(
+            items,
+            sort_keys=sort_keys,
+            pagination=pagination,
+            backwards=backwards,
+            total=total,
+        )
+
+    def build_cursor_page_query(
+        self,
+        query,
+        sort_keys: List[SortKey],
+        pagination: CursorPaginationFilters,
+    ) -> Tuple[Any, bool]:
+        """The query of the page following (or preceding) the cursor, and
+        whether the cursor points backwards"""
+        backwards = False
+        if pagination.cursor:
+            values, backwards = decode_cursor(pagination.cursor)
+            if len(values) != len(sort_keys):
+                raise ServiceValidationError("Invalid pagination cursor")
+
+            query = query.where(
+                or_(
+                    *[
+                        and_(
+                            *[
+                                sort_key.equals(value)
+                                for sort_key, value in zip(sort_keys[:i], values[:i])
+                            ],
+                            sort_keys[i].follows(values[i], reverse=backwards),
+                        )
+                        for i in range(len(sort_keys))
+                    ]
+                )
+            )
+
+        # An extra row is fetched to know whether there is a following page
+        query = query.order_by(
+            *[sort_key.order_expression(reverse=backwards) for sort_key in sort_keys]
+        ).limit(pagination.per_page + 1)
+
+        return query, backwards
+
+    def build_cursor_pagination(
+        self,
+        items: Sequence[T_Model],
+        sort_keys: List[SortKey],
+        pagination: CursorPaginationFilters,
+        backwards: bool,
+        total: Optional[int],
+    ) -> CursorPagination:
+        has_more = len(items) > pagination.per_page
+        items = list(items[: pagination.per_page])
+
+        if backwards:
+            items.reverse()
+
+        def cursor_for(item: T_Model, backwards: bool) -> str:
+            return encode_cursor(
+                tuple(getattr(item, sort_key.column.key) for sort_key in sort_keys),
+                backwards=backwards,
             )
-        ).all()
-        total = query.options(lazyload("*")).order_by(None).count()
+
+        has_next = has_more if not backwards else True
+        has_prev = has_more if backwards else pagination.cursor is not None
+
+        return CursorPagination(
+            per_page=pagination.per_page,
+            items=items,
+            next_cursor=cursor_for(items[-1], False) if items and has_next else None,
+            prev_cursor=cursor_for(items[0], True) if items and has_prev else None,
+            total=total,
+        )
+
+
+class AsyncBaseDao(BaseDao[T_Model]):
+    """Read paths of the BaseDao executed through an AsyncSession.
+
+    The queries are built by the same methods as the sync dao, so a dao
+    can be made async by mixing this class in before its sync variant."""
+
+    session: AsyncSessionType
+
+    def __init__(self, session: AsyncSessionType | None = None):
+        self.session = session
+
+    async def list(self, *args, **kwargs) -> list[T_Model]:
+        result = await self.session.scalars(self.build_list_query(*args, **kwargs))
+        return result.unique().all()
+
+    async def perform_get(self, query, raise_exc: bool = True) -> Optional[T_Model]:
+        result = await self.session.scalars(query)
+        try:
+            return result.unique().one()
+        except (NoResultFound, MultipleResultsFound) as e:
+            if raise_exc:
+                raise e.__class__(f"{human_name(self.Meta.model.__name__)} not found")
+
+        return None
+
+    async def get(self, *args, raise_exc: bool = True, **kwargs) -> Optional[T_Model]:
+        return await self.perform_get(
+            self.get_query(*args, **kwargs), raise_exc=raise_exc
+        )
+
+    async def count(self, query) -> int:
+        return await self.session.scalar(
+            select(func.count()).select_from(query.order_by(None).subquery())
+        )
+
+    async def paginate(
+        self,
+        *args,
+        pagination: PaginationFilters | CursorPaginationFilters,
+        count_mode: CountMode = CountMode.exact,
+        estimate_threshold: int = 10_000,
+        **kwargs,
+    ) -> Pagination | CursorPagination:
+        if isinstance(pagination, CursorPaginationFilters):
+            return await self.cursor_paginate(*args, pagination=pagination, **kwargs)
+
+        query = self.build_list_query(*args, **kwargs)
+        items, total, has_more = self.read_page(
+            await self.session.execute(
+                self.build_page_query(
+                    query, pagination=pagination, count_mode=count_mode
+                )
+            ),
+            pagination=pagination,
+            count_mode=count_mode,
+        )
+
+        total_is_estimate = False
+        if count_mode is CountMode.estimate:
+            estimate = await self.session.run_sync(self.get_planner_estimate, query)
+            if estimate >= estimate_threshold:
+                total, total_is_estimate = estimate, True
+
+        if count_mode is not CountMode.none and total is None:
+            total = await self.count(query)
 
         return Pagination(
             page=pagination.page,
             per_page=pagination.per_page,
             items=items,
             total=total,
+            total_is_estimate=total_is_estimate,
+            has_more=has_more,
+        )
+
+    async def cursor_paginate(
+        self,
+        *args,
+        pagination: CursorPaginationFilters,
+        order_by: Optional[List[Any]] = None,
+        **kwargs,
+    ) -> CursorPagination:
+        query = self.list_query(*args, **kwargs)
+        sort_keys = self.get_sort_keys(order_by=order_by)
+        total = await self.count(query) if pagination.with_total else None
+
+        page_query, backwards = self.build_cursor_page_query(
+            query, sort_keys=sort_keys, pagination=pagination
+        )
+        result = await self.session.scalars(page_query)
+
+        return self.build_cursor_pagination(
+            result.unique().all(),
+            sort_keys=sort_keys,
+            pagination=pagination,
+            backwards=backwards,
+            total=total,
         )
@@ -0,0 +1,62 @@
+import functools
+from typing import Any, Callable, Hashable, TypeVar
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session as SessionClass
+
+from app.database import Base
+from app.shared.metrics import memoization_metrics
+
+T = TypeVar("T")
+
+_SESSION_INFO_KEY = "memoized"
+
+
+def _key_part(value: Any) -> Hashable:
+    if isinstance(value, Base):
+        # Instances are identified by their primary key rather than by object
+        return type(value).__name__, inspect(value).identity
+
+    return value
+
+
+def session_memoized(func: Callable[..., T]) -> Callable[..., T]:
+    """Memoize the results of the getter in its session.
+
+    Results are keyed by the getter and its other arguments, and are
+    forgotten once the session transaction ends, so an entity resolved by
+    several dependencies of the same request is only fetched once."""
+
+    @functools.wraps(func)
+    def wrapper(*args, session, **kwargs) -> T:
+        try:
+            key = (
+                func.__module__,
+                func.__qualname__,
+                tuple(_key_part(arg) for arg in args),
+                tuple(sorted((k, _key_part(v)) for k, v in kwargs.items())),
+            )
+            hash(key)
+        except TypeError:
+            return func(*args, session=session, **kwargs)
+
+        memoized = session.info.setdefault(_SESSION_INFO_KEY, {})
+        if key in memoized:
+            memoization_metrics.record_hit()
+            return memoized[key]
+
+        memoization_metrics.record_miss()
+        result = memoized[key] = func(*args, session=session, **kwargs)
+        return result
+
+    return wrapper
+
+
+@event.listens_for(SessionClass, "after_transaction_end")
+def _clear_memoized(session, transaction):
+    # Savepoints don't end the unit of work, the outermost transaction does
+    if transaction.parent is None:
+        session.info.pop(_SESSION_INFO_KEY, None)
+
+
+__all__ = ["session_memoized"]
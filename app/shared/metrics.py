@@ -0,0 +1,75 @@
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Dict
+
+
+@dataclass
+class PoolMetrics:
+    """Cumulative wait times of the checkouts of a connection pool"""
+
+    checkouts: int = 0
+    timeouts: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+    _lock: Lock = field(default_factory=Lock, repr=False)
+
+    def record_checkout(self, wait_seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+
+            self.total_wait_seconds += wait_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+
+    @property
+    def mean_wait_seconds(self) -> float:
+        attempts = self.checkouts + self.timeouts
+        return self.total_wait_seconds / attempts if attempts else 0.0
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.total_wait_seconds = 0.0
+            self.max_wait_seconds = 0.0
+
+
+@dataclass
+class MemoizationMetrics:
+    """Calls answered from memory, each being a query avoided"""
+
+    hits: int = 0
+    misses: int = 0
+    _lock: Lock = field(default_factory=Lock, repr=False)
+
+    def record_hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+pool_metrics: Dict[str, PoolMetrics] = {}
+memoization_metrics = MemoizationMetrics()
+
+
+def get_pool_metrics(name: str) -> PoolMetrics:
+    return pool_metrics.setdefault(name, PoolMetrics())
+
+
+__all__ = [
+    "MemoizationMetrics",
+    "PoolMetrics",
+    "get_pool_metrics",
+    "memoization_metrics",
+    "pool_metrics",
+]
@@ -1,5 +1,6 @@
+import zlib
 from dataclasses import asdict
-from typing import Any
+from typing import Any, Iterable, Iterator
 
 import pydantic
 from pydantic import WrapSerializer
@@ -42,4 +43,15 @@ decimal_serializer = WrapSerializer(
     when_used="json-unless-none",
 )
 
-__all__ = ["as_dict", "datetime_serialiser"]
+
+def gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Gzip a stream of chunks on the fly, each chunk being flushed so the
+    reader receives it without waiting for the end of the stream"""
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    yield compressor.flush()
+
+
+__all__ = ["as_dict", "datetime_serialiser", "gzip_chunks"]
@@ -1,5 +1,7 @@
 from typing import Optional
 
+from sqlalchemy import select
+
 from app.shared.dao import BaseDao
 from app.shared.sentinels import NO_FILTER, OptionalFilter
 from app.tasks.models.category import Category, IconNameEnum
@@ -52,6 +54,18 @@ class CategoryDao(BaseDao[Category]):
 
         return statement
 
+    def subtree_ids_query(self, category_id: int):
+        """The ids of the category and of all its descendants"""
+        subtree = (
+            select(Category.id)
+            .where(Category.id == category_id)
+            .cte("category_subtree", recursive=True)
+        )
+        subtree = subtree.union_all(
+            select(Category.id).where(Category.parent_category_id == subtree.c.id)
+        )
+        return select(subtree.c.id)
+
     def delete(self, id: int, user_id: int):
         category = self.get(id=id, user_id=user_id)
         self.session.delete(category)
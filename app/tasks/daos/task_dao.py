@@ -1,10 +1,13 @@
 from datetime import date, datetime
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
-from sqlalchemy import and_, nulls_last, update
+from sqlalchemy import bindparam, nulls_last, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import lazyload, load_only
 
-from app.shared.dao import BaseDao
+from app.shared.dao import AsyncBaseDao, BaseDao
 from app.shared.sentinels import NO_FILTER, NO_OP, OptionalAction, OptionalFilter
+from app.tasks.daos.category_dao import CategoryDao
 from app.tasks.models.task import Task, TaskStatus
 from app.tasks.models.task_until import TaskUntil, UntilType
 
@@ -44,9 +47,13 @@ class TaskDao(BaseDao[Task]):
     def query(
         self,
         id: OptionalFilter[int] = NO_FILTER,
+        ids: OptionalFilter[List[int]] = NO_FILTER,
         status: OptionalFilter[TaskStatus] = NO_FILTER,
         name: OptionalFilter[str] = NO_FILTER,
         category_id: OptionalFilter[Optional[int]] = NO_FILTER,
+        category_tree_id: OptionalFilter[int] = NO_FILTER,
+        next_event_datetime_from: OptionalFilter[datetime] = NO_FILTER,
+        next_event_datetime_to: OptionalFilter[datetime] = NO_FILTER,
         user_id: OptionalFilter[int] = NO_FILTER,
     ):
         statement = super().query()
@@ -54,6 +61,9 @@ class TaskDao(BaseDao[Task]):
         if id is not NO_FILTER:
             statement = statement.where(Task.id == id)
 
+        if ids is not NO_FILTER:
+            statement = statement.where(Task.id.in_(ids))
+
         if status is not NO_FILTER:
             statement = statement.where(Task.status == status)
 
@@ -63,11 +73,53 @@ class TaskDao(BaseDao[Task]):
         if category_id is not NO_FILTER:
             statement = statement.where(Task.category_id == category_id)
 
+        if category_tree_id is not NO_FILTER:
+            statement = statement.where(
+                Task.category_id.in_(
+                    CategoryDao(session=self.session).subtree_ids_query(
+                        category_id=category_tree_id
+                    )
+                )
+            )
+
+        if next_event_datetime_from is not NO_FILTER:
+            statement = statement.where(
+                Task.next_event_datetime >= next_event_datetime_from
+            )
+
+        if next_event_datetime_to is not NO_FILTER:
+            statement = statement.where(
+                Task.next_event_datetime < next_event_datetime_to
+            )
+
         if user_id is not NO_FILTER:
             statement = statement.where(Task.user_id == user_id)
 
         return statement
 
+    def list_query(
+        self, *args, fields: OptionalFilter[List[str]] = NO_FILTER, **kwargs
+    ):
+        statement = super().list_query(*args, **kwargs)
+
+        if fields is not NO_FILTER:
+            # Only load what will be serialised, the id being needed as the
+            # identity of the rows, whichever fields are selected
+            columns = Task.__table__.columns
+            statement = statement.options(
+                load_only(
+                    Task.id,
+                    *[getattr(Task, field) for field in fields if field in columns],
+                ),
+                *[
+                    lazyload(getattr(Task, relationship))
+                    for relationship in ("frequency", "until")
+                    if relationship not in fields
+                ],
+            )
+
+        return statement
+
     def update(
         self,
         id: int,
@@ -78,50 +130,163 @@ class TaskDao(BaseDao[Task]):
         frequency_id: OptionalAction[int] = NO_OP,
         until_id: OptionalAction[int] = NO_OP,
     ):
-        task = self.get(id=id, user_id=user_id)
+        values = {
+            field: value
+            for field, value in (
+                ("status", status),
+                ("manually_completed_at", manually_completed_at),
+                ("next_event_datetime", next_event_datetime),
+                ("frequency_id", frequency_id),
+                ("until_id", until_id),
+            )
+            if value is not NO_OP
+        }
 
-        if status != NO_OP:
-            task.status = status
-            self.session.add(task)
-            self.session.flush()
+        if not values:
+            self.get(id=id, user_id=user_id)
+            return
 
-        if manually_completed_at != NO_OP:
-            task.manually_completed_at = manually_completed_at
-            self.session.add(task)
-            self.session.flush()
+        values["state_version"] = Task.state_version + 1
+        self.perform_update(values, id=id, user_id=user_id)
 
-        if next_event_datetime != NO_OP:
-            task.next_event_datetime = next_event_datetime
-            self.session.add(task)
-            self.session.flush()
+    def list_due(
+        self,
+        user_id: int,
+        next_event_datetime_from: OptionalFilter[datetime] = NO_FILTER,
+        next_event_datetime_to: OptionalFilter[datetime] = NO_FILTER,
+        limit: int = 50,
+    ) -> List[Row]:
+        """The earliest ongoing tasks due within the range, as rows of the
+        columns covered by the partial due index, so that only the returned
+        entries are read"""
+        statement = (
+            select(Task.id, Task.name, Task.category_id, Task.next_event_datetime)
+            .where(
+                Task.user_id == user_id,
+                Task.status == TaskStatus.ongoing,
+                Task.next_event_datetime.is_not(None),
+            )
+            .order_by(Task.next_event_datetime.asc(), Task.id.asc())
+            .limit(limit)
+        )
 
-        if frequency_id != NO_OP:
-            task.frequency_id = frequency_id
-            self.session.add(task)
-            self.session.flush()
+        if next_event_datetime_from is not NO_FILTER:
+            statement = statement.where(
+                Task.next_event_datetime >= next_event_datetime_from
+            )
 
-        if until_id != NO_OP:
-            task.until_id = until_id
-            self.session.add(task)
-            self.session.flush()
+        if next_event_datetime_to is not NO_FILTER:
+            statement = statement.where(
+                Task.next_event_datetime < next_event_datetime_to
+            )
+
+        return list(self.session.execute(statement).all())
+
+    def get_state_versions(self, ids: List[int]) -> Dict[int, int]:
+        return dict(
+            self.session.execute(
+                select(Task.id, Task.state_version).where(Task.id.in_(ids))
+            ).all()
+        )
+
+    def update_states(self, rows: List[Dict[str, Any]]) -> int:
+        """Write the computed states with a single executemany, each only if
+        the task is still at the state_version it was computed from.
+
+        Return the number of tasks updated, a task changed in the meantime
+        keeping the state computed from its newer version."""
+        if not rows:
+            return 0
+
+        table = Task.__table__
+        return self.session.execute(
+            update(table)
+            .where(
+                table.c.id == bindparam("b_id"),
+                table.c.state_version == bindparam("b_state_version"),
+            )
+            .values(
+                status=bindparam("b_status"),
+                next_event_datetime=bindparam("b_next_event_datetime"),
+            ),
+            [
+                {
+                    "b_id": row["id"],
+                    "b_state_version": row["state_version"],
+                    "b_status": row["status"],
+                    "b_next_event_datetime": row["next_event_datetime"],
+                }
+                for row in rows
+            ],
+        ).rowcount
+
+    def list_for_state_computation(self, ids: List[int]) -> List[Task]:
+        """Load only the columns used to compute the state of the tasks"""
+        return (
+            self.session.scalars(
+                self.query(ids=ids).options(
+                    load_only(
+                        Task.id,
+                        Task.created,
+                        Task.status,
+                        Task.manually_completed_at,
+                        Task.next_event_datetime,
+                        Task.event_count,
+                        Task.latest_event_datetime,
+                        Task.second_latest_event_datetime,
+                        Task.state_version,
+                    )
+                )
+            )
+            .unique()
+            .all()
+        )
 
     def delete(self, id: int, user_id: int):
         task = self.get(id=id, user_id=user_id)
         self.session.delete(task)
         self.session.flush()
 
-    def mark_ongoing_date_tasks_as_completed(self):
-        # Any ongoing or paused task that has reached the
-        # expiration date will be updated to completed
-        self.session.execute(
-            update(Task)
+    def mark_ongoing_date_tasks_as_completed(
+        self, today: date, after_id: Optional[int] = None, batch_size: int = 500
+    ) -> List[int]:
+        """Complete the next batch of ongoing or paused tasks whose until date
+        has been reached, in ascending id order following after_id.
+
+        Return the ids of the tasks completed, the last one being the keyset
+        to continue from. The rows of the batch are locked in id order so
+        that concurrent sweeps don't deadlock."""
+        batch_ids = (
+            select(Task.id)
+            .join(TaskUntil, TaskUntil.id == Task.until_id)
             .where(
                 Task.status != TaskStatus.completed,
-                Task.until.has(
-                    and_(
-                        TaskUntil.type == UntilType.date, TaskUntil.date <= date.today()
-                    )
-                ),
+                TaskUntil.type == UntilType.date,
+                TaskUntil.date <= today,
             )
-            .values({"status": TaskStatus.completed, "next_event_datetime": None})
+            .order_by(Task.id)
+            .limit(batch_size)
+            .with_for_update(of=Task)
+        )
+        if after_id is not None:
+            batch_ids = batch_ids.where(Task.id > after_id)
+
+        return sorted(
+            self.session.scalars(
+                update(Task)
+                .where(Task.id.in_(batch_ids.scalar_subquery()))
+                .values(
+                    {
+                        "status": TaskStatus.completed,
+                        "next_event_datetime": None,
+                        "state_version": Task.state_version + 1,
+                    }
+                )
+                .returning(Task.id)
+                .execution_options(synchronize_session=False)
+            ).all()
         )
+
+
+class AsyncTaskDao(AsyncBaseDao[Task], TaskDao):
+    pass
@@ -1,20 +1,37 @@
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import case, func, insert, select, update
 
 from app.shared.dao import BaseDao
 from app.shared.sentinels import NO_FILTER, OptionalFilter
+from app.tasks.daos.task_metric_rollup_dao import TaskMetricRollupDao
 from app.tasks.models.task import Task
 from app.tasks.models.task_event import TaskEvent, TaskEventAround
 
 
+def _nth_latest_event_datetime(offset: int):
+    # Correlated to the task being updated
+    return (
+        select(TaskEvent.effective_datetime)
+        .where(TaskEvent.task_id == Task.id)
+        .order_by(TaskEvent.effective_datetime.desc(), TaskEvent.id.desc())
+        .offset(offset)
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
 class TaskEventDao(BaseDao[TaskEvent]):
     class Meta:
         model = TaskEvent
         default_order_by = (TaskEvent.effective_datetime.desc(),)
+        partition_column = TaskEvent.effective_datetime
 
     def create(
         self,
         task_id: int,
+        user_id: int,
         around: TaskEventAround,
         effective_datetime: datetime,
         created: datetime,
@@ -22,6 +39,7 @@ class TaskEventDao(BaseDao[TaskEvent]):
     ) -> TaskEvent:
         task_event = TaskEvent(
             task_id=task_id,
+            user_id=user_id,
             around=around,
             created=created,
             effective_datetime=effective_datetime,
@@ -30,15 +48,39 @@ class TaskEventDao(BaseDao[TaskEvent]):
 
         with self.session.begin_nested():
             self.session.add(task_event)
+            self.increment_task_event_counters(
+                task_id=task_id, effective_datetime=effective_datetime
+            )
 
         self.session.flush()
         return task_event
 
+    def bulk_create(self, rows: List[Dict[str, Any]]) -> List[TaskEvent]:
+        """Insert the events with multi-row INSERTs, refreshing the event
+        columns of each of their tasks once. Each row carries the user_id of
+        its task."""
+        with self.session.begin_nested():
+            task_events = list(
+                self.session.scalars(
+                    insert(TaskEvent).returning(
+                        TaskEvent, sort_by_parameter_order=True
+                    ),
+                    rows,
+                )
+            )
+            self.refresh_task_event_counters(*{row["task_id"] for row in rows})
+
+        self.session.flush()
+        return task_events
+
     def query(
         self,
         id: OptionalFilter[int] = NO_FILTER,
         task_id: OptionalFilter[int] = NO_FILTER,
         user_id: OptionalFilter[int] = NO_FILTER,
+        # Only the partitions of the months within the range are scanned
+        effective_datetime_from: OptionalFilter[datetime] = NO_FILTER,
+        effective_datetime_to: OptionalFilter[datetime] = NO_FILTER,
     ):
         statement = super().query()
 
@@ -48,12 +90,85 @@ class TaskEventDao(BaseDao[TaskEvent]):
         if task_id is not NO_FILTER:
             statement = statement.where(TaskEvent.task_id == task_id)
 
+        if effective_datetime_from is not NO_FILTER:
+            statement = statement.where(
+                TaskEvent.effective_datetime >= effective_datetime_from
+            )
+
+        if effective_datetime_to is not NO_FILTER:
+            statement = statement.where(
+                TaskEvent.effective_datetime < effective_datetime_to
+            )
+
         if user_id is not NO_FILTER:
-            statement = statement.where(TaskEvent.task.has(Task.user_id == user_id))
+            statement = statement.where(self.owned_by(user_id))
 
         return statement
 
     def delete(self, id: int, user_id: int):
         task_event = self.get(id=id, user_id=user_id)
-        self.session.delete(task_event)
+        # Deleted along with the event
+        metric_values = [
+            (metric.task_metric_id, metric.effective_datetime, metric.value)
+            for metric in task_event.metrics
+        ]
+
+        with self.session.begin_nested():
+            self.session.delete(task_event)
+            self.session.flush()
+            self.refresh_task_event_counters(task_event.task_id)
+            TaskMetricRollupDao(session=self.session).refresh(metric_values)
+
         self.session.flush()
+
+    def increment_task_event_counters(self, task_id: int, effective_datetime: datetime):
+        """Account for a new event in the denormalised event columns of the task,
+        without reading the existing events"""
+        self.session.execute(
+            update(Task)
+            .where(Task.id == task_id)
+            .values(
+                event_count=Task.event_count + 1,
+                state_version=Task.state_version + 1,
+                latest_event_datetime=case(
+                    (
+                        Task.latest_event_datetime.is_(None)
+                        | (Task.latest_event_datetime <= effective_datetime),
+                        effective_datetime,
+                    ),
+                    else_=Task.latest_event_datetime,
+                ),
+                second_latest_event_datetime=case(
+                    (Task.latest_event_datetime.is_(None), None),
+                    (
+                        Task.latest_event_datetime <= effective_datetime,
+                        Task.latest_event_datetime,
+                    ),
+                    (
+                        Task.second_latest_event_datetime.is_(None)
+                        | (Task.second_latest_event_datetime < effective_datetime),
+                        effective_datetime,
+                    ),
+                    else_=Task.second_latest_event_datetime,
+                ),
+            )
+            .execution_options(synchronize_session="fetch")
+        )
+
+    def refresh_task_event_counters(self, *task_ids: int):
+        """Recompute the denormalised event columns of the tasks from their events"""
+        self.session.execute(
+            update(Task)
+            .where(Task.id.in_(task_ids))
+            .values(
+                event_count=(
+                    select(func.count(TaskEvent.id))
+                    .where(TaskEvent.task_id == Task.id)
+                    .scalar_subquery()
+                ),
+                latest_event_datetime=_nth_latest_event_datetime(0),
+                second_latest_event_datetime=_nth_latest_event_datetime(1),
+                state_version=Task.state_version + 1,
+            )
+            .execution_options(synchronize_session="fetch")
+        )
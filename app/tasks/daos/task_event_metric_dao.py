@@ -1,34 +1,69 @@
+from datetime import datetime
 from decimal import Decimal
+from typing import Any, Dict, List
+
+from sqlalchemy import func, insert
+from sqlalchemy.engine import Row
 
 from app.shared.dao import BaseDao
 from app.shared.sentinels import NO_FILTER, OptionalFilter
-from app.tasks.models.task import Task
+from app.tasks.daos.task_metric_rollup_dao import TaskMetricRollupDao
 from app.tasks.models.task_event import TaskEvent
 from app.tasks.models.task_event_metric import TaskEventMetric
 
 
+# The percentiles of the aggregates, by their label
+AGGREGATE_PERCENTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99}
+
+
 class TaskEventMetricDao(BaseDao[TaskEventMetric]):
     class Meta:
         model = TaskEventMetric
+        partition_column = TaskEventMetric.effective_datetime
 
     def create(
         self,
         task_metric_id: int,
         task_event_id: int,
+        effective_datetime: datetime,
+        user_id: int,
         value: Decimal,
     ) -> TaskEventMetric:
         event_metric = TaskEventMetric(
             task_metric_id=task_metric_id,
             task_event_id=task_event_id,
+            effective_datetime=effective_datetime,
+            user_id=user_id,
             value=value,
         )
 
         with self.session.begin_nested():
             self.session.add(event_metric)
+            TaskMetricRollupDao(session=self.session).increment(
+                [(task_metric_id, effective_datetime, value)]
+            )
 
         self.session.flush()
         return event_metric
 
+    def bulk_create(self, rows: List[Dict[str, Any]]) -> List[TaskEventMetric]:
+        with self.session.begin_nested():
+            event_metrics = list(
+                self.session.scalars(
+                    insert(TaskEventMetric).returning(
+                        TaskEventMetric, sort_by_parameter_order=True
+                    ),
+                    rows,
+                )
+            )
+            TaskMetricRollupDao(session=self.session).increment(
+                (row["task_metric_id"], row["effective_datetime"], row["value"])
+                for row in rows
+            )
+
+        self.session.flush()
+        return event_metrics
+
     def query(
         self,
         id: OptionalFilter[int] = NO_FILTER,
@@ -36,6 +71,9 @@ class TaskEventMetricDao(BaseDao[TaskEventMetric]):
         user_id: OptionalFilter[int] = NO_FILTER,
         task_event_id: OptionalFilter[int] = NO_FILTER,
         task_metric_id: OptionalFilter[int] = NO_FILTER,
+        # Only the partitions of the months within the range are scanned
+        effective_datetime_from: OptionalFilter[datetime] = NO_FILTER,
+        effective_datetime_to: OptionalFilter[datetime] = NO_FILTER,
     ):
         statement = super().query()
 
@@ -44,15 +82,12 @@ class TaskEventMetricDao(BaseDao[TaskEventMetric]):
 
         if task_id is not NO_FILTER:
             statement = statement.where(
-                TaskEventMetric.task_event.has(TaskEvent.task_id == task_id)
+                *self.join_criteria(TaskEventMetric.task_event),
+                TaskEvent.task_id == task_id,
             )
 
         if user_id is not NO_FILTER:
-            statement = statement.where(
-                TaskEventMetric.task_event.has(
-                    TaskEvent.task.has(Task.user_id == user_id)
-                )
-            )
+            statement = statement.where(self.owned_by(user_id))
 
         if task_event_id is not NO_FILTER:
             statement = statement.where(TaskEventMetric.task_event_id == task_event_id)
@@ -62,9 +97,71 @@ class TaskEventMetricDao(BaseDao[TaskEventMetric]):
                 TaskEventMetric.task_metric_id == task_metric_id
             )
 
+        if effective_datetime_from is not NO_FILTER:
+            statement = statement.where(
+                TaskEventMetric.effective_datetime >= effective_datetime_from
+            )
+
+        if effective_datetime_to is not NO_FILTER:
+            statement = statement.where(
+                TaskEventMetric.effective_datetime < effective_datetime_to
+            )
+
         return statement
 
+    def aggregate(
+        self,
+        task_metric_id: int,
+        bucket: str,
+        effective_datetime_from: OptionalFilter[datetime] = NO_FILTER,
+        effective_datetime_to: OptionalFilter[datetime] = NO_FILTER,
+    ) -> List[Row]:
+        """The values of the metric aggregated per bucket of their effective
+        datetime, truncated to the day, week or month, oldest bucket first.
+
+        The values are included in the index of the metric, so only the
+        index entries of the range are read, from the partitions of its
+        months."""
+        bucket_start = func.date_trunc(bucket, TaskEventMetric.effective_datetime)
+        value = TaskEventMetric.value
+
+        statement = (
+            self.query(
+                task_metric_id=task_metric_id,
+                effective_datetime_from=effective_datetime_from,
+                effective_datetime_to=effective_datetime_to,
+            )
+            .with_only_columns(
+                bucket_start.label("bucket"),
+                func.count().label("count"),
+                func.sum(value).label("sum"),
+                func.avg(value).label("avg"),
+                func.min(value).label("min"),
+                func.max(value).label("max"),
+                *(
+                    func.percentile_cont(fraction).within_group(value).label(label)
+                    for label, fraction in AGGREGATE_PERCENTILES.items()
+                ),
+            )
+            .group_by(bucket_start)
+            .order_by(bucket_start)
+        )
+        return list(self.session.execute(statement))
+
     def delete(self, id: int, user_id: int):
         event_metric = self.get(id=id, user_id=user_id)
-        self.session.delete(event_metric)
+
+        with self.session.begin_nested():
+            self.session.delete(event_metric)
+            self.session.flush()
+            TaskMetricRollupDao(session=self.session).refresh(
+                [
+                    (
+                        event_metric.task_metric_id,
+                        event_metric.effective_datetime,
+                        event_metric.value,
+                    )
+                ]
+            )
+
         self.session.flush()
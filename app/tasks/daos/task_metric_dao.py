@@ -1,6 +1,5 @@
 from app.shared.dao import BaseDao
 from app.shared.sentinels import NO_FILTER, OptionalFilter
-from app.tasks.models.task import Task
 from app.tasks.models.task_metric import TaskMetric
 
 
@@ -9,10 +8,11 @@ class TaskMetricDao(BaseDao[TaskMetric]):
         model = TaskMetric
 
     def create(
-        self, task_id: int, name: str, prompt: str, required: bool
+        self, task_id: int, user_id: int, name: str, prompt: str, required: bool
     ) -> TaskMetric:
         task_metric = TaskMetric(
             task_id=task_id,
+            user_id=user_id,
             name=name,
             prompt=prompt,
             required=required,
@@ -40,7 +40,7 @@ class TaskMetricDao(BaseDao[TaskMetric]):
             statement = statement.where(TaskMetric.task_id == task_id)
 
         if user_id is not NO_FILTER:
-            statement = statement.where(TaskMetric.task.has(Task.user_id == user_id))
+            statement = statement.where(self.owned_by(user_id))
 
         if name is not NO_FILTER:
             statement = statement.where(TaskMetric.name == name)
@@ -0,0 +1,234 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import case, delete, func, literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Row
+
+from app.shared.dao import BaseDao
+from app.shared.sentinels import NO_FILTER, OptionalFilter
+from app.tasks.models.task_event_metric import TaskEventMetric
+from app.tasks.models.task_metric_rollup import TaskMetricRollup, TaskMetricRollupPeriod
+
+# The task_metric_id, effective_datetime and value of an event metric
+MetricValue = Tuple[int, datetime, Decimal]
+
+_ROLLUP_COLUMNS = [
+    TaskMetricRollup.task_metric_id,
+    TaskMetricRollup.period,
+    TaskMetricRollup.bucket_start,
+    TaskMetricRollup.count,
+    TaskMetricRollup.sum,
+    TaskMetricRollup.sum_of_squares,
+    TaskMetricRollup.min,
+    TaskMetricRollup.max,
+]
+
+
+def _select_rollup(task_metric_id, period, bucket_start):
+    # Summarises the event metrics, in the order of the rollup columns
+    value = TaskEventMetric.value
+    return select(
+        task_metric_id,
+        period,
+        bucket_start,
+        func.count(),
+        func.sum(value),
+        func.sum(value * value),
+        func.min(value),
+        func.max(value),
+    )
+
+
+class TaskMetricRollupDao(BaseDao[TaskMetricRollup]):
+    class Meta:
+        model = TaskMetricRollup
+        default_order_by = (TaskMetricRollup.bucket_start.asc(),)
+
+    def query(
+        self,
+        task_metric_id: OptionalFilter[int] = NO_FILTER,
+        period: OptionalFilter[TaskMetricRollupPeriod] = NO_FILTER,
+        bucket_start_from: OptionalFilter[datetime] = NO_FILTER,
+        bucket_start_to: OptionalFilter[datetime] = NO_FILTER,
+    ):
+        statement = super().query()
+
+        if task_metric_id is not NO_FILTER:
+            statement = statement.where(
+                TaskMetricRollup.task_metric_id == task_metric_id
+            )
+
+        if period is not NO_FILTER:
+            statement = statement.where(TaskMetricRollup.period == period)
+
+        if bucket_start_from is not NO_FILTER:
+            statement = statement.where(
+                TaskMetricRollup.bucket_start >= bucket_start_from
+            )
+
+        if bucket_start_to is not NO_FILTER:
+            statement = statement.where(TaskMetricRollup.bucket_start < bucket_start_to)
+
+        return statement
+
+    def series(
+        self,
+        task_metric_id: int,
+        period: TaskMetricRollupPeriod,
+        bucket_start_from: OptionalFilter[datetime] = NO_FILTER,
+        bucket_start_to: OptionalFilter[datetime] = NO_FILTER,
+    ) -> List[Row]:
+        """The rollups of the metric, oldest bucket first, read as rows so that
+        they are never stale identities of the session"""
+        statement = self.build_list_query(
+            task_metric_id=task_metric_id,
+            period=period,
+            bucket_start_from=bucket_start_from,
+            bucket_start_to=bucket_start_to,
+        ).with_only_columns(
+            TaskMetricRollup.bucket_start.label("bucket"),
+            TaskMetricRollup.count,
+            TaskMetricRollup.sum,
+            TaskMetricRollup.sum_of_squares,
+            TaskMetricRollup.min,
+            TaskMetricRollup.max,
+        )
+        return list(self.session.execute(statement))
+
+    def increment(self, values: Iterable[MetricValue]):
+        """Account for new event metrics in the rollups of their buckets,
+        without reading the existing event metrics.
+
+        The values are combined per bucket beforehand, a single upsert
+        touching each bucket once."""
+        buckets: Dict[Tuple[int, TaskMetricRollupPeriod, datetime], list] = {}
+        for task_metric_id, effective_datetime, value in values:
+            for period in TaskMetricRollupPeriod:
+                key = (
+                    task_metric_id,
+                    period,
+                    period.get_bucket_start(effective_datetime),
+                )
+                bucket = buckets.setdefault(key, [0, 0, 0, value, value])
+                bucket[0] += 1
+                bucket[1] += value
+                bucket[2] += value * value
+                bucket[3] = min(bucket[3], value)
+                bucket[4] = max(bucket[4], value)
+
+        if not buckets:
+            return
+
+        statement = insert(TaskMetricRollup).values(
+            [
+                dict(
+                    task_metric_id=task_metric_id,
+                    period=period,
+                    bucket_start=bucket_start,
+                    count=count,
+                    sum=total,
+                    sum_of_squares=sum_of_squares,
+                    min=minimum,
+                    max=maximum,
+                )
+                for (task_metric_id, period, bucket_start), (
+                    count,
+                    total,
+                    sum_of_squares,
+                    minimum,
+                    maximum,
+                ) in buckets.items()
+            ]
+        )
+        excluded = statement.excluded
+        self.session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[
+                    TaskMetricRollup.task_metric_id,
+                    TaskMetricRollup.period,
+                    TaskMetricRollup.bucket_start,
+                ],
+                set_=dict(
+                    count=TaskMetricRollup.count + excluded.count,
+                    sum=TaskMetricRollup.sum + excluded.sum,
+                    sum_of_squares=(
+                        TaskMetricRollup.sum_of_squares + excluded.sum_of_squares
+                    ),
+                    min=case(
+                        (excluded.min < TaskMetricRollup.min, excluded.min),
+                        else_=TaskMetricRollup.min,
+                    ),
+                    max=case(
+                        (excluded.max > TaskMetricRollup.max, excluded.max),
+                        else_=TaskMetricRollup.max,
+                    ),
+                ),
+            )
+        )
+
+    def refresh(self, values: Iterable[MetricValue]):
+        """Recompute the buckets of the event metrics from the remaining ones,
+        as their extremes can't be decremented. Only the event metrics of
+        these buckets are read, through the index of their metric."""
+        buckets = {
+            (task_metric_id, period, period.get_bucket_start(effective_datetime))
+            for task_metric_id, effective_datetime, _ in values
+            for period in TaskMetricRollupPeriod
+        }
+
+        # In a stable order, concurrent refreshes locking the buckets alike
+        for task_metric_id, period, bucket_start in sorted(
+            buckets, key=lambda bucket: (bucket[0], bucket[1].value, bucket[2])
+        ):
+            self.session.execute(
+                delete(TaskMetricRollup).where(
+                    TaskMetricRollup.task_metric_id == task_metric_id,
+                    TaskMetricRollup.period == period,
+                    TaskMetricRollup.bucket_start == bucket_start,
+                )
+            )
+            self.session.execute(
+                insert(TaskMetricRollup).from_select(
+                    _ROLLUP_COLUMNS,
+                    _select_rollup(
+                        literal(task_metric_id),
+                        literal(period, TaskMetricRollup.period.type),
+                        literal(bucket_start, TaskMetricRollup.bucket_start.type),
+                    )
+                    .where(
+                        TaskEventMetric.task_metric_id == task_metric_id,
+                        TaskEventMetric.effective_datetime >= bucket_start,
+                        TaskEventMetric.effective_datetime
+                        < period.get_bucket_end(bucket_start),
+                    )
+                    # Empty buckets have no rollup
+                    .having(func.count() > 0),
+                )
+            )
+
+    def rebuild(self, *task_metric_ids: int):
+        """Recompute every rollup of the metrics from their event metrics"""
+        self.session.execute(
+            delete(TaskMetricRollup).where(
+                TaskMetricRollup.task_metric_id.in_(task_metric_ids)
+            )
+        )
+
+        for period in TaskMetricRollupPeriod:
+            bucket_start = func.date_trunc(
+                period.value, TaskEventMetric.effective_datetime
+            )
+            self.session.execute(
+                insert(TaskMetricRollup).from_select(
+                    _ROLLUP_COLUMNS,
+                    _select_rollup(
+                        TaskEventMetric.task_metric_id,
+                        literal(period, TaskMetricRollup.period.type),
+                        bucket_start,
+                    )
+                    .where(TaskEventMetric.task_metric_id.in_(task_metric_ids))
+                    .group_by(TaskEventMetric.task_metric_id, bucket_start),
+                )
+            )
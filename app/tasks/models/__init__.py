@@ -4,6 +4,7 @@ from app.tasks.models.task_event import TaskEvent
 from app.tasks.models.task_event_metric import TaskEventMetric
 from app.tasks.models.task_frequency import TaskFrequency
 from app.tasks.models.task_metric import TaskMetric
+from app.tasks.models.task_metric_rollup import TaskMetricRollup
 from app.tasks.models.task_until import TaskUntil
 
 __all__ = [
@@ -14,4 +15,5 @@ __all__ = [
     "Task",
     "TaskMetric",
     "TaskEventMetric",
+    "TaskMetricRollup",
 ]
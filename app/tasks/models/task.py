@@ -4,10 +4,22 @@ import enum
 from datetime import datetime
 from typing import TYPE_CHECKING, List, Optional
 
-from sqlalchemy import DateTime, Enum, ForeignKey, String, UniqueConstraint
+from sqlalchemy import (
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+    and_,
+    select,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
+from app.tasks.models.task_event import TaskEvent
 from app.tasks.models.task_frequency import FrequencyType
 
 if TYPE_CHECKING:
@@ -15,7 +27,6 @@ if TYPE_CHECKING:
     from app.tasks.models.task_metric import TaskMetric
 
     from .category import Category
-    from .task_event import TaskEvent
     from .task_frequency import TaskFrequency
     from .task_until import TaskUntil
 
@@ -26,10 +37,29 @@ class TaskStatus(enum.Enum):
     paused = "paused"
 
 
+# Used to only load the few latest events of a task instead of its whole history
+_latest_task_events = TaskEvent.__table__.alias("latest_task_events")
+
+
 class Task(Base):
     __tablename__ = "tasks"
     __table_args__ = (
         UniqueConstraint("user_id", "name", name="unique_user_task_name"),
+        # Task lists are filtered by status and ordered by next event
+        Index(
+            "ix_tasks_user_id_status_next_event_datetime",
+            "user_id",
+            "status",
+            "next_event_datetime",
+        ),
+        # Due tasks are only ever ongoing ones, and are read from the index alone
+        Index(
+            "ix_tasks_user_id_next_event_datetime_ongoing",
+            "user_id",
+            "next_event_datetime",
+            postgresql_where=text("status = 'ongoing'"),
+            postgresql_include=["id", "name", "category_id"],
+        ),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -41,7 +71,7 @@ class Task(Base):
     user: Mapped[User] = relationship(back_populates="tasks")
 
     category_id: Mapped[int | None] = mapped_column(
-        ForeignKey("categories.id", ondelete="SET NULL"), nullable=True
+        ForeignKey("categories.id", ondelete="SET NULL"), nullable=True, index=True
     )
     category: Mapped[Category | None] = relationship(back_populates="tasks")
 
@@ -73,11 +103,27 @@ class Task(Base):
         back_populates="task",
     )
 
+    # The full history is only loaded when explicitly accessed
     events: Mapped[List[TaskEvent]] = relationship(
         back_populates="task",
         cascade="all, delete-orphan",
         order_by="TaskEvent.effective_datetime.desc()",
-        lazy="joined",
+    )
+    latest_events: Mapped[List[TaskEvent]] = relationship(
+        primaryjoin=lambda: and_(
+            TaskEvent.task_id == Task.id,
+            TaskEvent.id.in_(
+                select(_latest_task_events.c.id)
+                .where(_latest_task_events.c.task_id == Task.id)
+                .order_by(
+                    _latest_task_events.c.effective_datetime.desc(),
+                    _latest_task_events.c.id.desc(),
+                )
+                .limit(2)
+            ),
+        ),
+        order_by=lambda: (TaskEvent.effective_datetime.desc(), TaskEvent.id.desc()),
+        viewonly=True,
     )
     metrics: Mapped[List[TaskMetric]] = relationship(
         back_populates="task", cascade="all, delete-orphan"
@@ -88,6 +134,23 @@ class Task(Base):
     )
     manually_completed_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
 
+    # Denormalised from the events, maintained by the TaskEventDao
+    event_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    latest_event_datetime: Mapped[datetime | None] = mapped_column(
+        DateTime, nullable=True
+    )
+    second_latest_event_datetime: Mapped[datetime | None] = mapped_column(
+        DateTime, nullable=True
+    )
+
+    # Bumped by every change the state depends on, so that a state computed
+    # from an older version of the task is never written over a newer one
+    state_version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+
     @property
     def is_pausable(self) -> bool:
         return (
@@ -97,21 +160,14 @@ class Task(Base):
 
     @property
     def latest_event(self) -> Optional[TaskEvent]:
-        # TODO join this directly as a relationship
         try:
-            return self.events[0]
+            return self.latest_events[0]
         except IndexError:
             return None
 
-    @property
-    def latest_event_datetime(self) -> Optional[datetime]:
-        if latest_event := self.latest_event:
-            return latest_event.effective_datetime
-
     @property
     def second_latest_event(self) -> Optional[TaskEvent]:
-        # TODO join this directly as a relationship
         try:
-            return self.events[1]
+            return self.latest_events[1]
         except IndexError:
             return None
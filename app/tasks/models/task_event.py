@@ -4,7 +4,7 @@ import enum
 from datetime import datetime
 from typing import TYPE_CHECKING, List
 
-from sqlalchemy import DateTime, Enum, ForeignKey
+from sqlalchemy import DDL, DateTime, Enum, ForeignKey, Index, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -22,23 +22,57 @@ class TaskEventAround(enum.Enum):
 
 class TaskEvent(Base):
     __tablename__ = "task_events"
+    __table_args__ = (
+        # Serves the events of a task, newest first, and its latest events
+        Index(
+            "ix_task_events_task_id_effective_datetime",
+            "task_id",
+            "effective_datetime",
+            "id",
+        ),
+        # Serve the history of a user, per task or across tasks, without
+        # joining the tasks
+        Index(
+            "ix_task_events_user_id_task_id_effective_datetime",
+            "user_id",
+            "task_id",
+            "effective_datetime",
+        ),
+        Index("ix_task_events_user_id_id", "user_id", "id"),
+        # A partition per month, see BaseDao.create_month_partition
+        {"postgresql_partition_by": "RANGE (effective_datetime)"},
+    )
 
-    id: Mapped[int] = mapped_column(primary_key=True)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     created: Mapped[datetime] = mapped_column(insert_default=datetime.utcnow)
 
     task_id: Mapped[int] = mapped_column(ForeignKey("tasks.id"), nullable=False)
     task: Mapped[Task] = relationship(back_populates="events")
 
+    # Denormalised from the task, set by the TaskEventDao
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+
     around: Mapped[TaskEventAround] = mapped_column(
         Enum(TaskEventAround), nullable=False
     )
     at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
 
-    # Computed from the created+around+at, but stored as it is static
-    effective_datetime: Mapped[datetime] = mapped_column(DateTime)
+    # Computed from the created+around+at, but stored as it is static.
+    # Part of the primary key as the table is partitioned by it
+    effective_datetime: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
 
     metrics: Mapped[List[TaskEventMetric]] = relationship(
         "TaskEventMetric",
         back_populates="task_event",
         cascade="delete,all",
     )
+
+
+# Holds the events outside of the monthly partitions
+event.listen(
+    TaskEvent.__table__,
+    "after_create",
+    DDL("CREATE TABLE task_events_default PARTITION OF task_events DEFAULT").execute_if(
+        dialect="postgresql"
+    ),
+)
@@ -1,9 +1,19 @@
 from __future__ import annotations
 
+from datetime import datetime
 from decimal import Decimal
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Float, ForeignKey, UniqueConstraint
+from sqlalchemy import (
+    DDL,
+    DateTime,
+    Float,
+    ForeignKey,
+    ForeignKeyConstraint,
+    Index,
+    UniqueConstraint,
+    event,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -17,20 +27,57 @@ class TaskEventMetric(Base):
     __tablename__ = "task_event_metrics"
     __table_args__ = (
         UniqueConstraint(
-            "task_metric_id", "task_event_id", name="unique_tast_event_metric"
+            "task_metric_id",
+            "task_event_id",
+            "effective_datetime",
+            name="unique_tast_event_metric",
         ),
+        ForeignKeyConstraint(
+            ["task_event_id", "effective_datetime"],
+            ["task_events.id", "task_events.effective_datetime"],
+            name="task_event_metrics_task_event_id_fkey",
+        ),
+        # Serves the metrics of an event, through the key of the event
+        Index(
+            "ix_task_event_metrics_task_event_id",
+            "task_event_id",
+            "effective_datetime",
+        ),
+        Index("ix_task_event_metrics_user_id_id", "user_id", "id"),
+        # Serves the aggregates of a metric over a range by index only scans
+        Index(
+            "ix_task_event_metrics_task_metric_id_effective_datetime",
+            "task_metric_id",
+            "effective_datetime",
+            postgresql_include=["value"],
+        ),
+        # Partitioned like the events, see BaseDao.create_month_partition
+        {"postgresql_partition_by": "RANGE (effective_datetime)"},
     )
 
-    id: Mapped[int] = mapped_column(primary_key=True)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
 
     task_metric_id: Mapped[int] = mapped_column(
         ForeignKey("task_metrics.id"), nullable=False
     )
     task_metric: Mapped[TaskMetric] = relationship(back_populates="metrics")
 
-    task_event_id: Mapped[int] = mapped_column(
-        ForeignKey("task_events.id"), nullable=False
-    )
+    task_event_id: Mapped[int] = mapped_column(nullable=False)
+    # Denormalised from the event, set along with the task_event_id
+    effective_datetime: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
     task_event: Mapped[TaskEvent] = relationship(back_populates="metrics")
 
+    # Denormalised from the task, set by the TaskEventMetricDao
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+
     value: Mapped[Decimal] = mapped_column(Float(asdecimal=True), nullable=False)
+
+
+# Holds the event metrics outside of the monthly partitions
+event.listen(
+    TaskEventMetric.__table__,
+    "after_create",
+    DDL(
+        "CREATE TABLE task_event_metrics_default PARTITION OF task_event_metrics DEFAULT"
+    ).execute_if(dialect="postgresql"),
+)
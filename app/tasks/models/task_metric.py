@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, List
 
-from sqlalchemy import Boolean, ForeignKey, String, UniqueConstraint
+from sqlalchemy import Boolean, ForeignKey, Index, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -10,12 +10,15 @@ from app.database import Base
 if TYPE_CHECKING:
     from .task import Task
     from .task_event_metric import TaskEventMetric
+    from .task_metric_rollup import TaskMetricRollup
 
 
 class TaskMetric(Base):
     __tablename__ = "task_metrics"
     __table_args__ = (
         UniqueConstraint("task_id", "name", name="unique_task_metric_name"),
+        Index("ix_task_metrics_user_id_id", "user_id", "id"),
+        Index("ix_task_metrics_user_id_name", "user_id", "name"),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -23,6 +26,9 @@ class TaskMetric(Base):
     task_id: Mapped[int] = mapped_column(ForeignKey("tasks.id"), nullable=False)
     task: Mapped[Task] = relationship(back_populates="metrics")
 
+    # Denormalised from the task, set by the TaskMetricDao
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+
     name: Mapped[str] = mapped_column(String(100), nullable=False)
     prompt: Mapped[str] = mapped_column(String(100), nullable=False)
     required: Mapped[bool] = mapped_column(Boolean, nullable=False)
@@ -32,3 +38,9 @@ class TaskMetric(Base):
         back_populates="task_metric",
         cascade="delete,all",
     )
+
+    rollups: Mapped[List[TaskMetricRollup]] = relationship(
+        "TaskMetricRollup",
+        back_populates="task_metric",
+        cascade="delete,all",
+    )
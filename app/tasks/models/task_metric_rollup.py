@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import enum
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from typing import TYPE_CHECKING
+
+from sqlalchemy import DateTime, Enum, Float, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.database import Base
+
+if TYPE_CHECKING:
+    from .task_metric import TaskMetric
+
+
+class TaskMetricRollupPeriod(enum.Enum):
+    day = "day"
+    # Starting on mondays, like date_trunc
+    week = "week"
+
+    def get_bucket_start(self, value: datetime) -> datetime:
+        start = datetime.combine(value.date(), time.min)
+        if self == TaskMetricRollupPeriod.week:
+            return start - timedelta(days=start.weekday())
+        return start
+
+    def get_bucket_end(self, bucket_start: datetime) -> datetime:
+        return bucket_start + timedelta(
+            days=7 if self == TaskMetricRollupPeriod.week else 1
+        )
+
+
+class TaskMetricRollup(Base):
+    """The values of a metric summarised over a day or week of their event
+    datetimes, maintained by the daos writing the event metrics"""
+
+    __tablename__ = "task_metric_rollups"
+
+    task_metric_id: Mapped[int] = mapped_column(
+        ForeignKey("task_metrics.id"), primary_key=True
+    )
+    task_metric: Mapped[TaskMetric] = relationship(back_populates="rollups")
+
+    period: Mapped[TaskMetricRollupPeriod] = mapped_column(
+        Enum(TaskMetricRollupPeriod), primary_key=True
+    )
+    bucket_start: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+
+    count: Mapped[int] = mapped_column(Integer, nullable=False)
+    sum: Mapped[Decimal] = mapped_column(Float(asdecimal=True), nullable=False)
+    # Along with the count and sum, gives the variance of the bucket
+    sum_of_squares: Mapped[Decimal] = mapped_column(
+        Float(asdecimal=True), nullable=False
+    )
+    min: Mapped[Decimal] = mapped_column(Float(asdecimal=True), nullable=False)
+    max: Mapped[Decimal] = mapped_column(Float(asdecimal=True), nullable=False)
@@ -4,7 +4,7 @@ import enum
 from datetime import date as _date
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Date, Enum, Integer
+from sqlalchemy import Date, Enum, Index, Integer, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -22,6 +22,14 @@ class UntilType(enum.Enum):
 
 class TaskUntil(Base):
     __tablename__ = "task_untils"
+    __table_args__ = (
+        # Only the date untils are looked up by date, by the completion sweep
+        Index(
+            "ix_task_untils_date",
+            "date",
+            postgresql_where=text("type = 'date'"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     type: Mapped[UntilType] = mapped_column(Enum(UntilType), nullable=False)
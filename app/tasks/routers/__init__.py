@@ -1,9 +1,12 @@
 from fastapi.routing import APIRouter
 
 from .category_router import router as category_router
+from .export_router import router as export_router
 from .task_event_metric_router import router as task_event_metric_router
 from .task_event_router import router as task_event_router
 from .task_metric_router import router as task_metric_router
+from .task_router import async_read_router as task_async_read_router
+from .task_router import read_router as task_read_router
 from .task_router import router as task_router
 
 router = APIRouter()
@@ -12,3 +15,6 @@ router.include_router(task_router)
 router.include_router(task_event_router)
 router.include_router(task_metric_router)
 router.include_router(task_event_metric_router)
+router.include_router(export_router)
+
+__all__ = ["router", "task_read_router", "task_async_read_router"]
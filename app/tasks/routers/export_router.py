@@ -0,0 +1,73 @@
+from typing import Iterator, List
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.accounts.models.user import User
+from app.auth.routers.dependencies import (
+    authenticated_user_required,
+    get_authenticated_user,
+)
+from app.database import SessionType, session_factory
+from app.shared.tools import gzip_chunks
+from app.tasks.schemas.export_schema import ExportFormat, ExportRecordType
+from app.tasks.services.export_service import service as export_service
+
+router = APIRouter(tags=["Export"], dependencies=[Depends(authenticated_user_required)])
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv",
+}
+
+
+def _closing(session: SessionType, chunks: Iterator[bytes]) -> Iterator[bytes]:
+    try:
+        yield from chunks
+    finally:
+        session.close()
+
+
+@router.get(
+    "/export",
+    status_code=200,
+    response_class=StreamingResponse,
+    description=(
+        "Stream the tasks, metrics, events and event metrics of the user, "
+        "gzipped when the client accepts it"
+    ),
+)
+def export_history(
+    request: Request,
+    export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+    record_types: List[ExportRecordType] = Query(
+        list(ExportRecordType), alias="record_type"
+    ),
+    authenticated_user: User = Depends(get_authenticated_user),
+) -> StreamingResponse:
+    # The session of the request is closed before the response is streamed,
+    # so the export reads through its own
+    session = session_factory()
+    try:
+        chunks = export_service.export_user_history(
+            session=session,
+            authenticated_user=authenticated_user,
+            export_format=export_format,
+            record_types=record_types,
+        )
+    except Exception:
+        session.close()
+        raise
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="export.{export_format.value}"'
+    }
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(
+        _closing(session, chunks),
+        media_type=MEDIA_TYPES[export_format],
+        headers=headers,
+    )
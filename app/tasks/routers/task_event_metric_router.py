@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from datetime import datetime
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, Path, Query
@@ -45,6 +46,8 @@ def create_task_event_metric(
 class TaskEventMetricFilters:
     task_event_id: Optional[int] = Query(None)
     task_metric_id: Optional[int] = Query(None)
+    effective_datetime_from: Optional[datetime] = Query(None)
+    effective_datetime_to: Optional[datetime] = Query(None)
 
 
 @router.get(
@@ -1,4 +1,6 @@
-from typing import List
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
 
 from fastapi import APIRouter, Depends, Path, Query
 
@@ -8,8 +10,17 @@ from app.auth.routers.dependencies import (
     get_authenticated_user,
 )
 from app.database import SessionType, get_session
+from app.shared.dao import CursorPagination, CursorPaginationFilters
+from app.shared.tools import as_dict
 from app.tasks.models.task_event import TaskEvent
-from app.tasks.schemas.task_event_schema import TaskEventCreationSchema, TaskEventSchema
+from app.tasks.schemas.task_event_schema import (
+    TaskEventBulkCreationSchema,
+    TaskEventCreationSchema,
+    TaskEventCursorPaginationSchema,
+    TaskEventSchema,
+    TaskEventWithMetricsCreationSchema,
+    TaskEventWithMetricsSchema,
+)
 from app.tasks.services.task_event_service import service as task_event_service
 
 router = APIRouter(
@@ -34,21 +45,67 @@ def create_task_event(
     )
 
 
+@router.post(
+    "/task-events/with-metrics",
+    response_model=TaskEventWithMetricsSchema,
+    status_code=201,
+    description="Create an event along with the values of the metrics of its task",
+)
+def create_task_event_with_metrics(
+    payload: TaskEventWithMetricsCreationSchema,
+    session: SessionType = Depends(get_session),
+    authenticated_user: User = Depends(get_authenticated_user),
+) -> TaskEvent:
+    return task_event_service.create_task_event_with_metrics(
+        session=session,
+        authenticated_user=authenticated_user,
+        task_event_with_metrics_creation_payload=payload,
+    )
+
+
+@router.post(
+    "/task-events/bulk",
+    response_model=List[TaskEventSchema],
+    status_code=201,
+    description="Create a batch of events, the state of each task being recomputed once",
+)
+def create_task_events(
+    payload: TaskEventBulkCreationSchema,
+    session: SessionType = Depends(get_session),
+    authenticated_user: User = Depends(get_authenticated_user),
+) -> List[TaskEvent]:
+    return task_event_service.create_task_events(
+        session=session,
+        authenticated_user=authenticated_user,
+        task_event_bulk_creation_payload=payload,
+    )
+
+
+@dataclass
+class TaskEventFilters:
+    # TODO maybe make task_id optionally to support stuff like "Get all events for this category for this period"
+    task_id: int = Query(...)
+    effective_datetime_from: Optional[datetime] = Query(None)
+    effective_datetime_to: Optional[datetime] = Query(None)
+
+
 @router.get(
     "/task-events",
-    response_model=List[TaskEventSchema],
+    response_model=TaskEventCursorPaginationSchema,
     status_code=200,
+    description="Get a page of events, most recent first, each page continuing from the cursor of the previous one",
 )
 def get_task_events(
-    # TODO maybe make task_id optionally to support stuff like "Get all events for this category for this period"
-    task_id: int = Query(...),
+    filters: TaskEventFilters = Depends(TaskEventFilters),
+    pagination: CursorPaginationFilters = Depends(CursorPaginationFilters),
     session: SessionType = Depends(get_session),
     authenticated_user: User = Depends(get_authenticated_user),
-) -> List[TaskEvent]:
-    return task_event_service.get_task_events(
+) -> CursorPagination[TaskEvent]:
+    return task_event_service.paginate_task_events(
         session=session,
         authenticated_user=authenticated_user,
-        task_id=task_id,
+        pagination=pagination,
+        **as_dict(filters),
     )
 
 
@@ -1,6 +1,9 @@
-from typing import List
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
 
 from fastapi import APIRouter, Depends, Path, Query
+from sqlalchemy.engine import Row
 
 from app.accounts.models.user import User
 from app.auth.routers.dependencies import (
@@ -8,9 +11,14 @@ from app.auth.routers.dependencies import (
     get_authenticated_user,
 )
 from app.database import SessionType, get_session
+from app.shared.tools import as_dict
 from app.tasks.models.task_metric import TaskMetric
+from app.tasks.models.task_metric_rollup import TaskMetricRollupPeriod
 from app.tasks.schemas.task_metric_schema import (
+    TaskMetricAggregateBucket,
+    TaskMetricAggregateSchema,
     TaskMetricCreationSchema,
+    TaskMetricRollupSchema,
     TaskMetricSchema,
 )
 from app.tasks.services.task_metric_service import service as task_metric_service
@@ -71,6 +79,67 @@ def get_task_metric(
     )
 
 
+@dataclass
+class TaskMetricAggregateFilters:
+    bucket: TaskMetricAggregateBucket = Query(...)
+    effective_datetime_from: Optional[datetime] = Query(None)
+    effective_datetime_to: Optional[datetime] = Query(None)
+
+
+@router.get(
+    "/task-metrics/{task_metric_id}/aggregates",
+    response_model=List[TaskMetricAggregateSchema],
+    status_code=200,
+    description=(
+        "Get the count, sum, average, extremes and percentiles of the values "
+        "of the metric per bucket of their event datetime, oldest first"
+    ),
+)
+def get_task_metric_aggregates(
+    task_metric_id: int = Path(),
+    filters: TaskMetricAggregateFilters = Depends(TaskMetricAggregateFilters),
+    session: SessionType = Depends(get_session),
+    authenticated_user: User = Depends(get_authenticated_user),
+) -> List[Row]:
+    return task_metric_service.get_task_metric_aggregates(
+        session=session,
+        authenticated_user=authenticated_user,
+        task_metric_id=task_metric_id,
+        **as_dict(filters),
+    )
+
+
+@dataclass
+class TaskMetricRollupFilters:
+    period: TaskMetricRollupPeriod = Query(...)
+    effective_datetime_from: Optional[datetime] = Query(None)
+    effective_datetime_to: Optional[datetime] = Query(None)
+
+
+@router.get(
+    "/task-metrics/{task_metric_id}/rollups",
+    response_model=List[TaskMetricRollupSchema],
+    status_code=200,
+    description=(
+        "Get the count, sum, average, standard deviation and extremes of the "
+        "values of the metric per day or week starting within the range, "
+        "oldest first, read from rollups maintained as the values change"
+    ),
+)
+def get_task_metric_rollups(
+    task_metric_id: int = Path(),
+    filters: TaskMetricRollupFilters = Depends(TaskMetricRollupFilters),
+    session: SessionType = Depends(get_session),
+    authenticated_user: User = Depends(get_authenticated_user),
+) -> List[Row]:
+    return task_metric_service.get_task_metric_rollups(
+        session=session,
+        authenticated_user=authenticated_user,
+        task_metric_id=task_metric_id,
+        **as_dict(filters),
+    )
+
+
 @router.delete(
     "/task-metrics/{task_metric_id}",
     response_model=None,
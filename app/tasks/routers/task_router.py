@@ -1,20 +1,28 @@
 from dataclasses import dataclass
+from datetime import datetime
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, Path
 from fastapi.param_functions import Query
+from sqlalchemy.engine import Row
 
 from app.accounts.models.user import User
 from app.auth.routers.dependencies import (
     authenticated_user_required,
     get_authenticated_user,
 )
-from app.database import SessionType, get_session
+from app.database import AsyncSessionType, SessionType, get_async_session, get_session
+from app.shared.dao import Pagination, PaginationFilters
+from app.shared.sentinels import NO_FILTER
 from app.shared.tools import as_dict
 from app.tasks.models.task import Task, TaskStatus
 from app.tasks.schemas.task_schema import (
     TaskCreationSchema,
+    TaskDue,
+    TaskDueSchema,
     TaskFrequencyCreationSchema,
+    TaskOccurrenceSchema,
+    TaskPaginationSchema,
     TaskSchema,
     TaskUntilCreationSchema,
 )
@@ -51,27 +59,110 @@ class TaskFilters:
     # By saying status=None is acceptable when it isn't, and the null value is not passed to the service
     status: TaskStatus = Query(None)
     category_id: Optional[int] = Query(None)
+    # The category or any of its descendants
+    category_tree_id: int = Query(None)
+    next_event_datetime_from: datetime = Query(None)
+    next_event_datetime_to: datetime = Query(None)
+    due: TaskDue = Query(None)
+
+
+def get_task_fields(
+    fields: str = Query(
+        None, description="Comma separated task fields to include in the items"
+    ),
+) -> Optional[List[str]]:
+    if fields is None:
+        return None
+
+    return [field.strip() for field in fields.split(",") if field.strip()]
+
+
+# Declared before /tasks/{task_id}, which would otherwise match them
+@router.get(
+    "/tasks/due",
+    status_code=200,
+    response_model=List[TaskDueSchema],
+    description="Get the earliest ongoing tasks due, by next event datetime",
+)
+def get_due_tasks(
+    due: TaskDue = Query(),
+    within_hours: int = Query(
+        24, ge=1, le=24 * 31, description="The window of the upcoming tasks"
+    ),
+    limit: int = Query(50, ge=1, le=500),
+    session: SessionType = Depends(get_session),
+    authenticated_user: User = Depends(get_authenticated_user),
+) -> List[Row]:
+    return task_service.get_due_tasks(
+        session=session,
+        authenticated_user=authenticated_user,
+        due=due,
+        within_hours=within_hours,
+        limit=limit,
+    )
 
 
 @router.get(
+    "/tasks/occurrences",
+    status_code=200,
+    response_model=List[TaskOccurrenceSchema],
+    description=(
+        "Get the upcoming occurrences of the ongoing tasks within the range, "
+        "in chronological order"
+    ),
+)
+def get_task_occurrences(
+    start: datetime = Query(None, description="Defaults to now"),
+    end: datetime = Query(None),
+    task_id: int = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+    session: SessionType = Depends(get_session),
+    authenticated_user: User = Depends(get_authenticated_user),
+) -> List[dict]:
+    return task_service.get_task_occurrences(
+        session=session,
+        authenticated_user=authenticated_user,
+        start=start,
+        end=end,
+        task_id=task_id if task_id is not None else NO_FILTER,
+        limit=limit,
+    )
+
+
+# The reads of the tasks, create_app including either the sync or the async
+# variant depending on ASYNC_DATABASE_ENABLED, after the routes above
+read_router = APIRouter(
+    tags=["Tasks"], dependencies=[Depends(authenticated_user_required)]
+)
+async_read_router = APIRouter(
+    tags=["Tasks"], dependencies=[Depends(authenticated_user_required)]
+)
+
+
+@read_router.get(
     "/tasks",
     status_code=200,
-    response_model=List[TaskSchema],
-    description="Get all tasks",
+    response_model=TaskPaginationSchema,
+    description="Get a page of tasks, optionally with a subset of their fields",
 )
 def get_tasks(
     session: SessionType = Depends(get_session),
     filters: TaskFilters = Depends(TaskFilters),
+    pagination: PaginationFilters = Depends(PaginationFilters),
+    fields: Optional[List[str]] = Depends(get_task_fields),
     authenticated_user: User = Depends(get_authenticated_user),
-) -> List[Task]:
-    return task_service.get_tasks(
+) -> TaskPaginationSchema:
+    page: Pagination[Task] = task_service.paginate_tasks(
         session=session,
         authenticated_user=authenticated_user,
+        pagination=pagination,
         **as_dict(filters),
+        **({"fields": fields} if fields is not None else {}),
     )
+    return TaskPaginationSchema.from_pagination(page, fields=fields)
 
 
-@router.get(
+@read_router.get(
     "/tasks/{task_id}",
     status_code=200,
     response_model=TaskSchema,
@@ -89,6 +180,50 @@ def get_task(
     )
 
 
+# Named like their sync variants, keeping the same operation ids
+@async_read_router.get(
+    "/tasks",
+    name="get_tasks",
+    status_code=200,
+    response_model=TaskPaginationSchema,
+    description="Get a page of tasks, optionally with a subset of their fields",
+)
+async def get_tasks_async(
+    session: AsyncSessionType = Depends(get_async_session),
+    filters: TaskFilters = Depends(TaskFilters),
+    pagination: PaginationFilters = Depends(PaginationFilters),
+    fields: Optional[List[str]] = Depends(get_task_fields),
+    authenticated_user: User = Depends(get_authenticated_user),
+) -> TaskPaginationSchema:
+    page: Pagination[Task] = await task_service.paginate_tasks_async(
+        session=session,
+        authenticated_user=authenticated_user,
+        pagination=pagination,
+        **as_dict(filters),
+        **({"fields": fields} if fields is not None else {}),
+    )
+    return TaskPaginationSchema.from_pagination(page, fields=fields)
+
+
+@async_read_router.get(
+    "/tasks/{task_id}",
+    name="get_task",
+    status_code=200,
+    response_model=TaskSchema,
+    description="Get the given task",
+)
+async def get_task_async(
+    task_id: int = Path(),
+    session: AsyncSessionType = Depends(get_async_session),
+    authenticated_user: User = Depends(get_authenticated_user),
+) -> Task:
+    return await task_service.get_task_async(
+        task_id=task_id,
+        session=session,
+        authenticated_user=authenticated_user,
+    )
+
+
 @router.delete(
     "/tasks/{task_id}",
     status_code=204,
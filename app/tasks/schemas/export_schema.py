@@ -0,0 +1,14 @@
+import enum
+
+
+class ExportFormat(str, enum.Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+class ExportRecordType(str, enum.Enum):
+    # In the order they are exported, each record following the ones it references
+    task = "task"
+    task_metric = "task_metric"
+    task_event = "task_event"
+    task_event_metric = "task_event_metric"
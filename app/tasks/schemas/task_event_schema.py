@@ -1,11 +1,13 @@
 from datetime import datetime
-from typing import Annotated, Optional
+from decimal import Decimal
+from typing import Annotated, List, Optional
 
-from pydantic import BaseModel, model_validator
+from pydantic import BaseModel, Field, model_validator
 from pydantic_core import PydanticCustomError
 
-from app.shared.tools import datetime_serialiser
+from app.shared.tools import datetime_serialiser, decimal_serializer
 from app.tasks.models.task_event import TaskEventAround
+from app.tasks.schemas.task_event_metric_schema import TaskEventMetricSchema
 
 
 class TaskEventCreationSchema(BaseModel):
@@ -30,7 +32,46 @@ class TaskEventCreationSchema(BaseModel):
         return self
 
 
+class TaskEventBulkCreationSchema(BaseModel):
+    events: List[TaskEventCreationSchema] = Field(..., min_length=1, max_length=1000)
+
+
+class TaskEventMetricValueSchema(BaseModel):
+    task_metric_id: int
+    value: Annotated[Decimal, decimal_serializer] = Field(decimal_places=2)
+
+
+class TaskEventWithMetricsCreationSchema(TaskEventCreationSchema):
+    metrics: List[TaskEventMetricValueSchema] = Field(default_factory=list)
+
+    @model_validator(mode="after")
+    def validate_metrics(self):
+        task_metric_ids = [metric.task_metric_id for metric in self.metrics]
+        if len(set(task_metric_ids)) != len(task_metric_ids):
+            raise PydanticCustomError(
+                "duplicate_metric",
+                "Unexpected value set: A metric can only be given one value",
+            )
+
+        return self
+
+
 class TaskEventSchema(TaskEventCreationSchema):
     id: int
     effective_datetime: Annotated[datetime, datetime_serialiser]
     created: Annotated[datetime, datetime_serialiser]
+
+
+class TaskEventWithMetricsSchema(TaskEventSchema):
+    metrics: List[TaskEventMetricSchema]
+
+
+class TaskEventCursorPaginationSchema(BaseModel):
+    per_page: int
+    # Only counted when requested with_total
+    total: Optional[int]
+    has_prev: bool
+    has_next: bool
+    prev_cursor: Optional[str]
+    next_cursor: Optional[str]
+    items: List[TaskEventSchema]
@@ -1,5 +1,11 @@
-from pydantic import BaseModel, Field
+import enum
+import math
+from datetime import datetime
+from typing import Annotated
 
+from pydantic import BaseModel, Field, computed_field
+
+from app.shared.tools import datetime_serialiser
 from app.tasks.models.task_metric import TaskMetric
 
 
@@ -12,3 +18,47 @@ class TaskMetricCreationSchema(BaseModel):
 
 class TaskMetricSchema(TaskMetricCreationSchema):
     id: int
+
+
+class TaskMetricAggregateBucket(str, enum.Enum):
+    day = "day"
+    # Starting on mondays
+    week = "week"
+    month = "month"
+
+
+class TaskMetricAggregateSchema(BaseModel):
+    """The values of a metric aggregated over a bucket of their event datetimes"""
+
+    bucket: Annotated[datetime, datetime_serialiser]
+    count: int
+    sum: float
+    avg: float
+    min: float
+    max: float
+    p50: float
+    p90: float
+    p99: float
+
+
+class TaskMetricRollupSchema(BaseModel):
+    """The values of a metric summarised over a day or week of their event
+    datetimes, read from the maintained rollups"""
+
+    bucket: Annotated[datetime, datetime_serialiser]
+    count: int
+    sum: float
+    sum_of_squares: float
+    min: float
+    max: float
+
+    @computed_field
+    @property
+    def avg(self) -> float:
+        return self.sum / self.count
+
+    @computed_field
+    @property
+    def stddev(self) -> float:
+        # The population standard deviation, clamped against rounding errors
+        return math.sqrt(max(self.sum_of_squares / self.count - self.avg**2, 0))
@@ -1,12 +1,15 @@
+import enum
 from datetime import date as _date
 from datetime import datetime, time
-from typing import Annotated, Optional
+from functools import lru_cache
+from typing import Annotated, Any, Dict, List, Optional, Tuple, Type
 
-from pydantic import model_validator
+from pydantic import create_model, model_validator
 from pydantic.fields import Field
 from pydantic.main import BaseModel
 from pydantic_core import PydanticCustomError
 
+from app.shared.dao import Pagination
 from app.shared.tools import datetime_serialiser
 from app.tasks.models.task import Task
 from app.tasks.models.task_frequency import FrequencyPeriod, FrequencyType, Weekday
@@ -217,3 +220,75 @@ class TaskSchema(TaskCreationSchema):
     frequency: TaskFrequencySchema
     until: TaskUntilSchema
     next_event_datetime: Optional[datetime] = None
+
+
+class TaskDue(str, enum.Enum):
+    overdue = "overdue"
+    today = "today"
+    # Within the next hours
+    upcoming = "upcoming"
+    this_week = "this_week"
+
+
+class TaskDueSchema(BaseModel):
+    """The few columns of a due task listed on the home screen"""
+
+    id: int
+    name: str
+    category_id: Optional[int] = None
+    next_event_datetime: datetime
+
+
+class TaskOccurrenceSchema(BaseModel):
+    task_id: int
+    occurrence_datetime: datetime
+
+
+@lru_cache
+def get_sparse_task_schema(fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """A TaskSchema restricted to the given fields"""
+    return create_model(
+        "SparseTaskSchema",
+        **{
+            field: (TaskSchema.model_fields[field].annotation, field_info)
+            for field, field_info in TaskSchema.model_fields.items()
+            if field in fields
+        },
+    )
+
+
+class TaskPaginationSchema(BaseModel):
+    page: int
+    per_page: int
+    total: Optional[int]
+    total_is_estimate: bool
+    pages: Optional[int]
+    has_prev: bool
+    has_next: bool
+    prev_num: Optional[int]
+    next_num: Optional[int]
+    # Serialised TaskSchema, restricted to the requested fields if any
+    items: List[Dict[str, Any]]
+
+    @classmethod
+    def from_pagination(
+        cls, pagination: Pagination[Task], fields: Optional[List[str]] = None
+    ) -> "TaskPaginationSchema":
+        schema = get_sparse_task_schema(tuple(fields)) if fields else TaskSchema
+        return cls(
+            page=pagination.page,
+            per_page=pagination.per_page,
+            total=pagination.total,
+            total_is_estimate=pagination.total_is_estimate,
+            pages=pagination.pages,
+            has_prev=pagination.has_prev,
+            has_next=pagination.has_next,
+            prev_num=pagination.prev_num,
+            next_num=pagination.next_num,
+            items=[
+                schema.model_validate(task, from_attributes=True).model_dump(
+                    mode="json"
+                )
+                for task in pagination.items
+            ],
+        )
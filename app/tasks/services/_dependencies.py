@@ -3,9 +3,9 @@ from typing import Callable
 from fast_depends import Depends
 
 from app.accounts.models.user import User
-from app.database import SessionType
+from app.database import AsyncSessionType, SessionType
 from app.tasks.daos.category_dao import CategoryDao
-from app.tasks.daos.task_dao import TaskDao
+from app.tasks.daos.task_dao import AsyncTaskDao, TaskDao
 
 
 def get_category_dao(session: SessionType = Depends):
@@ -16,6 +16,10 @@ def get_task_dao(session: SessionType = Depends):
     return TaskDao(session=session)
 
 
+def get_async_task_dao(session: AsyncSessionType = Depends):
+    return AsyncTaskDao(session=session)
+
+
 def get_task(
     session: SessionType = Depends,
     authenticated_user: User = Depends,
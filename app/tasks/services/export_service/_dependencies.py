@@ -0,0 +1,15 @@
+from typing import List
+
+from app.shared.exceptions import ServiceValidationError
+from app.tasks.schemas.export_schema import ExportFormat, ExportRecordType
+
+
+def validate_export_record_types_for_format(
+    export_format: ExportFormat, record_types: List[ExportRecordType]
+):
+    if not record_types:
+        raise ServiceValidationError("At least one record type should be exported")
+
+    if export_format == ExportFormat.csv and len(record_types) != 1:
+        # The columns differ from a record type to another
+        raise ServiceValidationError("A csv export should contain a single record type")
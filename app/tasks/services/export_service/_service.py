@@ -0,0 +1,61 @@
+from typing import Iterator, List
+
+from fast_depends import Depends, inject
+
+from app.accounts.models.user import User
+from app.database import SessionType
+from app.tasks.daos.task_dao import TaskDao
+from app.tasks.daos.task_event_dao import TaskEventDao
+from app.tasks.daos.task_event_metric_dao import TaskEventMetricDao
+from app.tasks.daos.task_metric_dao import TaskMetricDao
+from app.tasks.schemas.export_schema import ExportFormat, ExportRecordType
+from app.tasks.services._dependencies import get_task_dao
+from app.tasks.services.export_service._dependencies import (
+    validate_export_record_types_for_format,
+)
+from app.tasks.services.export_service._utils import (
+    iter_chunks,
+    iter_csv_lines,
+    iter_ndjson_lines,
+    iter_records,
+)
+from app.tasks.services.task_event_metric_service._dependencies import (
+    get_task_event_metric_dao,
+)
+from app.tasks.services.task_event_service._dependencies import get_task_event_dao
+from app.tasks.services.task_metric_service._dependencies import get_task_metric_dao
+
+
+@inject(extra_dependencies=[Depends(validate_export_record_types_for_format)])
+def _export_user_history(
+    session: SessionType = Depends,
+    authenticated_user: User = Depends,
+    export_format: ExportFormat = Depends,
+    record_types: List[ExportRecordType] = Depends,
+    batch_size: int = 1000,
+    chunk_size: int = 64 * 1024,
+    # Injected
+    task_dao: TaskDao = Depends(get_task_dao),
+    task_metric_dao: TaskMetricDao = Depends(get_task_metric_dao),
+    task_event_dao: TaskEventDao = Depends(get_task_event_dao),
+    task_event_metric_dao: TaskEventMetricDao = Depends(get_task_event_metric_dao),
+) -> Iterator[bytes]:
+    # Nothing is read until the lines are iterated over
+    records = iter_records(
+        daos={
+            ExportRecordType.task: task_dao,
+            ExportRecordType.task_metric: task_metric_dao,
+            ExportRecordType.task_event: task_event_dao,
+            ExportRecordType.task_event_metric: task_event_metric_dao,
+        },
+        record_types=record_types,
+        user_id=authenticated_user.id,
+        batch_size=batch_size,
+    )
+
+    if export_format == ExportFormat.csv:
+        lines = iter_csv_lines(record_type=record_types[0], records=records)
+    else:
+        lines = iter_ndjson_lines(records)
+
+    return iter_chunks(lines, chunk_size=chunk_size)
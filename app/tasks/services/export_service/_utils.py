@@ -0,0 +1,107 @@
+import csv
+import io
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Type
+
+from pydantic import BaseModel
+
+from app.shared.dao import BaseDao
+from app.tasks.schemas.export_schema import ExportRecordType
+from app.tasks.schemas.task_event_metric_schema import TaskEventMetricSchema
+from app.tasks.schemas.task_event_schema import TaskEventSchema
+from app.tasks.schemas.task_metric_schema import TaskMetricSchema
+from app.tasks.schemas.task_schema import TaskSchema
+
+RECORD_SCHEMAS: Dict[ExportRecordType, Type[BaseModel]] = {
+    ExportRecordType.task: TaskSchema,
+    ExportRecordType.task_metric: TaskMetricSchema,
+    ExportRecordType.task_event: TaskEventSchema,
+    ExportRecordType.task_event_metric: TaskEventMetricSchema,
+}
+
+
+def serialise_record(record_type: ExportRecordType, instance: Any) -> Dict[str, Any]:
+    schema = RECORD_SCHEMAS[record_type]
+    return schema.model_validate(instance, from_attributes=True).model_dump(mode="json")
+
+
+def iter_records(
+    daos: Dict[ExportRecordType, BaseDao],
+    record_types: List[ExportRecordType],
+    user_id: int,
+    batch_size: int,
+) -> Iterator[Tuple[ExportRecordType, Dict[str, Any]]]:
+    # Exported in the declaration order of the record types, whatever the requested order
+    for record_type in ExportRecordType:
+        if record_type not in record_types:
+            continue
+
+        for instance in daos[record_type].stream(
+            user_id=user_id, batch_size=batch_size
+        ):
+            yield record_type, serialise_record(record_type, instance)
+
+
+def get_csv_columns(schema: Type[BaseModel], prefix: str = "") -> List[str]:
+    """The field names of the schema, nested schemas being flattened as parent.child"""
+    columns = []
+    for name, field_info in schema.model_fields.items():
+        annotation = field_info.annotation
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            columns.extend(get_csv_columns(annotation, prefix=f"{prefix}{name}."))
+        else:
+            columns.append(f"{prefix}{name}")
+
+    return columns
+
+
+def flatten_record(record: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    flattened = {}
+    for name, value in record.items():
+        if isinstance(value, dict):
+            flattened.update(flatten_record(value, prefix=f"{prefix}{name}."))
+        else:
+            flattened[f"{prefix}{name}"] = value
+
+    return flattened
+
+
+def iter_ndjson_lines(
+    records: Iterable[Tuple[ExportRecordType, Dict[str, Any]]],
+) -> Iterator[str]:
+    for record_type, record in records:
+        yield json.dumps({"type": record_type.value, **record}) + "\n"
+
+
+def iter_csv_lines(
+    record_type: ExportRecordType,
+    records: Iterable[Tuple[ExportRecordType, Dict[str, Any]]],
+) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(
+        buffer, fieldnames=get_csv_columns(RECORD_SCHEMAS[record_type])
+    )
+
+    writer.writeheader()
+    for _, record in records:
+        writer.writerow(flatten_record(record))
+        # Each line is handed over as soon as it is written
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def iter_chunks(lines: Iterable[str], chunk_size: int) -> Iterator[bytes]:
+    """Group the lines in chunks of about chunk_size bytes"""
+    chunk, size = [], 0
+    for line in lines:
+        encoded = line.encode()
+        chunk.append(encoded)
+        size += len(encoded)
+
+        if size >= chunk_size:
+            yield b"".join(chunk)
+            chunk, size = [], 0
+
+    if chunk:
+        yield b"".join(chunk)
@@ -0,0 +1,25 @@
+from typing import Iterator, List
+
+from app.accounts.models.user import User
+from app.database import SessionType
+from app.tasks.schemas.export_schema import ExportFormat, ExportRecordType
+
+from ._service import _export_user_history
+
+
+def export_user_history(
+    session: SessionType,
+    authenticated_user: User,
+    export_format: ExportFormat,
+    record_types: List[ExportRecordType],
+    batch_size: int = 1000,
+    chunk_size: int = 64 * 1024,
+) -> Iterator[bytes]:
+    return _export_user_history(
+        session=session,
+        authenticated_user=authenticated_user,
+        export_format=export_format,
+        record_types=record_types,
+        batch_size=batch_size,
+        chunk_size=chunk_size,
+    )
@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import List
 
 from fast_depends import Depends, inject
@@ -6,6 +7,7 @@ from app.accounts.models.user import User
 from app.database import SessionType
 from app.shared.sentinels import NO_FILTER, OptionalFilter
 from app.tasks.daos.task_event_metric_dao import TaskEventMetricDao
+from app.tasks.models.task_event import TaskEvent
 from app.tasks.models.task_event_metric import TaskEventMetric
 from app.tasks.schemas.task_event_metric_schema import TaskEventMetricCreationSchema
 from app.tasks.services.task_event_metric_service._dependencies import (
@@ -20,7 +22,6 @@ from app.tasks.services.task_event_metric_service._dependencies import (
 @inject(
     extra_dependencies=[
         Depends(get_task_metric_from_task_event_metric_creation_payload),
-        Depends(get_task_event_from_task_event_metric_creation_payload),
         Depends(
             validate_task_metric_and_task_event_are_same_task_in_task_event_metric_creation_payload
         ),
@@ -31,14 +32,20 @@ from app.tasks.services.task_event_metric_service._dependencies import (
 )
 def _create_task_event_metric(
     session: SessionType,
+    authenticated_user: User,
     task_event_metric_creation_payload: TaskEventMetricCreationSchema,
     # Injected
+    task_event: TaskEvent = Depends(
+        get_task_event_from_task_event_metric_creation_payload
+    ),
     task_event_metric_dao: TaskEventMetricDao = Depends(get_task_event_metric_dao),
 ) -> TaskEventMetric:
     # TODO maybe consider max number of task event metrics for a given task metric?
     task_event_metric = task_event_metric_dao.create(
         task_metric_id=task_event_metric_creation_payload.task_metric_id,
-        task_event_id=task_event_metric_creation_payload.task_event_id,
+        task_event_id=task_event.id,
+        effective_datetime=task_event.effective_datetime,
+        user_id=authenticated_user.id,
         value=task_event_metric_creation_payload.value,
     )
     session.commit()
@@ -63,6 +70,8 @@ def _get_task_event_metrics(
     authenticated_user: User,
     task_event_id: OptionalFilter[int] = NO_FILTER,
     task_metric_id: OptionalFilter[int] = NO_FILTER,
+    effective_datetime_from: OptionalFilter[datetime] = NO_FILTER,
+    effective_datetime_to: OptionalFilter[datetime] = NO_FILTER,
     # Injected
     task_event_metric_dao: TaskEventMetricDao = Depends(get_task_event_metric_dao),
 ) -> List[TaskEventMetric]:
@@ -70,6 +79,8 @@ def _get_task_event_metrics(
         user_id=authenticated_user.id,
         task_event_id=task_event_id,
         task_metric_id=task_metric_id,
+        effective_datetime_from=effective_datetime_from,
+        effective_datetime_to=effective_datetime_to,
     )
 
 
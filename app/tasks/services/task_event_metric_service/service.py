@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import List
 
 from app.accounts.models.user import User
@@ -43,12 +44,16 @@ def get_task_event_metrics(
     authenticated_user: User,
     task_event_id: OptionalFilter[int] = NO_FILTER,
     task_metric_id: OptionalFilter[int] = NO_FILTER,
+    effective_datetime_from: OptionalFilter[datetime] = NO_FILTER,
+    effective_datetime_to: OptionalFilter[datetime] = NO_FILTER,
 ) -> List[TaskEventMetric]:
     return _get_task_event_metrics(
         session=session,
         authenticated_user=authenticated_user,
         task_event_id=task_event_id,
         task_metric_id=task_metric_id,
+        effective_datetime_from=effective_datetime_from,
+        effective_datetime_to=effective_datetime_to,
     )
 
 
@@ -0,0 +1 @@
+import app.tasks.services.task_event_service.tasks  # noqa
@@ -1,19 +1,86 @@
 from datetime import datetime
 
+from fast_depends import Depends
+from sqlalchemy.exc import NoResultFound
+
+from app.accounts.models.user import User
 from app.database import SessionType
+from app.shared.exceptions import ServiceValidationError
+from app.tasks.daos.task_dao import TaskDao
 from app.tasks.daos.task_event_dao import TaskEventDao
-from app.tasks.schemas.task_event_schema import TaskEventCreationSchema
+from app.tasks.daos.task_event_metric_dao import TaskEventMetricDao
+from app.tasks.daos.task_metric_dao import TaskMetricDao
+from app.tasks.schemas.task_event_schema import (
+    TaskEventBulkCreationSchema,
+    TaskEventCreationSchema,
+    TaskEventWithMetricsCreationSchema,
+)
+from app.tasks.services._dependencies import get_task_dao
+from app.tasks.services.task_metric_service._dependencies import get_task_metric_dao
 
 
 def get_task_event_dao(session: SessionType) -> TaskEventDao:
     return TaskEventDao(session=session)
 
 
+def get_task_event_metric_dao(session: SessionType) -> TaskEventMetricDao:
+    return TaskEventMetricDao(session=session)
+
+
 def get_task_id_from_task_event_creation_payload(
     task_event_creation_payload: TaskEventCreationSchema,
 ) -> int:
     return task_event_creation_payload.task_id
 
 
+def get_task_id_from_task_event_with_metrics_creation_payload(
+    task_event_with_metrics_creation_payload: TaskEventWithMetricsCreationSchema,
+) -> int:
+    return task_event_with_metrics_creation_payload.task_id
+
+
+def validate_task_metrics_in_task_event_with_metrics_creation_payload(
+    task_event_with_metrics_creation_payload: TaskEventWithMetricsCreationSchema,
+    task_metric_dao: TaskMetricDao = Depends(get_task_metric_dao),
+):
+    # All the metrics of the task, in a single query
+    task_metrics = task_metric_dao.list(
+        task_id=task_event_with_metrics_creation_payload.task_id
+    )
+    given_task_metric_ids = {
+        metric.task_metric_id
+        for metric in task_event_with_metrics_creation_payload.metrics
+    }
+
+    if given_task_metric_ids - {task_metric.id for task_metric in task_metrics}:
+        raise ServiceValidationError(
+            "Task metric and event aren't related to the same task"
+        )
+
+    missing_names = [
+        task_metric.name
+        for task_metric in task_metrics
+        if task_metric.required and task_metric.id not in given_task_metric_ids
+    ]
+    if missing_names:
+        raise ServiceValidationError(
+            f"Missing values for the required metrics: {', '.join(missing_names)}"
+        )
+
+
+def validate_tasks_are_visible_for_task_event_bulk_creation(
+    task_event_bulk_creation_payload: TaskEventBulkCreationSchema,
+    authenticated_user: User,
+    task_dao: TaskDao = Depends(get_task_dao),
+):
+    task_ids = {event.task_id for event in task_event_bulk_creation_payload.events}
+    visible_count = task_dao.count(
+        task_dao.query(ids=list(task_ids), user_id=authenticated_user.id)
+    )
+
+    if visible_count != len(task_ids):
+        raise NoResultFound("Task not found")
+
+
 def get_now_datetime() -> datetime:
     return datetime.utcnow()
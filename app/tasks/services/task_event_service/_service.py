@@ -1,22 +1,34 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import List
 
 from fast_depends import Depends, inject
 
 from app.accounts.models.user import User
 from app.database import SessionType
+from app.shared.dao import CursorPagination, CursorPaginationFilters
+from app.shared.sentinels import NO_FILTER, OptionalFilter
+from app.tasks.daos.task_dao import TaskDao
 from app.tasks.daos.task_event_dao import TaskEventDao
+from app.tasks.daos.task_event_metric_dao import TaskEventMetricDao
 from app.tasks.models.task_event import TaskEvent
-from app.tasks.schemas.task_event_schema import TaskEventCreationSchema
-from app.tasks.services._dependencies import get_task_factory
+from app.tasks.schemas.task_event_schema import (
+    TaskEventBulkCreationSchema,
+    TaskEventCreationSchema,
+    TaskEventWithMetricsCreationSchema,
+)
+from app.tasks.services._dependencies import get_task_dao, get_task_factory
 from app.tasks.services.task_event_service._dependencies import (
     get_now_datetime,
     get_task_event_dao,
+    get_task_event_metric_dao,
     get_task_id_from_task_event_creation_payload,
+    get_task_id_from_task_event_with_metrics_creation_payload,
+    validate_task_metrics_in_task_event_with_metrics_creation_payload,
+    validate_tasks_are_visible_for_task_event_bulk_creation,
 )
 
 from ._utils import compute_effective_datetime
-from .signals import task_event_created, task_event_deleted
+from .signals import task_event_created, task_event_deleted, task_events_bulk_created
 
 
 @inject(
@@ -34,6 +46,7 @@ def _create_task_event(
 ) -> TaskEvent:
     task_event = task_event_dao.create(
         task_id=task_event_creation_payload.task_id,
+        user_id=authenticated_user.id,
         around=task_event_creation_payload.around,
         at=task_event_creation_payload.at,
         created=now,
@@ -51,6 +64,96 @@ def _create_task_event(
     return task_event
 
 
+@inject(
+    extra_dependencies=[
+        Depends(
+            get_task_factory(get_task_id_from_task_event_with_metrics_creation_payload)
+        ),
+        Depends(validate_task_metrics_in_task_event_with_metrics_creation_payload),
+    ]
+)
+def _create_task_event_with_metrics(
+    session: SessionType = Depends,
+    authenticated_user: User = Depends,
+    task_event_with_metrics_creation_payload: TaskEventWithMetricsCreationSchema = Depends,
+    # Injected
+    task_event_dao: TaskEventDao = Depends(get_task_event_dao),
+    task_event_metric_dao: TaskEventMetricDao = Depends(get_task_event_metric_dao),
+    now: datetime = Depends(get_now_datetime),
+) -> TaskEvent:
+    # The event and its metrics are committed together
+    task_event = task_event_dao.create(
+        task_id=task_event_with_metrics_creation_payload.task_id,
+        user_id=authenticated_user.id,
+        around=task_event_with_metrics_creation_payload.around,
+        at=task_event_with_metrics_creation_payload.at,
+        created=now,
+        effective_datetime=compute_effective_datetime(
+            task_event_creation_payload=task_event_with_metrics_creation_payload,
+            created=now,
+        ),
+    )
+    if task_event_with_metrics_creation_payload.metrics:
+        task_event_metric_dao.bulk_create(
+            [
+                dict(
+                    task_metric_id=metric.task_metric_id,
+                    task_event_id=task_event.id,
+                    effective_datetime=task_event.effective_datetime,
+                    user_id=authenticated_user.id,
+                    value=metric.value,
+                )
+                for metric in task_event_with_metrics_creation_payload.metrics
+            ]
+        )
+    session.commit()
+    task_event_created.send(
+        session=session,
+        task_id=task_event.task_id,
+        authenticated_user=authenticated_user,
+    )
+    return task_event
+
+
+@inject(
+    extra_dependencies=[
+        Depends(validate_tasks_are_visible_for_task_event_bulk_creation),
+    ]
+)
+def _create_task_events(
+    session: SessionType = Depends,
+    authenticated_user: User = Depends,
+    task_event_bulk_creation_payload: TaskEventBulkCreationSchema = Depends,
+    # Injected
+    task_event_dao: TaskEventDao = Depends(get_task_event_dao),
+    now: datetime = Depends(get_now_datetime),
+) -> List[TaskEvent]:
+    task_events = task_event_dao.bulk_create(
+        [
+            dict(
+                task_id=payload.task_id,
+                user_id=authenticated_user.id,
+                around=payload.around,
+                at=payload.at,
+                created=now,
+                effective_datetime=compute_effective_datetime(
+                    task_event_creation_payload=payload,
+                    created=now,
+                ),
+            )
+            for payload in task_event_bulk_creation_payload.events
+        ]
+    )
+    session.commit()
+    # A single recompute per task, however many events it received
+    task_events_bulk_created.send(
+        session=session,
+        task_ids=sorted({task_event.task_id for task_event in task_events}),
+        authenticated_user=authenticated_user,
+    )
+    return task_events
+
+
 @inject
 def _delete_task_event(
     session: SessionType = Depends,
@@ -83,7 +186,78 @@ def _get_task_event(
 def _get_task_events(
     authenticated_user: User = Depends,
     task_id: int = Depends,
+    effective_datetime_from: OptionalFilter[datetime] = NO_FILTER,
+    effective_datetime_to: OptionalFilter[datetime] = NO_FILTER,
     # Injected
     task_event_dao: TaskEventDao = Depends(get_task_event_dao),
 ) -> List[TaskEvent]:
-    return task_event_dao.list(task_id=task_id, user_id=authenticated_user.id)
+    return task_event_dao.list(
+        task_id=task_id,
+        user_id=authenticated_user.id,
+        effective_datetime_from=effective_datetime_from,
+        effective_datetime_to=effective_datetime_to,
+    )
+
+
+@inject
+def _paginate_task_events(
+    authenticated_user: User = Depends,
+    task_id: int = Depends,
+    pagination: CursorPaginationFilters = Depends,
+    effective_datetime_from: OptionalFilter[datetime] = NO_FILTER,
+    effective_datetime_to: OptionalFilter[datetime] = NO_FILTER,
+    # Injected
+    task_event_dao: TaskEventDao = Depends(get_task_event_dao),
+) -> CursorPagination[TaskEvent]:
+    # Keyset pagination, the events of a task going back far in its history
+    return task_event_dao.paginate(
+        pagination=pagination,
+        task_id=task_id,
+        user_id=authenticated_user.id,
+        effective_datetime_from=effective_datetime_from,
+        effective_datetime_to=effective_datetime_to,
+    )
+
+
+@inject
+def _repair_task_event_counters(
+    session: SessionType,
+    batch_size: int = 1000,
+    # Injected
+    task_dao: TaskDao = Depends(get_task_dao),
+    task_event_dao: TaskEventDao = Depends(get_task_event_dao),
+) -> int:
+    repaired = 0
+
+    # Committed per batch to keep the locks on the tasks short
+    for task_ids in task_dao.iter_id_batches(batch_size=batch_size):
+        task_event_dao.refresh_task_event_counters(*task_ids)
+        session.commit()
+        repaired += len(task_ids)
+
+    return repaired
+
+
+@inject
+def _create_task_event_partitions(
+    session: SessionType,
+    months_ahead: int,
+    # Injected
+    task_event_dao: TaskEventDao = Depends(get_task_event_dao),
+    task_event_metric_dao: TaskEventMetricDao = Depends(get_task_event_metric_dao),
+    now: datetime = Depends(get_now_datetime),
+) -> int:
+    """Create the monthly partitions of the events and their metrics, from the
+    current month to months_ahead months later, so that the new events never
+    fall in the default partitions"""
+    created = 0
+
+    for offset in range(months_ahead + 1):
+        year, month_index = divmod(now.month - 1 + offset, 12)
+        month = date(now.year + year, month_index + 1, 1)
+
+        for dao in (task_event_dao, task_event_metric_dao):
+            created += dao.create_month_partition(month)
+
+    session.commit()
+    return created
@@ -1,15 +1,28 @@
+from datetime import datetime
 from typing import List
 
 from app.accounts.models.user import User
 from app.database import SessionType
+from app.shared.dao import CursorPagination, CursorPaginationFilters
+from app.shared.memoization import session_memoized
+from app.shared.sentinels import NO_FILTER, OptionalFilter
 from app.tasks.models.task_event import TaskEvent
-from app.tasks.schemas.task_event_schema import TaskEventCreationSchema
+from app.tasks.schemas.task_event_schema import (
+    TaskEventBulkCreationSchema,
+    TaskEventCreationSchema,
+    TaskEventWithMetricsCreationSchema,
+)
 
 from ._service import (
     _create_task_event,
+    _create_task_event_partitions,
+    _create_task_event_with_metrics,
+    _create_task_events,
     _delete_task_event,
     _get_task_event,
     _get_task_events,
+    _paginate_task_events,
+    _repair_task_event_counters,
 )
 
 
@@ -25,6 +38,30 @@ def create_task_event(
     )
 
 
+def create_task_event_with_metrics(
+    session: SessionType,
+    authenticated_user: User,
+    task_event_with_metrics_creation_payload: TaskEventWithMetricsCreationSchema,
+) -> TaskEvent:
+    return _create_task_event_with_metrics(
+        session=session,
+        authenticated_user=authenticated_user,
+        task_event_with_metrics_creation_payload=task_event_with_metrics_creation_payload,
+    )
+
+
+def create_task_events(
+    session: SessionType,
+    authenticated_user: User,
+    task_event_bulk_creation_payload: TaskEventBulkCreationSchema,
+) -> List[TaskEvent]:
+    return _create_task_events(
+        session=session,
+        authenticated_user=authenticated_user,
+        task_event_bulk_creation_payload=task_event_bulk_creation_payload,
+    )
+
+
 def delete_task_event(
     session: SessionType,
     authenticated_user: User,
@@ -37,6 +74,7 @@ def delete_task_event(
     )
 
 
+@session_memoized
 def get_task_event(
     session: SessionType,
     authenticated_user: User,
@@ -53,9 +91,39 @@ def get_task_events(
     session: SessionType,
     authenticated_user: User,
     task_id: int,
+    effective_datetime_from: OptionalFilter[datetime] = NO_FILTER,
+    effective_datetime_to: OptionalFilter[datetime] = NO_FILTER,
 ) -> List[TaskEvent]:
     return _get_task_events(
         session=session,
         authenticated_user=authenticated_user,
         task_id=task_id,
+        effective_datetime_from=effective_datetime_from,
+        effective_datetime_to=effective_datetime_to,
     )
+
+
+def paginate_task_events(
+    session: SessionType,
+    authenticated_user: User,
+    task_id: int,
+    pagination: CursorPaginationFilters,
+    effective_datetime_from: OptionalFilter[datetime] = NO_FILTER,
+    effective_datetime_to: OptionalFilter[datetime] = NO_FILTER,
+) -> CursorPagination[TaskEvent]:
+    return _paginate_task_events(
+        session=session,
+        authenticated_user=authenticated_user,
+        task_id=task_id,
+        pagination=pagination,
+        effective_datetime_from=effective_datetime_from,
+        effective_datetime_to=effective_datetime_to,
+    )
+
+
+def repair_task_event_counters(session: SessionType, batch_size: int = 1000) -> int:
+    return _repair_task_event_counters(session=session, batch_size=batch_size)
+
+
+def create_task_event_partitions(session: SessionType, months_ahead: int) -> int:
+    return _create_task_event_partitions(session=session, months_ahead=months_ahead)
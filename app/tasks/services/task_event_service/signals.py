@@ -1,4 +1,5 @@
 from blinker import signal
 
 task_event_created = signal("task_event_created")
+task_events_bulk_created = signal("task_events_bulk_created")
 task_event_deleted = signal("task_event_deleted")
@@ -0,0 +1,21 @@
+import logging
+
+from app.celery import celery
+from app.database import using_get_session
+from app.settings import settings
+
+from . import service as task_event_service
+
+logger = logging.getLogger(__name__)
+
+
+@celery.task
+def trigger_create_task_event_partitions() -> int:
+    with using_get_session() as session:
+        created = task_event_service.create_task_event_partitions(
+            session=session,
+            months_ahead=settings.TASK_EVENT_PARTITIONS_MONTHS_AHEAD,
+        )
+
+    logger.info(f"{created} task event partitions created")
+    return created
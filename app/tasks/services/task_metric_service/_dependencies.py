@@ -1,8 +1,13 @@
+from datetime import datetime
+
 from fast_depends import Depends
 
 from app.database import SessionType
 from app.shared.exceptions import ServiceValidationError
+from app.shared.sentinels import NO_FILTER, OptionalFilter
+from app.tasks.daos.task_event_metric_dao import TaskEventMetricDao
 from app.tasks.daos.task_metric_dao import TaskMetricDao
+from app.tasks.daos.task_metric_rollup_dao import TaskMetricRollupDao
 from app.tasks.schemas.task_metric_schema import TaskMetricCreationSchema
 
 
@@ -10,6 +15,14 @@ def get_task_metric_dao(session: SessionType) -> TaskMetricDao:
     return TaskMetricDao(session=session)
 
 
+def get_task_event_metric_dao(session: SessionType) -> TaskEventMetricDao:
+    return TaskEventMetricDao(session=session)
+
+
+def get_task_metric_rollup_dao(session: SessionType) -> TaskMetricRollupDao:
+    return TaskMetricRollupDao(session=session)
+
+
 def get_task_id_from_task_metric_creation_payload(
     task_metric_creation_payload: TaskMetricCreationSchema,
 ) -> int:
@@ -28,3 +41,15 @@ def validate_task_metric_name_from_task_metric_creation_payload(
         raise ServiceValidationError(
             "A metric already exists with this name for this task"
         )
+
+
+def validate_effective_datetime_range(
+    effective_datetime_from: OptionalFilter[datetime] = NO_FILTER,
+    effective_datetime_to: OptionalFilter[datetime] = NO_FILTER,
+):
+    if (
+        effective_datetime_from is not NO_FILTER
+        and effective_datetime_to is not NO_FILTER
+        and effective_datetime_to <= effective_datetime_from
+    ):
+        raise ServiceValidationError("The end of the range must follow its start")
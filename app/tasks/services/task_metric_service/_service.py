@@ -1,16 +1,28 @@
+from datetime import datetime
 from typing import List
 
 from fast_depends import Depends, inject
+from sqlalchemy.engine import Row
 
 from app.accounts.models.user import User
 from app.database import SessionType
+from app.shared.sentinels import NO_FILTER, OptionalFilter
+from app.tasks.daos.task_event_metric_dao import TaskEventMetricDao
 from app.tasks.daos.task_metric_dao import TaskMetricDao
+from app.tasks.daos.task_metric_rollup_dao import TaskMetricRollupDao
 from app.tasks.models.task_metric import TaskMetric
-from app.tasks.schemas.task_metric_schema import TaskMetricCreationSchema
+from app.tasks.models.task_metric_rollup import TaskMetricRollupPeriod
+from app.tasks.schemas.task_metric_schema import (
+    TaskMetricAggregateBucket,
+    TaskMetricCreationSchema,
+)
 from app.tasks.services._dependencies import get_task_factory
 from app.tasks.services.task_metric_service._dependencies import (
+    get_task_event_metric_dao,
     get_task_id_from_task_metric_creation_payload,
     get_task_metric_dao,
+    get_task_metric_rollup_dao,
+    validate_effective_datetime_range,
     validate_task_metric_name_from_task_metric_creation_payload,
 )
 
@@ -23,12 +35,14 @@ from app.tasks.services.task_metric_service._dependencies import (
 )
 def _create_task_metric(
     session: SessionType,
+    authenticated_user: User,
     task_metric_creation_payload: TaskMetricCreationSchema,
     # Injected
     task_metric_dao: TaskMetricDao = Depends(get_task_metric_dao),
 ) -> TaskMetric:
     task_metric = task_metric_dao.create(
         task_id=task_metric_creation_payload.task_id,
+        user_id=authenticated_user.id,
         name=task_metric_creation_payload.name,
         prompt=task_metric_creation_payload.prompt,
         required=task_metric_creation_payload.required,
@@ -57,6 +71,71 @@ def _get_task_metrics(
     return task_metric_dao.list(task_id=task_id, user_id=authenticated_user.id)
 
 
+@inject(extra_dependencies=[Depends(validate_effective_datetime_range)])
+def _get_task_metric_aggregates(
+    authenticated_user: User = Depends,
+    task_metric_id: int = Depends,
+    bucket: TaskMetricAggregateBucket = Depends,
+    effective_datetime_from: OptionalFilter[datetime] = NO_FILTER,
+    effective_datetime_to: OptionalFilter[datetime] = NO_FILTER,
+    # Injected
+    task_metric_dao: TaskMetricDao = Depends(get_task_metric_dao),
+    task_event_metric_dao: TaskEventMetricDao = Depends(get_task_event_metric_dao),
+) -> List[Row]:
+    # A NoResultFound is raised if the user can't see this metric, the
+    # values being aggregated by metric alone
+    task_metric_dao.get(id=task_metric_id, user_id=authenticated_user.id)
+
+    return task_event_metric_dao.aggregate(
+        task_metric_id=task_metric_id,
+        bucket=bucket.value,
+        effective_datetime_from=effective_datetime_from,
+        effective_datetime_to=effective_datetime_to,
+    )
+
+
+@inject(extra_dependencies=[Depends(validate_effective_datetime_range)])
+def _get_task_metric_rollups(
+    authenticated_user: User = Depends,
+    task_metric_id: int = Depends,
+    period: TaskMetricRollupPeriod = Depends,
+    effective_datetime_from: OptionalFilter[datetime] = NO_FILTER,
+    effective_datetime_to: OptionalFilter[datetime] = NO_FILTER,
+    # Injected
+    task_metric_dao: TaskMetricDao = Depends(get_task_metric_dao),
+    task_metric_rollup_dao: TaskMetricRollupDao = Depends(get_task_metric_rollup_dao),
+) -> List[Row]:
+    # A NoResultFound is raised if the user can't see this metric
+    task_metric_dao.get(id=task_metric_id, user_id=authenticated_user.id)
+
+    # The buckets starting within the range
+    return task_metric_rollup_dao.series(
+        task_metric_id=task_metric_id,
+        period=period,
+        bucket_start_from=effective_datetime_from,
+        bucket_start_to=effective_datetime_to,
+    )
+
+
+@inject
+def _rebuild_task_metric_rollups(
+    session: SessionType,
+    batch_size: int = 1000,
+    # Injected
+    task_metric_dao: TaskMetricDao = Depends(get_task_metric_dao),
+    task_metric_rollup_dao: TaskMetricRollupDao = Depends(get_task_metric_rollup_dao),
+) -> int:
+    rebuilt = 0
+
+    # Committed per batch to keep the locks on the rollups short
+    for task_metric_ids in task_metric_dao.iter_id_batches(batch_size=batch_size):
+        task_metric_rollup_dao.rebuild(*task_metric_ids)
+        session.commit()
+        rebuilt += len(task_metric_ids)
+
+    return rebuilt
+
+
 @inject
 def _delete_task_metric(
     session: SessionType,
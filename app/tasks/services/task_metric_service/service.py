@@ -1,15 +1,27 @@
+from datetime import datetime
 from typing import List
 
+from sqlalchemy.engine import Row
+
 from app.accounts.models.user import User
 from app.database import SessionType
+from app.shared.memoization import session_memoized
+from app.shared.sentinels import NO_FILTER, OptionalFilter
 from app.tasks.models.task_metric import TaskMetric
-from app.tasks.schemas.task_metric_schema import TaskMetricCreationSchema
+from app.tasks.models.task_metric_rollup import TaskMetricRollupPeriod
+from app.tasks.schemas.task_metric_schema import (
+    TaskMetricAggregateBucket,
+    TaskMetricCreationSchema,
+)
 
 from ._service import (
     _create_task_metric,
     _delete_task_metric,
     _get_task_metric,
+    _get_task_metric_aggregates,
+    _get_task_metric_rollups,
     _get_task_metrics,
+    _rebuild_task_metric_rollups,
 )
 
 
@@ -25,6 +37,7 @@ def create_task_metric(
     )
 
 
+@session_memoized
 def get_task_metric(
     session: SessionType,
     authenticated_user: User,
@@ -49,6 +62,46 @@ def get_task_metrics(
     )
 
 
+def get_task_metric_aggregates(
+    session: SessionType,
+    authenticated_user: User,
+    task_metric_id: int,
+    bucket: TaskMetricAggregateBucket,
+    effective_datetime_from: OptionalFilter[datetime] = NO_FILTER,
+    effective_datetime_to: OptionalFilter[datetime] = NO_FILTER,
+) -> List[Row]:
+    return _get_task_metric_aggregates(
+        session=session,
+        authenticated_user=authenticated_user,
+        task_metric_id=task_metric_id,
+        bucket=bucket,
+        effective_datetime_from=effective_datetime_from,
+        effective_datetime_to=effective_datetime_to,
+    )
+
+
+def get_task_metric_rollups(
+    session: SessionType,
+    authenticated_user: User,
+    task_metric_id: int,
+    period: TaskMetricRollupPeriod,
+    effective_datetime_from: OptionalFilter[datetime] = NO_FILTER,
+    effective_datetime_to: OptionalFilter[datetime] = NO_FILTER,
+) -> List[Row]:
+    return _get_task_metric_rollups(
+        session=session,
+        authenticated_user=authenticated_user,
+        task_metric_id=task_metric_id,
+        period=period,
+        effective_datetime_from=effective_datetime_from,
+        effective_datetime_to=effective_datetime_to,
+    )
+
+
+def rebuild_task_metric_rollups(session: SessionType, batch_size: int = 1000) -> int:
+    return _rebuild_task_metric_rollups(session=session, batch_size=batch_size)
+
+
 def delete_task_metric(
     session: SessionType,
     authenticated_user: User,
@@ -1,20 +1,31 @@
 from datetime import date, datetime
-from typing import Annotated
+from functools import lru_cache
+from typing import Annotated, Dict, List, Optional
 
 from fast_depends import Depends
+from redis import Redis
 
 from app.accounts.models.user import User
-from app.database import SessionType
+from app.database import SessionType, session_factory
+from app.settings import settings
 from app.shared.exceptions import ServiceValidationError
+from app.shared.sentinels import NO_FILTER, OptionalFilter
 from app.tasks.daos.task_dao import TaskDao
 from app.tasks.daos.task_frequency_dao import TaskFrequencyDao
 from app.tasks.daos.task_until_dao import TaskUntilDao
 from app.tasks.models.task import Task, TaskStatus
-from app.tasks.schemas.task_schema import TaskCreationSchema
+from app.tasks.schemas.task_schema import TaskCreationSchema, TaskDue, TaskSchema
 from app.tasks.services._dependencies import get_task as get_task_dependency
 from app.tasks.services._dependencies import get_task_dao
 from app.tasks.services.category_service import service as category_service
 
+from ._queue import (
+    CeleryRecomputeQueue,
+    RecomputeQueue,
+    SyncRecomputeQueue,
+    ThreadRecomputeQueue,
+)
+
 
 def get_task_name_from_task_creation_payload(
     task_creation_payload: Annotated[TaskCreationSchema, Depends],
@@ -72,6 +83,39 @@ def validate_task_status_for_unpause(
         raise ServiceValidationError("Cannot unpause a task that isn't paused")
 
 
+def validate_task_fields(fields: OptionalFilter[List[str]]):
+    if fields is NO_FILTER:
+        return
+
+    unknown_fields = [field for field in fields if field not in TaskSchema.model_fields]
+    if unknown_fields:
+        raise ServiceValidationError(
+            f"Unknown task fields: {', '.join(unknown_fields)}"
+        )
+
+
+def validate_task_due_without_next_event_datetime_range(
+    due: Optional[TaskDue],
+    next_event_datetime_from: OptionalFilter[datetime],
+    next_event_datetime_to: OptionalFilter[datetime],
+):
+    if due is not None and (
+        next_event_datetime_from is not NO_FILTER
+        or next_event_datetime_to is not NO_FILTER
+    ):
+        raise ServiceValidationError(
+            "Due tasks can't be combined with a next event datetime range"
+        )
+
+
+def validate_occurrence_range(
+    start: Optional[datetime],
+    end: Optional[datetime],
+):
+    if start is not None and end is not None and end <= start:
+        raise ServiceValidationError("The end of the range must follow its start")
+
+
 def get_task_frequency_dao(session: SessionType = Depends) -> TaskFrequencyDao:
     return TaskFrequencyDao(session=session)
 
@@ -86,3 +130,42 @@ def get_date_now() -> date:
 
 def get_datetime_now() -> datetime:
     return datetime.utcnow()
+
+
+def _recompute_tasks_state(session: SessionType, task_ids: List[int]) -> int:
+    from app.tasks.services.task_service import service
+
+    return service.recompute_tasks_state(
+        session=session,
+        task_ids=task_ids,
+        chunk_size=settings.TASK_STATE_RECOMPUTE_BATCH_SIZE,
+    )
+
+
+def _get_task_state_versions(
+    session: SessionType, task_ids: List[int]
+) -> Dict[int, int]:
+    return TaskDao(session=session).get_state_versions(ids=task_ids)
+
+
+@lru_cache
+def get_task_state_recompute_queue() -> RecomputeQueue:
+    if settings.TASK_STATE_RECOMPUTE_MODE == "thread":
+        return ThreadRecomputeQueue(
+            recompute=_recompute_tasks_state,
+            session_factory=session_factory,
+            window_seconds=settings.TASK_STATE_RECOMPUTE_WINDOW_SECONDS,
+        )
+
+    if settings.TASK_STATE_RECOMPUTE_MODE == "celery":
+        from app.tasks.services.task_service.tasks import trigger_recompute_tasks_state
+
+        return CeleryRecomputeQueue(
+            recompute=_recompute_tasks_state,
+            get_state_versions=_get_task_state_versions,
+            client=Redis.from_url(settings.TASK_STATE_RECOMPUTE_REDIS_URL),
+            celery_task=trigger_recompute_tasks_state,
+            window_seconds=settings.TASK_STATE_RECOMPUTE_WINDOW_SECONDS,
+        )
+
+    return SyncRecomputeQueue(recompute=_recompute_tasks_state)
@@ -0,0 +1,208 @@
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from redis import Redis
+
+from app.database import SessionType
+
+logger = logging.getLogger(__name__)
+
+# Recomputes the state of the given tasks in the given session
+Recompute = Callable[[SessionType, List[int]], int]
+# Reads the current state_version of the given tasks in the given session
+GetStateVersions = Callable[[SessionType, List[int]], Dict[int, int]]
+
+
+class RecomputeQueue(ABC):
+    """Tasks whose state should be recomputed following their changes.
+
+    A task changed several times within the window of the queue is only
+    recomputed once, along with the other tasks changed in the meantime."""
+
+    def __init__(self, recompute: Recompute):
+        self.recompute = recompute
+
+    @abstractmethod
+    def enqueue(self, session: SessionType, task_ids: Iterable[int]) -> None:
+        pass
+
+    def release(self, task_ids: Iterable[int]) -> None:
+        """Forget the pending tasks, so their next changes are queued again"""
+        pass
+
+
+class SyncRecomputeQueue(RecomputeQueue):
+    """No queue, the tasks are recomputed in the session of the caller"""
+
+    def enqueue(self, session: SessionType, task_ids: Iterable[int]) -> None:
+        self.recompute(session, sorted(set(task_ids)))
+
+
+class ThreadRecomputeQueue(RecomputeQueue):
+    """In-process queue, drained by a background thread once the window
+    following the first change has elapsed.
+
+    A failed batch is retried task by task, so that a task failing its
+    recompute doesn't hold back the others. That task is queued again, up
+    to max_attempts times before being dropped."""
+
+    def __init__(
+        self,
+        recompute: Recompute,
+        session_factory: Callable[[], SessionType],
+        window_seconds: float,
+        max_attempts: int = 3,
+    ):
+        super().__init__(recompute=recompute)
+        self.session_factory = session_factory
+        self.window_seconds = window_seconds
+        self.max_attempts = max_attempts
+        self._pending: Set[int] = set()
+        # The failed attempts of the tasks queued again
+        self._attempts: Dict[int, int] = {}
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def enqueue(self, session: SessionType, task_ids: Iterable[int]) -> None:
+        with self._condition:
+            self._pending.update(task_ids)
+
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="task-state-recompute", daemon=True
+                )
+                self._thread.start()
+
+            self._condition.notify()
+
+    def release(self, task_ids: Iterable[int]) -> None:
+        with self._condition:
+            self._pending.difference_update(task_ids)
+
+    def flush(self) -> None:
+        """Recompute the pending tasks straight away"""
+        with self._condition:
+            task_ids, self._pending = self._pending, set()
+
+        if task_ids:
+            self._process(sorted(task_ids))
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+
+            # Let the burst of changes settle before draining the queue
+            time.sleep(self.window_seconds)
+            self.flush()
+
+    def _process(self, task_ids: List[int]):
+        session = self.session_factory()
+        try:
+            failed_task_ids = self._recompute(session, task_ids)
+        finally:
+            session.close()
+
+        self._retry(task_ids=task_ids, failed_task_ids=failed_task_ids)
+
+    def _recompute(self, session: SessionType, task_ids: List[int]) -> List[int]:
+        """Recompute the tasks, one at a time should the batch fail, and return
+        the ids of those that failed"""
+        try:
+            self.recompute(session, task_ids)
+            return []
+        except Exception:
+            session.rollback()
+            logger.exception(f"Failed to recompute the state of the tasks {task_ids}")
+
+        if len(task_ids) == 1:
+            return task_ids
+
+        return [task_id for task_id in task_ids if self._recompute(session, [task_id])]
+
+    def _retry(self, task_ids: List[int], failed_task_ids: List[int]):
+        """Queue the failed tasks again, rather than leaving them with a stale
+        state, unless they ran out of attempts"""
+        dropped_task_ids = []
+
+        with self._condition:
+            for task_id in set(task_ids).difference(failed_task_ids):
+                self._attempts.pop(task_id, None)
+
+            for task_id in failed_task_ids:
+                attempts = self._attempts.get(task_id, 0) + 1
+                if attempts < self.max_attempts:
+                    self._attempts[task_id] = attempts
+                    self._pending.add(task_id)
+                else:
+                    self._attempts.pop(task_id, None)
+                    dropped_task_ids.append(task_id)
+
+        if dropped_task_ids:
+            logger.error(
+                f"Gave up recomputing the state of the tasks {dropped_task_ids} "
+                f"after {self.max_attempts} attempts"
+            )
+
+
+class CeleryRecomputeQueue(RecomputeQueue):
+    """Queue shared by all the processes, a celery task being scheduled at
+    the end of the window for the tasks that weren't already pending.
+
+    A task is pending while its redis key exists, which is set if absent
+    so that a single process schedules its recompute. The job carries the
+    state_version of each task once changed, so the worker recomputes them
+    from a version at least as recent, in its own session."""
+
+    def __init__(
+        self,
+        recompute: Recompute,
+        get_state_versions: GetStateVersions,
+        client: Redis,
+        celery_task,
+        window_seconds: float,
+        prefix: str = "task-state-recompute",
+    ):
+        super().__init__(recompute=recompute)
+        self.get_state_versions = get_state_versions
+        self.client = client
+        self.celery_task = celery_task
+        self.window_seconds = window_seconds
+        self.prefix = prefix
+
+    def _key(self, task_id: int) -> str:
+        return f"{self.prefix}:task:{task_id}"
+
+    def enqueue(self, session: SessionType, task_ids: Iterable[int]) -> None:
+        task_ids = sorted(set(task_ids))
+
+        pipeline = self.client.pipeline()
+        for task_id in task_ids:
+            # Expires eventually, should the scheduled recompute never run
+            pipeline.set(
+                self._key(task_id),
+                1,
+                nx=True,
+                px=int((self.window_seconds + 60) * 1000),
+            )
+
+        scheduled_task_ids = [
+            task_id for task_id, is_set in zip(task_ids, pipeline.execute()) if is_set
+        ]
+        if scheduled_task_ids:
+            self.schedule(self.get_state_versions(session, scheduled_task_ids))
+
+    def schedule(self, task_state_versions: Dict[int, int]) -> None:
+        # Pairs rather than a mapping, json object keys being strings
+        self.celery_task.apply_async(
+            args=[sorted(task_state_versions.items())], countdown=self.window_seconds
+        )
+
+    def release(self, task_ids: Iterable[int]) -> None:
+        keys = [self._key(task_id) for task_id in task_ids]
+        if keys:
+            self.client.delete(*keys)
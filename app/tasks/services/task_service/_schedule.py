@@ -0,0 +1,261 @@
+import calendar
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from itertools import count, islice, takewhile
+from typing import Iterator, Optional, Tuple
+
+from app.tasks.models.task import Task
+from app.tasks.models.task_frequency import FrequencyPeriod, FrequencyType, Weekday
+from app.tasks.models.task_until import UntilType
+from app.tasks.services.task_service._utils import (
+    get_end_of_current_period,
+    weekday_to_int,
+)
+
+DEFAULT_TIME = time(12, 0)
+
+
+def add_periods(value: datetime, period: FrequencyPeriod, amount: int) -> datetime:
+    """Exact calendar arithmetic, the day being clamped to the length of the
+    target month, so that a month after the 31st of January is the end of
+    February"""
+    if period == FrequencyPeriod.day:
+        return value + timedelta(days=amount)
+
+    if period == FrequencyPeriod.week:
+        return value + timedelta(weeks=amount)
+
+    months = amount if period == FrequencyPeriod.month else 12 * amount
+    year, month_index = divmod(value.month - 1 + months, 12)
+    year, month = value.year + year, month_index + 1
+    return value.replace(
+        year=year,
+        month=month,
+        day=min(value.day, calendar.monthrange(year, month)[1]),
+    )
+
+
+def get_elapsed_periods(start: datetime, end: datetime, period: FrequencyPeriod) -> int:
+    """A lower bound of the whole periods between the two datetimes"""
+    if end <= start:
+        return 0
+
+    if period == FrequencyPeriod.day:
+        return (end - start).days
+
+    if period == FrequencyPeriod.week:
+        return (end - start).days // 7
+
+    months = max((end.year - start.year) * 12 + end.month - start.month - 1, 0)
+    return months if period == FrequencyPeriod.month else months // 12
+
+
+def _floor_to_minute(value: datetime) -> datetime:
+    return value.replace(second=0, microsecond=0)
+
+
+@dataclass(frozen=True)
+class OccurrenceRule:
+    """Everything the occurrences of a task depend on.
+
+    Being hashable, it keys the cached occurrences, which are recomputed
+    once the frequency or the latest event of the task change."""
+
+    frequency_id: int
+    latest_event_datetime: Optional[datetime]
+    type: FrequencyType
+    period: Optional[FrequencyPeriod]
+    amount: int
+    use_calendar_period: bool
+    once_on_date: Optional[date]
+    once_per_weekday: Optional[Weekday]
+    once_at_time: Optional[time]
+    created: datetime
+    event_count: int
+    until_date: Optional[date] = None
+    until_amount: Optional[int] = None
+
+    @classmethod
+    def from_task(cls, task: Task) -> "OccurrenceRule":
+        frequency, until = task.frequency, task.until
+        return cls(
+            frequency_id=frequency.id,
+            latest_event_datetime=task.latest_event_datetime,
+            type=frequency.type,
+            period=frequency.period,
+            amount=frequency.amount,
+            use_calendar_period=frequency.use_calendar_period,
+            once_on_date=frequency.once_on_date,
+            once_per_weekday=frequency.once_per_weekday,
+            once_at_time=frequency.once_at_time,
+            created=task.created,
+            event_count=task.event_count,
+            until_date=until.date if until.type == UntilType.date else None,
+            until_amount=until.amount if until.type == UntilType.amount else None,
+        )
+
+
+def _iter_on(rule: OccurrenceRule, start: datetime) -> Iterator[Tuple[int, datetime]]:
+    if rule.event_count == 0:
+        yield 0, datetime.combine(rule.once_on_date, rule.once_at_time or time(23, 59))
+
+
+def _iter_this(rule: OccurrenceRule, start: datetime) -> Iterator[Tuple[int, datetime]]:
+    """The remaining events, evenly spread over what is left of the period"""
+    remaining_events = rule.amount - rule.event_count
+    if remaining_events <= 0:
+        return
+
+    period_end = (
+        get_end_of_current_period(period=rule.period, current_date=rule.created.date())
+        if rule.use_calendar_period
+        else add_periods(rule.created, rule.period, 1)
+    )
+    since = rule.latest_event_datetime or rule.created
+    step = (period_end - since) / (remaining_events + 1)
+
+    for index in range(remaining_events):
+        yield index, _floor_to_minute(since + step * (index + 1))
+
+
+def _iter_once_per_day(
+    rule: OccurrenceRule, start: datetime
+) -> Iterator[Tuple[int, datetime]]:
+    # The day after the latest event, else from the day of creation
+    first_date = (
+        rule.latest_event_datetime.date() + timedelta(days=1)
+        if rule.latest_event_datetime
+        else rule.created.date()
+    )
+    skipped = max((start.date() - first_date).days, 0)
+
+    for index in count(skipped):
+        yield (
+            index,
+            datetime.combine(
+                first_date + timedelta(days=index), rule.once_at_time or DEFAULT_TIME
+            ),
+        )
+
+
+def _iter_once_per_weekday(
+    rule: OccurrenceRule, start: datetime
+) -> Iterator[Tuple[int, datetime]]:
+    # The weekday strictly after the latest event, else from the day of creation
+    since = (rule.latest_event_datetime or rule.created).date()
+    days_ahead = (weekday_to_int[rule.once_per_weekday] - since.weekday()) % 7
+    if rule.latest_event_datetime and days_ahead == 0:
+        days_ahead = 7
+
+    first_date = since + timedelta(days=days_ahead)
+    skipped = max((start.date() - first_date).days // 7, 0)
+
+    for index in count(skipped):
+        yield (
+            index,
+            datetime.combine(
+                first_date + timedelta(weeks=index), rule.once_at_time or DEFAULT_TIME
+            ),
+        )
+
+
+def _iter_per_period(
+    rule: OccurrenceRule, start: datetime
+) -> Iterator[Tuple[int, datetime]]:
+    """The events of each period evenly spread over it, the periods following
+    one another from the latest event, else from the creation"""
+    anchor = rule.latest_event_datetime or rule.created
+    # The last event of a period falls on the start of the next one
+    skipped = max(get_elapsed_periods(anchor, start, rule.period) - 1, 0)
+
+    for period_index in count(skipped):
+        period_start = add_periods(anchor, rule.period, period_index)
+        period_end = add_periods(anchor, rule.period, period_index + 1)
+        step = (period_end - period_start) / rule.amount
+        for event_index in range(rule.amount):
+            yield (
+                period_index * rule.amount + event_index,
+                _floor_to_minute(period_start + step * (event_index + 1)),
+            )
+
+
+def _iter_indexed_occurrences(
+    rule: OccurrenceRule, start: datetime
+) -> Iterator[Tuple[int, datetime]]:
+    """The occurrences in ascending order, along with their position in the
+    schedule. Periodic schedules skip straight to about the start, rather
+    than replaying the periods preceding it."""
+    if rule.type == FrequencyType.on:
+        return _iter_on(rule, start)
+
+    if rule.type == FrequencyType.this:
+        return _iter_this(rule, start)
+
+    if rule.amount == 1 and rule.period == FrequencyPeriod.day:
+        return _iter_once_per_day(rule, start)
+
+    if (
+        rule.amount == 1
+        and rule.period == FrequencyPeriod.week
+        and rule.once_per_weekday is not None
+    ):
+        return _iter_once_per_weekday(rule, start)
+
+    return _iter_per_period(rule, start)
+
+
+def iter_occurrences(rule: OccurrenceRule, start: datetime) -> Iterator[datetime]:
+    """The occurrences from the start onwards, until the end of the task"""
+    remaining_events = (
+        rule.until_amount - rule.event_count if rule.until_amount is not None else None
+    )
+    until_datetime = (
+        datetime.combine(rule.until_date, time.max) if rule.until_date else None
+    )
+
+    for index, occurrence in _iter_indexed_occurrences(rule, start):
+        if remaining_events is not None and index >= remaining_events:
+            return
+
+        if until_datetime is not None and occurrence > until_datetime:
+            return
+
+        if occurrence >= start:
+            yield occurrence
+
+
+def _take(
+    occurrences: Iterator[datetime], end: Optional[datetime], limit: int
+) -> Tuple[datetime, ...]:
+    if end is not None:
+        occurrences = takewhile(lambda occurrence: occurrence < end, occurrences)
+
+    return tuple(islice(occurrences, limit))
+
+
+@lru_cache(maxsize=4096)
+def _get_occurrences_from_day(
+    rule: OccurrenceRule, since: date, end: Optional[datetime], limit: int
+) -> Tuple[datetime, ...]:
+    return _take(iter_occurrences(rule, datetime.combine(since, time.min)), end, limit)
+
+
+def get_occurrences(
+    rule: OccurrenceRule,
+    start: datetime,
+    end: Optional[datetime] = None,
+    limit: int = 100,
+) -> Tuple[datetime, ...]:
+    """The first occurrences within [start, end), at most limit of them.
+
+    They are cached per rule and day of the start, so the upcoming
+    occurrences of a task are only expanded once a day until it changes."""
+    occurrences = _get_occurrences_from_day(rule, start.date(), end, limit)
+    upcoming = tuple(occurrence for occurrence in occurrences if occurrence >= start)
+
+    if len(upcoming) < len(occurrences) == limit:
+        # Occurrences earlier that day took the place of later ones
+        return _take(iter_occurrences(rule, start), end, limit)
+
+    return upcoming
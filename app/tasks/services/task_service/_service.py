@@ -1,12 +1,17 @@
+import heapq
+import logging
 from datetime import date, datetime
-from typing import List, Optional
+from itertools import islice
+from typing import Any, Dict, List, Optional
 
 from fast_depends import Depends, inject
+from sqlalchemy.engine import Row
 
 from app.accounts.models.user import User
 from app.database import SessionType
+from app.shared.dao import CountMode, Pagination, PaginationFilters
 from app.shared.sentinels import NO_FILTER, OptionalFilter
-from app.tasks.daos.task_dao import TaskDao
+from app.tasks.daos.task_dao import AsyncTaskDao, TaskDao
 from app.tasks.daos.task_frequency_dao import TaskFrequencyDao
 from app.tasks.daos.task_until_dao import TaskUntilDao
 from app.tasks.models.task import Task, TaskStatus
@@ -14,11 +19,12 @@ from app.tasks.models.task_frequency import TaskFrequency
 from app.tasks.models.task_until import TaskUntil
 from app.tasks.schemas.task_schema import (
     TaskCreationSchema,
+    TaskDue,
     TaskFrequencyCreationSchema,
     TaskUntilCreationSchema,
 )
 from app.tasks.services._dependencies import get_task as get_task_dependency
-from app.tasks.services._dependencies import get_task_dao
+from app.tasks.services._dependencies import get_async_task_dao, get_task_dao
 from app.tasks.services.task_service._dependencies import (
     get_date_now,
     get_datetime_now,
@@ -26,15 +32,25 @@ from app.tasks.services.task_service._dependencies import (
     get_task_until_dao,
     validate_category_is_visible_for_task_creation,
     validate_name_is_unique_for_task_creation,
+    validate_occurrence_range,
+    validate_task_due_without_next_event_datetime_range,
+    validate_task_fields,
     validate_task_status_for_completion,
     validate_task_status_for_pause,
     validate_task_status_for_unpause,
 )
+from app.tasks.services.task_service._schedule import (
+    OccurrenceRule,
+    get_occurrences,
+)
 from app.tasks.services.task_service._utils import (
     compute_task_state,
+    get_due_datetime_range,
 )
 from app.tasks.services.task_service.signals import task_updated
 
+logger = logging.getLogger(__name__)
+
 
 @inject(
     extra_dependencies=[
@@ -100,6 +116,162 @@ def _get_tasks(
     )
 
 
+@inject(extra_dependencies=[Depends(validate_occurrence_range)])
+def _get_task_occurrences(
+    authenticated_user: User = Depends,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    task_id: OptionalFilter[int] = NO_FILTER,
+    limit: int = 100,
+    # Injected
+    now: datetime = Depends(get_datetime_now),
+    task_dao: TaskDao = Depends(get_task_dao),
+) -> List[Dict[str, Any]]:
+    """The first occurrences of the ongoing tasks within the range, in
+    chronological order, the range starting now unless given"""
+    start = start or now
+    schedules = [
+        [
+            (occurrence_datetime, task.id)
+            for occurrence_datetime in get_occurrences(
+                OccurrenceRule.from_task(task), start=start, end=end, limit=limit
+            )
+        ]
+        for task in task_dao.list(
+            user_id=authenticated_user.id, status=TaskStatus.ongoing, id=task_id
+        )
+    ]
+
+    return [
+        {"task_id": task_id, "occurrence_datetime": occurrence_datetime}
+        for occurrence_datetime, task_id in islice(heapq.merge(*schedules), limit)
+    ]
+
+
+@inject
+def _get_due_tasks(
+    authenticated_user: User = Depends,
+    due: TaskDue = Depends,
+    within_hours: int = 24,
+    limit: int = 50,
+    # Injected
+    now: datetime = Depends(get_datetime_now),
+    task_dao: TaskDao = Depends(get_task_dao),
+) -> List[Row]:
+    due_from, due_to = get_due_datetime_range(
+        due=due, now=now, within_hours=within_hours
+    )
+    return task_dao.list_due(
+        user_id=authenticated_user.id,
+        next_event_datetime_from=due_from or NO_FILTER,
+        next_event_datetime_to=due_to or NO_FILTER,
+        limit=limit,
+    )
+
+
+@inject(
+    extra_dependencies=[
+        Depends(validate_task_fields),
+        Depends(validate_task_due_without_next_event_datetime_range),
+    ]
+)
+def _paginate_tasks(
+    authenticated_user: User = Depends,
+    pagination: PaginationFilters = Depends,
+    status: OptionalFilter[TaskStatus] = NO_FILTER,
+    category_id: OptionalFilter[Optional[int]] = NO_FILTER,
+    category_tree_id: OptionalFilter[int] = NO_FILTER,
+    next_event_datetime_from: OptionalFilter[datetime] = NO_FILTER,
+    next_event_datetime_to: OptionalFilter[datetime] = NO_FILTER,
+    due: Optional[TaskDue] = None,
+    fields: OptionalFilter[List[str]] = NO_FILTER,
+    # Injected
+    now: datetime = Depends(get_datetime_now),
+    task_dao: TaskDao = Depends(get_task_dao),
+) -> Pagination[Task]:
+    if due is not None:
+        due_from, due_to = get_due_datetime_range(due=due, now=now)
+        next_event_datetime_from = due_from or NO_FILTER
+        next_event_datetime_to = due_to or NO_FILTER
+
+    return task_dao.paginate(
+        pagination=pagination,
+        # The total comes with the page, in a single query
+        count_mode=CountMode.window,
+        user_id=authenticated_user.id,
+        status=status,
+        category_id=category_id,
+        category_tree_id=category_tree_id,
+        next_event_datetime_from=next_event_datetime_from,
+        next_event_datetime_to=next_event_datetime_to,
+        fields=fields,
+    )
+
+
+@inject(
+    extra_dependencies=[
+        Depends(validate_task_fields),
+        Depends(validate_task_due_without_next_event_datetime_range),
+    ]
+)
+async def _paginate_tasks_async(
+    authenticated_user: User = Depends,
+    pagination: PaginationFilters = Depends,
+    status: OptionalFilter[TaskStatus] = NO_FILTER,
+    category_id: OptionalFilter[Optional[int]] = NO_FILTER,
+    category_tree_id: OptionalFilter[int] = NO_FILTER,
+    next_event_datetime_from: OptionalFilter[datetime] = NO_FILTER,
+    next_event_datetime_to: OptionalFilter[datetime] = NO_FILTER,
+    due: Optional[TaskDue] = None,
+    fields: OptionalFilter[List[str]] = NO_FILTER,
+    # Injected
+    now: datetime = Depends(get_datetime_now),
+    task_dao: AsyncTaskDao = Depends(get_async_task_dao),
+) -> Pagination[Task]:
+    if due is not None:
+        due_from, due_to = get_due_datetime_range(due=due, now=now)
+        next_event_datetime_from = due_from or NO_FILTER
+        next_event_datetime_to = due_to or NO_FILTER
+
+    return await task_dao.paginate(
+        pagination=pagination,
+        # The total comes with the page, in a single query
+        count_mode=CountMode.window,
+        user_id=authenticated_user.id,
+        status=status,
+        category_id=category_id,
+        category_tree_id=category_tree_id,
+        next_event_datetime_from=next_event_datetime_from,
+        next_event_datetime_to=next_event_datetime_to,
+        fields=fields,
+    )
+
+
+@inject
+async def _get_task_async(
+    task_id: int = Depends,
+    authenticated_user: User = Depends,
+    # Injected
+    task_dao: AsyncTaskDao = Depends(get_async_task_dao),
+) -> Task:
+    return await task_dao.get(user_id=authenticated_user.id, id=task_id)
+
+
+@inject
+async def _get_tasks_async(
+    authenticated_user: User = Depends,
+    status: OptionalFilter[TaskStatus] = NO_FILTER,
+    category_id: OptionalFilter[Optional[int]] = NO_FILTER,
+    # Injected
+    task_dao: AsyncTaskDao = Depends(get_async_task_dao),
+) -> List[Task]:
+    return await task_dao.list(
+        user_id=authenticated_user.id,
+        status=status,
+        category_id=category_id,
+    )
+
+
 @inject
 def _delete_task(
     session: SessionType = Depends,
@@ -172,6 +344,27 @@ def _complete_task(
     session.commit()
 
 
+def _write_tasks_state(task_dao: TaskDao, tasks: List[Task], now: datetime) -> int:
+    """Compute the state of the tasks and write back those that changed"""
+    rows = []
+    for task in tasks:
+        task_status, next_event_datetime = compute_task_state(task=task, now=now)
+        if (task_status, next_event_datetime) != (
+            task.status,
+            task.next_event_datetime,
+        ):
+            rows.append(
+                {
+                    "id": task.id,
+                    "state_version": task.state_version,
+                    "status": task_status,
+                    "next_event_datetime": next_event_datetime,
+                }
+            )
+
+    return task_dao.update_states(rows)
+
+
 @inject
 def _recompute_task_state(
     session: SessionType = Depends,
@@ -181,17 +374,106 @@ def _recompute_task_state(
     now: datetime = Depends(get_datetime_now),
     task_dao: TaskDao = Depends(get_task_dao),
 ) -> None:
-    task = task_dao.get(id=task_id)
-    status, next_event_datetime = compute_task_state(task=task, now=now)
-    task_dao.update(
-        id=task_id,
-        user_id=authenticated_user.id,
-        status=status,
-        next_event_datetime=next_event_datetime,
-    )
+    task = task_dao.get(id=task_id, user_id=authenticated_user.id)
+    _write_tasks_state(task_dao=task_dao, tasks=[task], now=now)
     session.commit()
 
 
+@inject
+def _recompute_tasks_state(
+    session: SessionType,
+    task_ids: OptionalFilter[List[int]] = NO_FILTER,
+    user_id: OptionalFilter[int] = NO_FILTER,
+    status: OptionalFilter[TaskStatus] = NO_FILTER,
+    chunk_size: int = 500,
+    # Injected
+    now: datetime = Depends(get_datetime_now),
+    task_dao: TaskDao = Depends(get_task_dao),
+) -> int:
+    """Recompute the state of all the matching tasks, chunk by chunk.
+
+    Each chunk is loaded with a single query, and the tasks that changed
+    are written back with a single executemany before being committed.
+    A chunk that fails is recomputed task by task, so that a failing task
+    is skipped rather than the rest of the run."""
+    updated = 0
+
+    for chunk_task_ids in task_dao.iter_id_batches(
+        ids=task_ids, user_id=user_id, status=status, batch_size=chunk_size
+    ):
+        try:
+            with session.begin_nested():
+                updated += _write_tasks_state(
+                    task_dao=task_dao,
+                    tasks=task_dao.list_for_state_computation(ids=chunk_task_ids),
+                    now=now,
+                )
+        except Exception:
+            logger.exception(
+                f"Failed to recompute the state of the tasks {chunk_task_ids[0]} "
+                f"to {chunk_task_ids[-1]}, retrying them one at a time"
+            )
+            updated += _write_tasks_state_one_by_one(
+                session=session, task_dao=task_dao, task_ids=chunk_task_ids, now=now
+            )
+        session.commit()
+
+    return updated
+
+
+def _write_tasks_state_one_by_one(
+    session: SessionType, task_dao: TaskDao, task_ids: List[int], now: datetime
+) -> int:
+    """Write the state of each task in its own savepoint, skipping and
+    logging the tasks that fail"""
+    updated = 0
+
+    for task_id in task_ids:
+        try:
+            with session.begin_nested():
+                updated += _write_tasks_state(
+                    task_dao=task_dao,
+                    tasks=task_dao.list_for_state_computation(ids=[task_id]),
+                    now=now,
+                )
+        except Exception:
+            logger.exception(f"Failed to recompute the state of the task {task_id}")
+
+    return updated
+
+
+@inject
+def _recompute_versioned_tasks_state(
+    session: SessionType,
+    task_state_versions: Dict[int, int],
+    chunk_size: int = 500,
+    # Injected
+    now: datetime = Depends(get_datetime_now),
+    task_dao: TaskDao = Depends(get_task_dao),
+) -> List[int]:
+    """Recompute the state of the tasks changed up to the given versions.
+
+    Return the ids of the tasks read at an older version than requested,
+    whose change isn't visible yet and which should be retried."""
+    task_ids = sorted(task_state_versions)
+    lagging_task_ids = []
+
+    for start in range(0, len(task_ids), chunk_size):
+        tasks = []
+        for task in task_dao.list_for_state_computation(
+            ids=task_ids[start : start + chunk_size]
+        ):
+            if task.state_version < task_state_versions[task.id]:
+                lagging_task_ids.append(task.id)
+            else:
+                tasks.append(task)
+
+        _write_tasks_state(task_dao=task_dao, tasks=tasks, now=now)
+        session.commit()
+
+    return lagging_task_ids
+
+
 @inject
 def _create_frequency(
     frequency_creation_payload: TaskFrequencyCreationSchema = Depends,
@@ -293,8 +575,24 @@ def _update_task_until(
 @inject
 def _mark_ongoing_date_tasks_as_completed(
     session: SessionType,
+    batch_size: int = 500,
     # Injected
+    today: date = Depends(get_date_now),
     task_dao: TaskDao = Depends(get_task_dao),
-):
-    task_dao.mark_ongoing_date_tasks_as_completed()
-    session.commit()
+) -> int:
+    """Complete the tasks whose until date has been reached, batch by batch.
+
+    Each batch is committed straight away so its locks are only held
+    briefly. Completed tasks no longer match, so an interrupted sweep is
+    resumed by running it again. Return the number of tasks completed."""
+    completed = 0
+    last_id = None
+
+    while task_ids := task_dao.mark_ongoing_date_tasks_as_completed(
+        today=today, after_id=last_id, batch_size=batch_size
+    ):
+        session.commit()
+        completed += len(task_ids)
+        last_id = task_ids[-1]
+
+    return completed
@@ -10,6 +10,7 @@ from app.tasks.models.task_frequency import (
     Weekday,
 )
 from app.tasks.models.task_until import UntilType
+from app.tasks.schemas.task_schema import TaskDue
 
 period_to_days: Dict[FrequencyPeriod, int] = {
     FrequencyPeriod.day: 1,
@@ -67,7 +68,7 @@ def get_end_of_current_period(period: FrequencyPeriod, current_date: date) -> da
 def _compute_approximated_next_event_datetime_for__this(
     task: Task,
 ) -> datetime:
-    remaining_events: int = task.frequency.amount - len(task.events)
+    remaining_events: int = task.frequency.amount - task.event_count
 
     # This shouldn't happen because we should validate ongoing status prior to this
     assert remaining_events >= 1
@@ -84,9 +85,9 @@ def _compute_approximated_next_event_datetime_for__this(
         end_datetime - (task.latest_event_datetime or task.created)
     ).total_seconds() // 60
     minutes_between_events: int = remaining_minutes // (remaining_events + 1)
-    next_event: datetime = (
-        task.latest_event.effective_datetime if task.latest_event else task.created
-    ) + timedelta(minutes=minutes_between_events)
+    next_event: datetime = (task.latest_event_datetime or task.created) + timedelta(
+        minutes=minutes_between_events
+    )
     return next_event
 
 
@@ -97,7 +98,7 @@ def _compute_approximated_next_event_datetime_for__on(
     we choose the end of the day."""
 
     # This shouldn't happen because we should validate ongoing status prior to this
-    assert len(task.events) == 0
+    assert task.event_count == 0
 
     on_datetime = datetime.combine(task.frequency.once_on_date, time(0, 0))
     on_datetime = on_datetime + (
@@ -114,10 +115,8 @@ def _compute_approximated_next_event_datetime_for__on(
 def _compute_approximated_next_event_datetime_for__per(
     task: Task,
 ) -> datetime:
-    latest_event = task.latest_event
-    latest_effective_datetime = (
-        latest_event.effective_datetime if latest_event else task.created
-    )
+    latest_event_datetime = task.latest_event_datetime
+    latest_effective_datetime = latest_event_datetime or task.created
 
     if task.frequency.is_once_per_day:
         # Do it the day after the previous event
@@ -127,7 +126,7 @@ def _compute_approximated_next_event_datetime_for__per(
                 datetime.combine(latest_effective_datetime.date(), time())
                 + timedelta(days=1)
             ).date()
-            if latest_event
+            if latest_event_datetime
             else task.created.date()
         )
 
@@ -151,7 +150,9 @@ def _compute_approximated_next_event_datetime_for__per(
             task.frequency.once_at_time or time(hour=12, minute=0),
         ) + timedelta(
             days=abs(delta_weekdays)
-            if (operator.le if not latest_event else operator.lt)(delta_weekdays, 0)
+            if (operator.le if not latest_event_datetime else operator.lt)(
+                delta_weekdays, 0
+            )
             else (7 - delta_weekdays),
         )
     else:
@@ -161,13 +162,13 @@ def _compute_approximated_next_event_datetime_for__per(
             24 * 60 * period_to_days[task.frequency.period]
         ) // task.frequency.amount
 
-        if not latest_event:
+        if not latest_event_datetime:
             return task.created + timedelta(minutes=minutes_between_events)
 
         # If there are two recent events, we add allow a bit of a delay before the next required event
-        if second_latest_event := task.second_latest_event:
+        if second_latest_event_datetime := task.second_latest_event_datetime:
             delta_seconds = (
-                latest_event.effective_datetime - second_latest_event.effective_datetime
+                latest_event_datetime - second_latest_event_datetime
             ).total_seconds()
             delta_minutes = math.floor(delta_seconds / 60)
             if delta_minutes < minutes_between_events:
@@ -176,9 +177,26 @@ def _compute_approximated_next_event_datetime_for__per(
                 )
 
         # This value might be in the past but thats ok, it will be treated as overdue
-        return latest_event.effective_datetime + timedelta(
-            minutes=minutes_between_events
-        )
+        return latest_event_datetime + timedelta(minutes=minutes_between_events)
+
+
+def get_due_datetime_range(
+    due: TaskDue, now: datetime, within_hours: int = 24
+) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """The next event datetime range, as [start, end), of the due tasks"""
+    if due == TaskDue.overdue:
+        return None, now
+
+    if due == TaskDue.upcoming:
+        return now, now + timedelta(hours=within_hours)
+
+    start_of_today = datetime.combine(now.date(), time.min)
+
+    if due == TaskDue.this_week:
+        start_of_week = start_of_today - timedelta(days=now.weekday())
+        return start_of_week, start_of_week + timedelta(weeks=1)
+
+    return start_of_today, start_of_today + timedelta(days=1)
 
 
 def compute_approximated_next_event_datetime(task: Task) -> datetime:
@@ -199,7 +217,7 @@ def compute_task_status(task: Task, now: datetime) -> TaskStatus:
     if task.until.type == UntilType.amount:
         return (
             TaskStatus.ongoing
-            if len(task.events) < task.until.amount
+            if task.event_count < task.until.amount
             else TaskStatus.completed
         )
 
@@ -1,11 +1,14 @@
+from typing import List
+
 from app.accounts.models.user import User
 from app.database import SessionType
 from app.tasks.services.task_event_service.signals import (
     task_event_created,
     task_event_deleted,
+    task_events_bulk_created,
 )
-from app.tasks.services.task_service.service import (
-    recompute_task_state,
+from app.tasks.services.task_service._dependencies import (
+    get_task_state_recompute_queue,
 )
 from app.tasks.services.task_service.signals import task_updated
 
@@ -19,8 +22,14 @@ def trigger_task_state_recompute(
     session: SessionType,
     authenticated_user: User,
 ):
-    recompute_task_state(
-        session=session,
-        authenticated_user=authenticated_user,
-        task_id=task_id,
-    )
+    get_task_state_recompute_queue().enqueue(session=session, task_ids=[task_id])
+
+
+@task_events_bulk_created.connect
+def trigger_tasks_state_recompute(
+    sender,
+    task_ids: List[int],
+    session: SessionType,
+    authenticated_user: User,
+):
+    get_task_state_recompute_queue().enqueue(session=session, task_ids=task_ids)
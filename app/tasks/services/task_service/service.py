@@ -1,13 +1,18 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 
 from anyio.abc._tasks import TaskStatus
+from sqlalchemy.engine import Row
 
 from app.accounts.models.user import User
-from app.database import SessionType
+from app.database import AsyncSessionType, SessionType
+from app.shared.dao import Pagination, PaginationFilters
+from app.shared.memoization import session_memoized
 from app.shared.sentinels import NO_FILTER, OptionalFilter
 from app.tasks.models.task import Task
 from app.tasks.schemas.task_schema import (
     TaskCreationSchema,
+    TaskDue,
     TaskFrequencyCreationSchema,
     TaskUntilCreationSchema,
 )
@@ -16,11 +21,19 @@ from ._service import (
     _complete_task,
     _create_task,
     _delete_task,
+    _get_due_tasks,
     _get_task,
+    _get_task_async,
+    _get_task_occurrences,
     _get_tasks,
+    _get_tasks_async,
     _mark_ongoing_date_tasks_as_completed,
+    _paginate_tasks,
+    _paginate_tasks_async,
     _pause_task,
     _recompute_task_state,
+    _recompute_tasks_state,
+    _recompute_versioned_tasks_state,
     _unpause_task,
     _update_task_frequency,
     _update_task_until,
@@ -39,6 +52,7 @@ def create_task(
     )
 
 
+@session_memoized
 def get_task(
     session: SessionType,
     authenticated_user: User,
@@ -65,6 +79,118 @@ def get_tasks(
     )
 
 
+async def get_task_async(
+    session: AsyncSessionType,
+    authenticated_user: User,
+    task_id: int,
+) -> Task:
+    return await _get_task_async(
+        session=session,
+        authenticated_user=authenticated_user,
+        task_id=task_id,
+    )
+
+
+async def get_tasks_async(
+    session: AsyncSessionType,
+    authenticated_user: User,
+    status: OptionalFilter[TaskStatus] = NO_FILTER,
+    category_id: OptionalFilter[Optional[int]] = NO_FILTER,
+) -> List[Task]:
+    return await _get_tasks_async(
+        session=session,
+        authenticated_user=authenticated_user,
+        status=status,
+        category_id=category_id,
+    )
+
+
+def get_task_occurrences(
+    session: SessionType,
+    authenticated_user: User,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    task_id: OptionalFilter[int] = NO_FILTER,
+    limit: int = 100,
+) -> List[Dict[str, Any]]:
+    return _get_task_occurrences(
+        session=session,
+        authenticated_user=authenticated_user,
+        start=start,
+        end=end,
+        task_id=task_id,
+        limit=limit,
+    )
+
+
+def get_due_tasks(
+    session: SessionType,
+    authenticated_user: User,
+    due: TaskDue,
+    within_hours: int = 24,
+    limit: int = 50,
+) -> List[Row]:
+    return _get_due_tasks(
+        session=session,
+        authenticated_user=authenticated_user,
+        due=due,
+        within_hours=within_hours,
+        limit=limit,
+    )
+
+
+def paginate_tasks(
+    session: SessionType,
+    authenticated_user: User,
+    pagination: PaginationFilters,
+    status: OptionalFilter[TaskStatus] = NO_FILTER,
+    category_id: OptionalFilter[Optional[int]] = NO_FILTER,
+    category_tree_id: OptionalFilter[int] = NO_FILTER,
+    next_event_datetime_from: OptionalFilter[datetime] = NO_FILTER,
+    next_event_datetime_to: OptionalFilter[datetime] = NO_FILTER,
+    due: Optional[TaskDue] = None,
+    fields: OptionalFilter[List[str]] = NO_FILTER,
+) -> Pagination[Task]:
+    return _paginate_tasks(
+        session=session,
+        authenticated_user=authenticated_user,
+        pagination=pagination,
+        status=status,
+        category_id=category_id,
+        category_tree_id=category_tree_id,
+        next_event_datetime_from=next_event_datetime_from,
+        next_event_datetime_to=next_event_datetime_to,
+        due=due,
+        fields=fields,
+    )
+
+
+async def paginate_tasks_async(
+    session: AsyncSessionType,
+    authenticated_user: User,
+    pagination: PaginationFilters,
+    status: OptionalFilter[TaskStatus] = NO_FILTER,
+    category_id: OptionalFilter[Optional[int]] = NO_FILTER,
+    category_tree_id: OptionalFilter[int] = NO_FILTER,
+    next_event_datetime_from: OptionalFilter[datetime] = NO_FILTER,
+    next_event_datetime_to: OptionalFilter[datetime] = NO_FILTER,
+    due: Optional[TaskDue] = None,
+    fields: OptionalFilter[List[str]] = NO_FILTER,
+) -> Pagination[Task]:
+    return await _paginate_tasks_async(
+        session=session,
+        authenticated_user=authenticated_user,
+        pagination=pagination,
+        status=status,
+        category_id=category_id,
+        category_tree_id=category_tree_id,
+        next_event_datetime_from=next_event_datetime_from,
+        next_event_datetime_to=next_event_datetime_to,
+        due=due,
+        fields=fields,
+    )
+
+
 def delete_task(
     session: SessionType,
     authenticated_user: User,
@@ -125,6 +251,34 @@ def recompute_task_state(
     )
 
 
+def recompute_tasks_state(
+    session: SessionType,
+    task_ids: OptionalFilter[List[int]] = NO_FILTER,
+    user_id: OptionalFilter[int] = NO_FILTER,
+    status: OptionalFilter[TaskStatus] = NO_FILTER,
+    chunk_size: int = 500,
+) -> int:
+    return _recompute_tasks_state(
+        session=session,
+        task_ids=task_ids,
+        user_id=user_id,
+        status=status,
+        chunk_size=chunk_size,
+    )
+
+
+def recompute_versioned_tasks_state(
+    session: SessionType,
+    task_state_versions: Dict[int, int],
+    chunk_size: int = 500,
+) -> List[int]:
+    return _recompute_versioned_tasks_state(
+        session=session,
+        task_state_versions=task_state_versions,
+        chunk_size=chunk_size,
+    )
+
+
 def update_task_frequency(
     session: SessionType,
     task_id: int,
@@ -153,6 +307,7 @@ def update_task_until(
     )
 
 
-def mark_ongoing_date_tasks_as_completed(session: SessionType):
-    # TODO test
-    _mark_ongoing_date_tasks_as_completed(session=session)
+def mark_ongoing_date_tasks_as_completed(
+    session: SessionType, batch_size: int = 500
+) -> int:
+    return _mark_ongoing_date_tasks_as_completed(session=session, batch_size=batch_size)
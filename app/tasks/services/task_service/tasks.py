@@ -1,10 +1,58 @@
+import logging
+from typing import List
+
 from app.celery import celery
 from app.database import using_get_session
+from app.settings import settings
+from app.tasks.models.task import TaskStatus
 
 from . import service as task_service
+from ._dependencies import get_task_state_recompute_queue
+
+logger = logging.getLogger(__name__)
+
+
+# Acknowledged once done, so a sweep interrupted by a lost worker is redelivered
+@celery.task(acks_late=True)
+def trigger_mark_ongoing_date_tasks_as_completed() -> int:
+    with using_get_session() as session:
+        completed = task_service.mark_ongoing_date_tasks_as_completed(
+            session=session,
+            batch_size=settings.TASK_COMPLETION_SWEEP_BATCH_SIZE,
+        )
+
+    logger.info(f"{completed} tasks completed on reaching their until date")
+    return completed
 
 
 @celery.task
-def trigger_mark_ongoing_date_tasks_as_completed():
+def trigger_recompute_ongoing_tasks_state():
     with using_get_session() as session:
-        task_service.mark_ongoing_date_tasks_as_completed(session=session)
+        task_service.recompute_tasks_state(session=session, status=TaskStatus.ongoing)
+
+
+@celery.task
+def trigger_recompute_tasks_state(task_state_versions: List[List[int]]):
+    task_state_versions = dict(task_state_versions)
+
+    # From now on, a change to these tasks schedules another recompute
+    get_task_state_recompute_queue().release(task_state_versions)
+
+    with using_get_session() as session:
+        lagging_task_ids = task_service.recompute_versioned_tasks_state(
+            session=session,
+            task_state_versions=task_state_versions,
+            chunk_size=settings.TASK_STATE_RECOMPUTE_BATCH_SIZE,
+        )
+
+    if lagging_task_ids:
+        # Their latest change isn't visible to this session yet
+        trigger_recompute_tasks_state.apply_async(
+            args=[
+                [
+                    [task_id, task_state_versions[task_id]]
+                    for task_id in lagging_task_ids
+                ]
+            ],
+            countdown=settings.TASK_STATE_RECOMPUTE_WINDOW_SECONDS,
+        )
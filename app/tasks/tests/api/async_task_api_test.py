@@ -0,0 +1,123 @@
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.accounts.tests.factories import UserFactory
+from app.application import create_app
+from app.database import AsyncSessionType, get_async_session
+from app.settings import settings
+from app.tasks.tests.factories import TaskFactory
+
+
+@pytest.fixture(scope="function")
+def app():
+    with patch.object(settings, "ASYNC_DATABASE_ENABLED", True):
+        yield create_app()
+
+
+@pytest.fixture(scope="function")
+def async_client(client: TestClient, app, portal, async_session):
+    # The requests run in the event loop of the async session
+    client.portal = portal
+    app.dependency_overrides[get_async_session] = lambda: async_session
+    return client
+
+
+def test_get_tasks_failure_not_authenticated(async_client: TestClient):
+    response = async_client.get("/api/tasks")
+
+    assert response.status_code == 401
+    assert response.json() == {"detail": "Authentication required"}
+
+
+def test_get_tasks_ok(async_client: TestClient, async_add, using_user):
+    user = UserFactory.build(password_hash="hash")
+    tasks = [TaskFactory.build(user=user) for _ in range(3)]
+    async_add(*tasks, TaskFactory.build(user=UserFactory.build(password_hash="hash")))
+
+    with using_user(user):
+        response = async_client.get("/api/tasks", params={"page": 2, "per_page": 2})
+
+    assert response.status_code == 200
+    assert response.json() | {"items": None} == {
+        "page": 2,
+        "per_page": 2,
+        "total": 3,
+        "total_is_estimate": False,
+        "pages": 2,
+        "has_prev": True,
+        "has_next": False,
+        "prev_num": 1,
+        "next_num": None,
+        "items": None,
+    }
+    assert [item["id"] for item in response.json()["items"]] == [tasks[2].id]
+
+
+def test_get_task_ok(async_client: TestClient, async_add, using_user):
+    user = UserFactory.build(password_hash="hash")
+    task = TaskFactory.build(user=user)
+    async_add(task)
+
+    with using_user(user):
+        response = async_client.get(f"/api/tasks/{task.id}")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "name": task.name,
+        "description": task.description,
+        "category_id": task.category_id,
+        "frequency": {
+            "type": task.frequency.type.value,
+            "period": task.frequency.period.value,
+            "amount": task.frequency.amount,
+            "use_calendar_period": task.frequency.use_calendar_period,
+            "once_on_date": task.frequency.once_on_date,
+            "once_per_weekday": task.frequency.once_per_weekday,
+            "once_at_time": task.frequency.once_at_time,
+        },
+        "until": {
+            "type": task.until.type.value,
+            "amount": task.until.amount,
+            "date": task.until.date,
+        },
+        "id": task.id,
+        "created": task.created.strftime("%Y-%m-%dT%H:%M:%S"),
+        "next_event_datetime": task.next_event_datetime,
+    }
+
+
+def test_get_task_failure_not_visible_to_user(
+    async_client: TestClient, async_add, using_user
+):
+    (task,) = async_add(TaskFactory.build(user=UserFactory.build(password_hash="hash")))
+
+    with using_user(UserFactory.build(id=task.user_id + 1)):
+        response = async_client.get(f"/api/tasks/{task.id}")
+
+    assert response.status_code == 404
+    assert response.json() == {"message": "Task not found", "type": "NoResultFound"}
+
+
+def test_get_async_session(
+    async_client: TestClient, app, async_add, async_session, using_user
+):
+    user = UserFactory.build(password_hash="hash")
+    task = TaskFactory.build(user=user)
+    async_add(task)
+    del app.dependency_overrides[get_async_session]
+
+    # Sessions of the factory share the connection of the test, seeing its data
+    session_factory = async_sessionmaker(
+        bind=async_session.bind, class_=AsyncSessionType, expire_on_commit=False
+    )
+    with (
+        patch("app.database.async_session_factory", session_factory),
+        using_user(user),
+    ):
+        response = async_client.get(f"/api/tasks/{task.id}")
+
+    assert response.status_code == 200
+    assert response.json()["id"] == task.id
@@ -0,0 +1,104 @@
+import csv
+import io
+import json
+
+from fastapi.testclient import TestClient
+
+from app.accounts.tests.factories import UserFactory
+from app.tasks.tests.factories import TaskEventMetricFactory, TaskFactory
+
+
+def test_export_failure_not_authenticated(client: TestClient):
+    response = client.get("/api/export")
+
+    assert response.status_code == 401
+    assert response.json() == {"detail": "Authentication required"}
+
+
+def test_export_ndjson_ok(client: TestClient, using_user):
+    TaskEventMetricFactory()  # Noise
+
+    user = UserFactory()
+    event_metric = TaskEventMetricFactory(task=TaskFactory(user=user))
+
+    with using_user(user):
+        response = client.get("/api/export")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["content-encoding"] == "gzip"
+
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [(record["type"], record["id"]) for record in records] == [
+        ("task", event_metric.task_event.task_id),
+        ("task_metric", event_metric.task_metric_id),
+        ("task_event", event_metric.task_event_id),
+        ("task_event_metric", event_metric.id),
+    ]
+    assert records[-1] == {
+        "type": "task_event_metric",
+        "id": event_metric.id,
+        "task_metric_id": event_metric.task_metric_id,
+        "task_event_id": event_metric.task_event_id,
+        "value": f"{event_metric.value:.2f}",
+    }
+
+
+def test_export_ndjson_record_types_ok(client: TestClient, using_user):
+    user = UserFactory()
+    event_metric = TaskEventMetricFactory(task=TaskFactory(user=user))
+
+    with using_user(user):
+        response = client.get(
+            "/api/export", params={"record_type": ["task_event", "task"]}
+        )
+
+    assert response.status_code == 200
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [(record["type"], record["id"]) for record in records] == [
+        ("task", event_metric.task_event.task_id),
+        ("task_event", event_metric.task_event_id),
+    ]
+
+
+def test_export_csv_ok(client: TestClient, using_user):
+    user = UserFactory()
+    task = TaskFactory(user=user)
+
+    with using_user(user):
+        response = client.get(
+            "/api/export", params={"format": "csv", "record_type": "task"}
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 1
+    assert rows[0]["id"] == str(task.id)
+    assert rows[0]["name"] == task.name
+    assert rows[0]["frequency.type"] == task.frequency.type.value
+    assert rows[0]["until.amount"] == str(task.until.amount)
+
+
+def test_export_csv_failure_several_record_types(client: TestClient, using_user):
+    with using_user(UserFactory()):
+        response = client.get("/api/export", params={"format": "csv"})
+
+    assert response.status_code == 400
+    assert response.json() == {
+        "message": "A csv export should contain a single record type",
+        "type": "ServiceValidationError",
+    }
+
+
+def test_export_uncompressed_ok(client: TestClient, using_user):
+    user = UserFactory()
+    TaskFactory(user=user)
+
+    with using_user(user):
+        response = client.get("/api/export", headers={"Accept-Encoding": "identity"})
+
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert json.loads(response.content.splitlines()[0])["type"] == "task"
@@ -1,4 +1,4 @@
-from datetime import date
+from datetime import date, datetime, time, timedelta
 
 from fastapi.testclient import TestClient
 
@@ -6,7 +6,7 @@ from app.accounts.tests.factories import UserFactory
 from app.tasks.models.task import Task, TaskStatus
 from app.tasks.models.task_frequency import FrequencyPeriod, FrequencyType
 from app.tasks.models.task_until import UntilType
-from app.tasks.tests.factories import TaskFactory
+from app.tasks.tests.factories import CategoryFactory, TaskFactory
 
 
 def test_create_task_failure_not_authenticated(client: TestClient):
@@ -138,33 +138,245 @@ def test_get_tasks_ok(client: TestClient, using_user):
         response = client.get("/api/tasks")
 
     assert response.status_code == 200
-    assert response.json() == [
+    assert response.json() == {
+        "page": 1,
+        "per_page": 50,
+        "total": 1,
+        "total_is_estimate": False,
+        "pages": 1,
+        "has_prev": False,
+        "has_next": False,
+        "prev_num": None,
+        "next_num": None,
+        "items": [
+            {
+                "name": task.name,
+                "description": task.description,
+                "category_id": task.category_id,
+                "frequency": {
+                    "type": task.frequency.type.value,
+                    "period": task.frequency.period.value,
+                    "amount": task.frequency.amount,
+                    "use_calendar_period": task.frequency.use_calendar_period,
+                    "once_on_date": task.frequency.once_on_date,
+                    "once_per_weekday": task.frequency.once_per_weekday,
+                    "once_at_time": task.frequency.once_at_time,
+                },
+                "until": {
+                    "type": task.until.type.value,
+                    "amount": task.until.amount,
+                    "date": task.until.date,
+                },
+                "id": task.id,
+                "created": task.created.strftime("%Y-%m-%dT%H:%M:%S"),
+                "next_event_datetime": task.next_event_datetime,
+            }
+        ],
+    }
+
+
+def test_get_tasks_paginated(client: TestClient, using_user):
+    user = UserFactory()
+    tasks = [TaskFactory(user=user) for _ in range(3)]
+
+    with using_user(user):
+        response = client.get("/api/tasks", params={"page": 2, "per_page": 2})
+
+    assert response.status_code == 200
+    assert response.json() | {"items": None} == {
+        "page": 2,
+        "per_page": 2,
+        "total": 3,
+        "total_is_estimate": False,
+        "pages": 2,
+        "has_prev": True,
+        "has_next": False,
+        "prev_num": 1,
+        "next_num": None,
+        "items": None,
+    }
+    assert [item["id"] for item in response.json()["items"]] == [tasks[2].id]
+
+
+def test_get_tasks_sparse_fields(client: TestClient, using_user):
+    user = UserFactory()
+    task = TaskFactory(user=user)
+
+    with using_user(user):
+        response = client.get("/api/tasks", params={"fields": "id,name,created"})
+
+    assert response.status_code == 200
+    assert response.json()["items"] == [
         {
+            "id": task.id,
             "name": task.name,
-            "description": task.description,
-            "category_id": task.category_id,
+            "created": task.created.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+    ]
+
+
+def test_get_tasks_sparse_fields_only_relationships(client: TestClient, using_user):
+    user = UserFactory()
+    task = TaskFactory(user=user)
+
+    with using_user(user):
+        response = client.get("/api/tasks", params={"fields": "frequency"})
+
+    assert response.status_code == 200
+    assert response.json()["items"] == [
+        {
             "frequency": {
                 "type": task.frequency.type.value,
                 "period": task.frequency.period.value,
                 "amount": task.frequency.amount,
                 "use_calendar_period": task.frequency.use_calendar_period,
-                "once_on_date": task.frequency.once_on_date,
-                "once_per_weekday": task.frequency.once_per_weekday,
-                "once_at_time": task.frequency.once_at_time,
-            },
-            "until": {
-                "type": task.until.type.value,
-                "amount": task.until.amount,
-                "date": task.until.date,
-            },
-            "id": task.id,
-            "created": task.created.strftime("%Y-%m-%dT%H:%M:%S"),
-            "next_event_datetime": task.next_event_datetime,
+                "once_on_date": None,
+                "once_per_weekday": None,
+                "once_at_time": None,
+            }
         }
     ]
 
 
-# TODO test filters
+def test_get_tasks_failure_unknown_fields(client: TestClient, using_user):
+    with using_user(UserFactory()):
+        response = client.get("/api/tasks", params={"fields": "id,password"})
+
+    assert response.status_code == 400
+    assert response.json() == {
+        "message": "Unknown task fields: password",
+        "type": "ServiceValidationError",
+    }
+
+
+def test_get_tasks_filter_by_category_tree_id(client: TestClient, using_user):
+    user = UserFactory()
+    category = CategoryFactory(user=user)
+    child_category = CategoryFactory(user=user, parent_category_id=category.id)
+    task_1 = TaskFactory(user=user, category=category)
+    task_2 = TaskFactory(user=user, category=child_category)
+    TaskFactory(user=user, category=None)
+
+    with using_user(user):
+        response = client.get(
+            "/api/tasks", params={"category_tree_id": category.id, "fields": "id"}
+        )
+
+    assert response.status_code == 200
+    assert response.json()["items"] == [{"id": task_1.id}, {"id": task_2.id}]
+
+
+def test_get_tasks_filter_by_due(client: TestClient, using_user, subtests):
+    user = UserFactory()
+    now = datetime.utcnow()
+    overdue_task = TaskFactory(user=user, next_event_datetime=now - timedelta(days=2))
+    today_task = TaskFactory(
+        user=user, next_event_datetime=datetime.combine(now.date(), time(23, 59))
+    )
+    TaskFactory(user=user, next_event_datetime=now + timedelta(days=2))
+
+    cases = [
+        ("overdue", [overdue_task]),
+        ("today", [today_task]),
+    ]
+
+    for due, expected_tasks in cases:
+        with subtests.test(msg=due), using_user(user):
+            response = client.get("/api/tasks", params={"due": due, "fields": "id"})
+
+            assert response.status_code == 200
+            assert response.json()["items"] == [
+                {"id": task.id} for task in expected_tasks
+            ]
+
+
+def test_get_due_tasks_ok(client: TestClient, using_user, subtests):
+    user = UserFactory()
+    now = datetime.utcnow()
+    overdue_task = TaskFactory(user=user, next_event_datetime=now - timedelta(days=2))
+    upcoming_task = TaskFactory(user=user, next_event_datetime=now + timedelta(hours=2))
+    later_task = TaskFactory(user=user, next_event_datetime=now + timedelta(hours=30))
+    # Noise
+    TaskFactory(
+        user=user,
+        status=TaskStatus.paused,
+        next_event_datetime=now - timedelta(days=1),
+    )
+    TaskFactory(next_event_datetime=now - timedelta(days=1))
+
+    cases = [
+        ({"due": "overdue"}, [overdue_task]),
+        ({"due": "upcoming"}, [upcoming_task]),
+        ({"due": "upcoming", "within_hours": 48}, [upcoming_task, later_task]),
+        ({"due": "overdue", "limit": 1}, [overdue_task]),
+    ]
+
+    for params, expected_tasks in cases:
+        with subtests.test(msg=str(params)), using_user(user):
+            response = client.get("/api/tasks/due", params=params)
+
+            assert response.status_code == 200
+            assert response.json() == [
+                {
+                    "id": task.id,
+                    "name": task.name,
+                    "category_id": task.category_id,
+                    "next_event_datetime": task.next_event_datetime.isoformat(),
+                }
+                for task in expected_tasks
+            ]
+
+
+def test_get_due_tasks_failure_missing_due(client: TestClient, using_user):
+    with using_user(UserFactory()):
+        response = client.get("/api/tasks/due")
+
+    assert response.status_code == 422
+
+
+def test_get_task_occurrences_ok(client: TestClient, using_user):
+    user = UserFactory()
+    daily_task = TaskFactory(
+        user=user,
+        created=datetime(2024, 2, 1, 9, 0),
+        frequency__period=FrequencyPeriod.day,
+        frequency__once_at_time=time(8, 0),
+    )
+    weekly_task = TaskFactory(
+        user=user,
+        created=datetime(2024, 2, 1, 9, 0),
+        frequency__period=FrequencyPeriod.week,
+    )
+    # Noise
+    TaskFactory(user=user, status=TaskStatus.paused)
+    TaskFactory(created=datetime(2024, 2, 1, 9, 0))
+
+    with using_user(user):
+        response = client.get(
+            "/api/tasks/occurrences",
+            params={"start": "2024-02-07T00:00:00", "end": "2024-02-09T00:00:00"},
+        )
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {"task_id": daily_task.id, "occurrence_datetime": "2024-02-07T08:00:00"},
+        {"task_id": daily_task.id, "occurrence_datetime": "2024-02-08T08:00:00"},
+        {"task_id": weekly_task.id, "occurrence_datetime": "2024-02-08T09:00:00"},
+    ]
+
+
+def test_get_task_occurrences_failure_invalid_range(client: TestClient, using_user):
+    with using_user(UserFactory()):
+        response = client.get(
+            "/api/tasks/occurrences",
+            params={"start": "2024-02-09T00:00:00", "end": "2024-02-07T00:00:00"},
+        )
+
+    assert response.status_code == 400
+    assert response.json() == {
+        "message": "The end of the range must follow its start",
+        "type": "ServiceValidationError",
+    }
 
 
 def test_get_task_failure_not_authenticated(client: TestClient):
@@ -1,8 +1,14 @@
+from datetime import datetime
+
 from fastapi.testclient import TestClient
 
 from app.accounts.tests.factories import UserFactory
 from app.tasks.models.task_event import TaskEvent
-from app.tasks.tests.factories import TaskEventFactory, TaskFactory
+from app.tasks.tests.factories import (
+    TaskEventFactory,
+    TaskFactory,
+    TaskMetricFactory,
+)
 
 
 def test_create_task_event_failure_not_authenticated(client: TestClient):
@@ -72,6 +78,147 @@ def test_create_task_event_ok(client: TestClient, using_user):
     }
 
 
+def test_create_task_event_with_metrics_ok(client: TestClient, using_user):
+    user = UserFactory()
+    task = TaskFactory(user=user)
+    task_metric_1 = TaskMetricFactory(task=task, required=True)
+    task_metric_2 = TaskMetricFactory(task=task)
+
+    with using_user(user):
+        response = client.post(
+            "/api/task-events/with-metrics",
+            json={
+                "task_id": task.id,
+                "around": "today",
+                "metrics": [
+                    {"task_metric_id": task_metric_1.id, "value": "1.50"},
+                    {"task_metric_id": task_metric_2.id, "value": "2"},
+                ],
+            },
+        )
+
+    assert response.status_code == 201
+    response_json = response.json()
+    assert response_json["task_id"] == task.id
+    assert response_json["metrics"] == [
+        {
+            "id": response_json["metrics"][0]["id"],
+            "task_event_id": response_json["id"],
+            "task_metric_id": task_metric_1.id,
+            "value": "1.50",
+        },
+        {
+            "id": response_json["metrics"][1]["id"],
+            "task_event_id": response_json["id"],
+            "task_metric_id": task_metric_2.id,
+            "value": "2.00",
+        },
+    ]
+
+
+def test_create_task_event_with_metrics_failure_invalid_metrics(
+    client: TestClient, using_user, subtests
+):
+    user = UserFactory()
+    task = TaskFactory(user=user)
+    required_task_metric = TaskMetricFactory(task=task, required=True)
+    other_task_metric = TaskMetricFactory(task=TaskFactory(user=user))
+
+    cases = [
+        (
+            [{"task_metric_id": other_task_metric.id, "value": "1"}],
+            "Task metric and event aren't related to the same task",
+        ),
+        (
+            [],
+            f"Missing values for the required metrics: {required_task_metric.name}",
+        ),
+    ]
+
+    for metrics, message in cases:
+        with subtests.test(msg=message), using_user(user):
+            response = client.post(
+                "/api/task-events/with-metrics",
+                json={"task_id": task.id, "around": "today", "metrics": metrics},
+            )
+
+            assert response.status_code == 400
+            assert response.json() == {
+                "message": message,
+                "type": "ServiceValidationError",
+            }
+
+    assert task.event_count == 0
+
+
+def test_create_task_events_failure_task_not_visible_to_user(
+    client: TestClient, using_user
+):
+    user = UserFactory()
+    task = TaskFactory(user=user)
+    other_task = TaskFactory()
+
+    with using_user(user):
+        response = client.post(
+            "/api/task-events/bulk",
+            json={
+                "events": [
+                    {"task_id": task.id, "around": "today"},
+                    {"task_id": other_task.id, "around": "today"},
+                ]
+            },
+        )
+
+    assert response.status_code == 404
+    assert response.json() == {
+        "message": "Task not found",
+        "type": "NoResultFound",
+    }
+    assert task.event_count == 0
+
+
+def test_create_task_events_failure_empty_batch(client: TestClient, using_user):
+    with using_user(UserFactory()):
+        response = client.post("/api/task-events/bulk", json={"events": []})
+
+    assert response.status_code == 422
+
+
+def test_create_task_events_ok(client: TestClient, using_user):
+    user = UserFactory()
+    task_1 = TaskFactory(user=user)
+    task_2 = TaskFactory(user=user)
+
+    with using_user(user):
+        response = client.post(
+            "/api/task-events/bulk",
+            json={
+                "events": [
+                    {"task_id": task_1.id, "around": "yesterday"},
+                    {
+                        "task_id": task_1.id,
+                        "around": "specifically",
+                        "at": "2020-12-25T12:00:00",
+                    },
+                    {"task_id": task_2.id, "around": "today"},
+                ]
+            },
+        )
+
+    assert response.status_code == 201
+    response_json = response.json()
+    assert [(event["task_id"], event["around"]) for event in response_json] == [
+        (task_1.id, "yesterday"),
+        (task_1.id, "specifically"),
+        (task_2.id, "today"),
+    ]
+    assert response_json[1]["effective_datetime"] == "2020-12-25T12:00:00"
+
+    assert task_1.event_count == 2
+    assert task_1.second_latest_event_datetime == datetime(2020, 12, 25, 12)
+    assert task_2.event_count == 1
+
+
 def test_get_task_events_failure_not_authenticated(client: TestClient):
     response = client.get("/api/task-events")
 
@@ -104,18 +251,94 @@ def test_get_task_events_ok(client: TestClient, using_user):
         )
 
     assert response.status_code == 200
-    assert response.json() == [
-        {
-            "task_id": task_event.task_id,
-            "around": task_event.around.value,
-            "at": task_event.at,
-            "effective_datetime": task_event.effective_datetime.strftime(
-                "%Y-%m-%dT%H:%M:%S"
-            ),
-            "created": task_event.created.strftime("%Y-%m-%dT%H:%M:%S"),
-            "id": task_event.id,
-        }
+    assert response.json() == {
+        "per_page": 50,
+        "total": None,
+        "has_prev": False,
+        "has_next": False,
+        "prev_cursor": None,
+        "next_cursor": None,
+        "items": [
+            {
+                "task_id": task_event.task_id,
+                "around": task_event.around.value,
+                "at": task_event.at,
+                "effective_datetime": task_event.effective_datetime.strftime(
+                    "%Y-%m-%dT%H:%M:%S"
+                ),
+                "created": task_event.created.strftime("%Y-%m-%dT%H:%M:%S"),
+                "id": task_event.id,
+            }
+        ],
+    }
+
+
+def test_get_task_events_ok__effective_datetime_range(client: TestClient, using_user):
+    user = UserFactory()
+    task = TaskFactory(user=user)
+    TaskEventFactory(task=task, effective_datetime=datetime(2024, 1, 31, 23, 59))
+    task_event = TaskEventFactory(task=task, effective_datetime=datetime(2024, 2, 1))
+    TaskEventFactory(task=task, effective_datetime=datetime(2024, 3, 1))
+
+    with using_user(user):
+        response = client.get(
+            "/api/task-events",
+            params={
+                "task_id": task.id,
+                "effective_datetime_from": "2024-02-01T00:00:00",
+                "effective_datetime_to": "2024-03-01T00:00:00",
+            },
+        )
+
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["items"]] == [task_event.id]
+
+
+def test_get_task_events_ok__follow_cursor(client: TestClient, using_user):
+    user = UserFactory()
+    task = TaskFactory(user=user)
+    task_events = [
+        TaskEventFactory(task=task, effective_datetime=datetime(2024, 1, day))
+        for day in range(5, 0, -1)
     ]
+    TaskEventFactory(task__user=user)  # Noise
+
+    pages = []
+    params = {"task_id": task.id, "per_page": 2, "with_total": True}
+    with using_user(user):
+        while True:
+            response = client.get("/api/task-events", params=params)
+            assert response.status_code == 200
+            pages.append(response.json())
+
+            if not pages[-1]["has_next"]:
+                break
+            params = {
+                "task_id": task.id,
+                "per_page": 2,
+                "cursor": pages[-1]["next_cursor"],
+            }
+
+    # Most recent first, each page continuing from the previous one
+    assert [[item["id"] for item in page["items"]] for page in pages] == [
+        [task_events[0].id, task_events[1].id],
+        [task_events[2].id, task_events[3].id],
+        [task_events[4].id],
+    ]
+    assert [page["total"] for page in pages] == [5, None, None]
+    assert [page["has_prev"] for page in pages] == [False, True, True]
+
+
+def test_get_task_events_failure_invalid_cursor(client: TestClient, using_user):
+    task = TaskFactory()
+
+    with using_user(task.user):
+        response = client.get(
+            "/api/task-events", params={"task_id": task.id, "cursor": "invalid"}
+        )
+
+    assert response.status_code == 400
+    assert response.json()["type"] == "ServiceValidationError"
 
 
 def test_get_task_event_failure_not_authenticated(client: TestClient):
@@ -181,9 +404,10 @@ def test_delete_task_event_failure_not_visible_to_user(client: TestClient, using
 def test_delete_task_event_ok(client: TestClient, using_user, session):
     user = UserFactory()
     task_event = TaskEventFactory(task__user=user)
+    primary_key = (task_event.id, task_event.effective_datetime)
 
     with using_user(user):
         response = client.delete(f"/api/task-events/{task_event.id}")
 
     assert response.status_code == 204
-    assert session.get(TaskEvent, task_event.id) is None
+    assert session.get(TaskEvent, primary_key) is None
@@ -184,9 +184,10 @@ def test_delete_task_event_metric_failure_not_visible_to_user(
 def test_delete_task_event_metric_ok(client: TestClient, using_user, session):
     user = UserFactory()
     task_event_metric = TaskEventMetricFactory(task__user=user)
+    primary_key = (task_event_metric.id, task_event_metric.effective_datetime)
 
     with using_user(user):
         response = client.delete(f"/api/task-event-metrics/{task_event_metric.id}")
 
     assert response.status_code == 204
-    assert session.get(TaskEventMetric, task_event_metric.id) is None
+    assert session.get(TaskEventMetric, primary_key) is None
@@ -1,8 +1,16 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
 from fastapi.testclient import TestClient
 
 from app.accounts.tests.factories import UserFactory
 from app.tasks.models.task_metric import TaskMetric
-from app.tasks.tests.factories import TaskFactory, TaskMetricFactory
+from app.tasks.tests.factories import (
+    TaskEventMetricFactory,
+    TaskFactory,
+    TaskMetricFactory,
+)
 
 
 def test_create_task_metric_failure_not_authenticated(client: TestClient):
@@ -157,6 +165,153 @@ def test_get_task_metric_ok(client: TestClient, using_user):
     }
 
 
+def test_get_task_metric_aggregates_failure_not_visible_to_user(
+    client: TestClient, using_user
+):
+    task_metric = TaskMetricFactory()
+
+    with using_user(UserFactory()):
+        response = client.get(
+            f"/api/task-metrics/{task_metric.id}/aggregates",
+            params={"bucket": "day"},
+        )
+
+    assert response.status_code == 404
+    assert response.json() == {
+        "message": "Task Metric not found",
+        "type": "NoResultFound",
+    }
+
+
+def test_get_task_metric_aggregates_failure_invalid_range(
+    client: TestClient, using_user
+):
+    user = UserFactory()
+    task_metric = TaskMetricFactory(task__user=user)
+
+    with using_user(user):
+        response = client.get(
+            f"/api/task-metrics/{task_metric.id}/aggregates",
+            params={
+                "bucket": "day",
+                "effective_datetime_from": "2024-02-01T00:00:00",
+                "effective_datetime_to": "2024-01-01T00:00:00",
+            },
+        )
+
+    assert response.status_code == 400
+    assert response.json() == {
+        "message": "The end of the range must follow its start",
+        "type": "ServiceValidationError",
+    }
+
+
+def test_get_task_metric_aggregates_ok(client: TestClient, using_user):
+    user = UserFactory()
+    task_metric = TaskMetricFactory(task__user=user)
+    for effective_datetime, value in [
+        (datetime(2024, 1, 10), 2),
+        (datetime(2024, 1, 20), 4),
+        (datetime(2024, 3, 5), 6),
+    ]:
+        TaskEventMetricFactory(
+            task=task_metric.task,
+            task_metric=task_metric,
+            task_event__effective_datetime=effective_datetime,
+            value=Decimal(value),
+        )
+
+    with using_user(user):
+        response = client.get(
+            f"/api/task-metrics/{task_metric.id}/aggregates",
+            params={"bucket": "month"},
+        )
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {
+            "bucket": "2024-01-01T00:00:00",
+            "count": 2,
+            "sum": 6.0,
+            "avg": 3.0,
+            "min": 2.0,
+            "max": 4.0,
+            "p50": 3.0,
+            "p90": 3.8,
+            "p99": 3.98,
+        },
+        {
+            "bucket": "2024-03-01T00:00:00",
+            "count": 1,
+            "sum": 6.0,
+            "avg": 6.0,
+            "min": 6.0,
+            "max": 6.0,
+            "p50": 6.0,
+            "p90": 6.0,
+            "p99": 6.0,
+        },
+    ]
+
+
+def test_get_task_metric_rollups_failure_not_visible_to_user(
+    client: TestClient, using_user
+):
+    task_metric = TaskMetricFactory()
+
+    with using_user(UserFactory()):
+        response = client.get(
+            f"/api/task-metrics/{task_metric.id}/rollups",
+            params={"period": "day"},
+        )
+
+    assert response.status_code == 404
+    assert response.json() == {
+        "message": "Task Metric not found",
+        "type": "NoResultFound",
+    }
+
+
+def test_get_task_metric_rollups_ok(client: TestClient, using_user):
+    user = UserFactory()
+    task_metric = TaskMetricFactory(task__user=user)
+    for effective_datetime, value in [
+        (datetime(2024, 1, 1, 8), 2),
+        (datetime(2024, 1, 1, 20), 4),
+        (datetime(2024, 1, 3), 6),
+        (datetime(2024, 1, 9), 1),
+    ]:
+        TaskEventMetricFactory(
+            task=task_metric.task,
+            task_metric=task_metric,
+            task_event__effective_datetime=effective_datetime,
+            value=Decimal(value),
+        )
+
+    with using_user(user):
+        response = client.get(
+            f"/api/task-metrics/{task_metric.id}/rollups",
+            params={
+                "period": "week",
+                "effective_datetime_to": "2024-01-08T00:00:00",
+            },
+        )
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {
+            "bucket": "2024-01-01T00:00:00",
+            "count": 3,
+            "sum": 12.0,
+            "sum_of_squares": 56.0,
+            "min": 2.0,
+            "max": 6.0,
+            "avg": 4.0,
+            "stddev": pytest.approx(1.632993),
+        },
+    ]
+
+
 def test_delete_task_metric_failure_not_authenticated(client: TestClient):
     response = client.delete("/api/task-metrics/12345")
 
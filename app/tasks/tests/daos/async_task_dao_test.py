@@ -0,0 +1,121 @@
+from datetime import datetime
+from functools import partial
+
+import pytest
+from sqlalchemy.exc import NoResultFound
+
+from app.accounts.tests.factories import UserFactory
+from app.shared.dao import CountMode, CursorPaginationFilters, PaginationFilters
+from app.tasks.daos.task_dao import AsyncTaskDao
+from app.tasks.models.task import TaskStatus
+from app.tasks.tests.factories import TaskFactory
+
+
+def build_tasks(count: int, **kwargs):
+    user = UserFactory.build(password_hash="hash")
+    return user, [
+        TaskFactory.build(
+            user=user, next_event_datetime=datetime(2024, 1, day), **kwargs
+        )
+        for day in range(1, count + 1)
+    ]
+
+
+def test_get(portal, async_session, async_add, subtests):
+    user, (task,) = build_tasks(1)
+    other_task = TaskFactory.build(user=UserFactory.build(password_hash="hash"))
+    async_add(task, other_task)
+
+    dao = AsyncTaskDao(session=async_session)
+
+    with subtests.test(msg="visible to the user"):
+        fetched = portal.call(partial(dao.get, id=task.id, user_id=user.id))
+
+        assert (fetched.id, fetched.name) == (task.id, task.name)
+
+    with subtests.test(msg="not visible to the user"):
+        with pytest.raises(NoResultFound, match="Task not found"):
+            portal.call(partial(dao.get, id=other_task.id, user_id=user.id))
+
+    with subtests.test(msg="without raising"):
+        assert (
+            portal.call(
+                partial(dao.get, id=other_task.id, user_id=user.id, raise_exc=False)
+            )
+            is None
+        )
+
+
+def test_list(portal, async_session, async_add):
+    user, tasks = build_tasks(2)
+    paused_task = TaskFactory.build(
+        user=user, status=TaskStatus.paused, next_event_datetime=None
+    )
+    # Noise
+    async_add(
+        *tasks,
+        paused_task,
+        TaskFactory.build(user=UserFactory.build(password_hash="hash")),
+    )
+
+    listed = portal.call(
+        partial(
+            AsyncTaskDao(session=async_session).list,
+            user_id=user.id,
+            status=TaskStatus.ongoing,
+        )
+    )
+
+    assert [task.id for task in listed] == [task.id for task in tasks]
+
+
+def test_paginate(portal, async_session, async_add, subtests):
+    user, tasks = build_tasks(3)
+    async_add(*tasks)
+
+    dao = AsyncTaskDao(session=async_session)
+
+    for count_mode, expected_total in [
+        (CountMode.exact, 3),
+        (CountMode.window, 3),
+        (CountMode.none, None),
+    ]:
+        with subtests.test(msg=count_mode.value):
+            page = portal.call(
+                partial(
+                    dao.paginate,
+                    pagination=PaginationFilters(page=1, per_page=2),
+                    count_mode=count_mode,
+                    user_id=user.id,
+                )
+            )
+
+            assert [task.id for task in page.items] == [task.id for task in tasks[:2]]
+            assert page.total == expected_total
+            assert page.has_next
+
+
+def test_cursor_paginate(portal, async_session, async_add):
+    user, tasks = build_tasks(3)
+    async_add(*tasks)
+
+    dao = AsyncTaskDao(session=async_session)
+    first = portal.call(
+        partial(
+            dao.paginate,
+            pagination=CursorPaginationFilters(per_page=2, with_total=True),
+            user_id=user.id,
+        )
+    )
+    second = portal.call(
+        partial(
+            dao.paginate,
+            pagination=CursorPaginationFilters(cursor=first.next_cursor, per_page=2),
+            user_id=user.id,
+        )
+    )
+
+    assert [task.id for task in first.items] == [task.id for task in tasks[:2]]
+    assert first.total == 3
+    assert [task.id for task in second.items] == [tasks[2].id]
+    assert second.next_cursor is None
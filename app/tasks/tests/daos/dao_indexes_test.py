@@ -0,0 +1,112 @@
+import inspect
+from typing import List, Set, Tuple
+
+import pytest
+from sqlalchemy import Column, PrimaryKeyConstraint, Table, UniqueConstraint
+from sqlalchemy.sql import operators, visitors
+from sqlalchemy.sql.elements import BinaryExpression
+
+from app.accounts.daos.user_dao import UserDao
+from app.database import Base
+from app.shared.sentinels import NO_FILTER
+from app.tasks.daos.category_dao import CategoryDao
+from app.tasks.daos.task_dao import TaskDao
+from app.tasks.daos.task_event_dao import TaskEventDao
+from app.tasks.daos.task_event_metric_dao import TaskEventMetricDao
+from app.tasks.daos.task_metric_dao import TaskMetricDao
+from app.tasks.daos.task_metric_rollup_dao import TaskMetricRollupDao
+
+DAOS = [
+    UserDao,
+    CategoryDao,
+    TaskDao,
+    TaskEventDao,
+    TaskMetricDao,
+    TaskEventMetricDao,
+    TaskMetricRollupDao,
+]
+
+# Filters only used by maintenance jobs walking the whole table
+UNSCOPED_FILTERS_ALLOWED = {(TaskDao, "status")}
+
+# Read per metric, once the metric is known to be visible to the user
+SCOPES = {TaskMetricRollupDao: {"task_metric_id": 1}}
+
+
+def get_filtered_columns(statement) -> Set[Tuple[str, str]]:
+    # Columns are compared by name, the orm expressions being annotated copies
+    columns = set()
+
+    for element in visitors.iterate(statement.whereclause):
+        if isinstance(element, BinaryExpression) and element.operator in (
+            operators.eq,
+            operators.in_op,
+        ):
+            for side in (element.left, element.right):
+                if isinstance(side, Column) and isinstance(side.table, Table):
+                    columns.add((side.table.name, side.name))
+
+    return columns
+
+
+def get_index_column_lists(table_name: str) -> List[List[Tuple[str, str]]]:
+    table = Base.metadata.tables[table_name]
+    constraints = [
+        constraint
+        for constraint in table.constraints
+        if isinstance(constraint, (PrimaryKeyConstraint, UniqueConstraint))
+    ]
+    return [
+        [(table.name, column.name) for column in index.columns]
+        for index in [*table.indexes, *constraints]
+    ]
+
+
+def is_indexed(column: Tuple[str, str], filtered_columns: Set[Tuple[str, str]]) -> bool:
+    """The column is usable by an index if the columns preceding it in the
+    index are filtered too"""
+    table_name, _ = column
+    for index_columns in get_index_column_lists(table_name):
+        for position, index_column in enumerate(index_columns):
+            if index_column == column and all(
+                leading_column in filtered_columns
+                for leading_column in index_columns[:position]
+            ):
+                return True
+
+    return False
+
+
+def get_filter_names(dao_class) -> List[str]:
+    return [
+        name
+        for name, parameter in inspect.signature(dao_class.query).parameters.items()
+        if parameter.default is NO_FILTER
+    ]
+
+
+def get_filter_value(dao_class, name: str):
+    annotation = str(inspect.signature(dao_class.query).parameters[name].annotation)
+    return [1] if "List" in annotation else 1
+
+
+@pytest.mark.parametrize("dao_class", DAOS, ids=lambda dao: dao.__name__)
+def test_dao_filters_are_indexed(dao_class, subtests):
+    filter_names = get_filter_names(dao_class)
+    # Queries of the api are always scoped to the authenticated user
+    scope = SCOPES.get(dao_class, {"user_id": 1} if "user_id" in filter_names else {})
+
+    for name in filter_names:
+        if (dao_class, name) in UNSCOPED_FILTERS_ALLOWED:
+            continue
+
+        with subtests.test(msg=name):
+            filters = {**scope, name: get_filter_value(dao_class, name)}
+            filtered_columns = get_filtered_columns(dao_class().query(**filters))
+
+            missing = [
+                ".".join(column)
+                for column in filtered_columns
+                if not is_indexed(column, filtered_columns)
+            ]
+            assert not missing, f"{name} filters on unindexed columns {missing}"
@@ -1,9 +1,11 @@
 from datetime import date, datetime, timedelta
 
 import pytest
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.exc import IntegrityError, NoResultFound
 
 from app.accounts.tests.factories import UserFactory
+from app.shared.dao import CountMode, CursorPaginationFilters, PaginationFilters
+from app.shared.exceptions import ServiceValidationError
 from app.tasks.daos.task_dao import TaskDao
 from app.tasks.models.task import Task, TaskStatus
 from app.tasks.models.task_until import UntilType
@@ -127,6 +129,52 @@ def test_query_filter_by_category_id(session, subtests):
             assert tasks == expected_tasks
 
 
+def test_query_filter_by_category_tree_id(session, subtests):
+    category = CategoryFactory()
+    child_category = CategoryFactory(parent_category_id=category.id)
+    grandchild_category = CategoryFactory(parent_category_id=child_category.id)
+    task_1 = TaskFactory(category=category)
+    task_2 = TaskFactory(category=child_category)
+    task_3 = TaskFactory(category=grandchild_category)
+    TaskFactory(category=None)
+    TaskFactory(category=CategoryFactory())
+
+    cases = [
+        ({"category_tree_id": category.id}, [task_1, task_2, task_3]),
+        ({"category_tree_id": child_category.id}, [task_2, task_3]),
+        ({"category_tree_id": grandchild_category.id}, [task_3]),
+    ]
+
+    for filters, expected_tasks in cases:
+        with subtests.test():
+            tasks = TaskDao(session=session).list(**filters)
+            assert tasks == expected_tasks
+
+
+def test_query_filter_by_next_event_datetime_range(session, subtests):
+    TaskFactory(next_event_datetime=None)
+    task_1 = TaskFactory(next_event_datetime=datetime(2020, 12, 24, 12))
+    task_2 = TaskFactory(next_event_datetime=datetime(2020, 12, 25, 0))
+    task_3 = TaskFactory(next_event_datetime=datetime(2020, 12, 26, 0))
+
+    cases = [
+        ({"next_event_datetime_from": datetime(2020, 12, 25)}, [task_2, task_3]),
+        ({"next_event_datetime_to": datetime(2020, 12, 25)}, [task_1]),
+        (
+            {
+                "next_event_datetime_from": datetime(2020, 12, 25),
+                "next_event_datetime_to": datetime(2020, 12, 26),
+            },
+            [task_2],
+        ),
+    ]
+
+    for filters, expected_tasks in cases:
+        with subtests.test():
+            tasks = TaskDao(session=session).list(**filters)
+            assert tasks == expected_tasks
+
+
 def test_query_filter_by_status(session, subtests):
     task_1 = TaskFactory(status=TaskStatus.ongoing)
     task_2 = TaskFactory(status=TaskStatus.completed)
@@ -176,6 +224,7 @@ def test_update_status_ok(session):
     session.refresh(task)
 
     assert task.status == TaskStatus.completed
+    assert task.state_version == 1
 
 
 def test_update_manually_completed_at_ok(session):
@@ -236,6 +285,73 @@ def test_update_until_id_ok(session):
     assert task.until == new_until
 
 
+def test_update_multiple_fields_ok(session):
+    task = TaskFactory(status=TaskStatus.ongoing, manually_completed_at=None)
+
+    TaskDao(session=session).update(
+        id=task.id,
+        user_id=task.user_id,
+        status=TaskStatus.completed,
+        manually_completed_at=datetime(2012, 12, 25, 12, 0, 0),
+    )
+
+    session.refresh(task)
+
+    assert task.status == TaskStatus.completed
+    assert task.manually_completed_at == datetime(2012, 12, 25, 12, 0, 0)
+
+
+def test_update_failure_other_user(session):
+    task = TaskFactory(status=TaskStatus.ongoing)
+    other_user = UserFactory()
+
+    with pytest.raises(NoResultFound) as ctx:
+        TaskDao(session=session).update(
+            id=task.id,
+            user_id=other_user.id,
+            status=TaskStatus.completed,
+        )
+
+    assert ctx.value.args[0] == "Task not found"
+
+    session.refresh(task)
+    assert task.status == TaskStatus.ongoing
+
+
+def test_update_states_skips_stale_versions(session):
+    current_task = TaskFactory(status=TaskStatus.completed, state_version=2)
+    changed_task = TaskFactory(status=TaskStatus.completed, state_version=3)
+
+    updated = TaskDao(session=session).update_states(
+        [
+            {
+                "id": current_task.id,
+                "state_version": 2,
+                "status": TaskStatus.ongoing,
+                "next_event_datetime": datetime(2022, 12, 21, 12, 0, 0),
+            },
+            # Computed before the latest change of the task
+            {
+                "id": changed_task.id,
+                "state_version": 2,
+                "status": TaskStatus.ongoing,
+                "next_event_datetime": datetime(2022, 12, 21, 12, 0, 0),
+            },
+        ]
+    )
+
+    assert updated == 1
+
+    session.expire_all()
+    assert session.get(Task, current_task.id).status == TaskStatus.ongoing
+    assert session.get(Task, current_task.id).next_event_datetime == datetime(
+        2022, 12, 21, 12, 0, 0
+    )
+    assert session.get(Task, changed_task.id).status == TaskStatus.completed
+    # Computed states don't change the version
+    assert session.get(Task, current_task.id).state_version == 2
+
+
 def test_delete_ok(session):
     # Noise
     TaskFactory.create_batch(3)
@@ -271,7 +387,9 @@ def test_mark_ongoing_date_tasks_as_completed(session):
         until__date=date.today() + timedelta(days=1),
     )
 
-    TaskDao(session=session).mark_ongoing_date_tasks_as_completed()
+    completed_ids = TaskDao(session=session).mark_ongoing_date_tasks_as_completed(
+        today=date.today()
+    )
 
     session.refresh(to_be_completed_yesterday)
     session.refresh(to_be_completed_today__ongoing)
@@ -284,3 +402,151 @@ def test_mark_ongoing_date_tasks_as_completed(session):
     assert to_be_completed_today__paused.status == TaskStatus.completed
     assert to_be_completed_tomorrow__ongoing.status == TaskStatus.ongoing
     assert to_be_completed_tomorrow__paused.status == TaskStatus.paused
+    assert completed_ids == sorted(
+        [
+            to_be_completed_yesterday.id,
+            to_be_completed_today__ongoing.id,
+            to_be_completed_today__paused.id,
+        ]
+    )
+
+
+def test_mark_ongoing_date_tasks_as_completed_in_batches(session):
+    tasks = TaskFactory.create_batch(
+        3, until__type=UntilType.date, until__date=date(2022, 12, 20)
+    )
+    TaskFactory(until__type=UntilType.stopped)  # Noise
+    dao = TaskDao(session=session)
+
+    first_batch = dao.mark_ongoing_date_tasks_as_completed(
+        today=date(2022, 12, 20), batch_size=2
+    )
+    second_batch = dao.mark_ongoing_date_tasks_as_completed(
+        today=date(2022, 12, 20), after_id=first_batch[-1], batch_size=2
+    )
+    last_batch = dao.mark_ongoing_date_tasks_as_completed(
+        today=date(2022, 12, 20), after_id=second_batch[-1], batch_size=2
+    )
+
+    assert first_batch == [tasks[0].id, tasks[1].id]
+    assert second_batch == [tasks[2].id]
+    assert last_batch == []
+
+
+def test_paginate_count_modes(session, subtests):
+    user = UserFactory()
+    tasks = [
+        TaskFactory(user=user, next_event_datetime=datetime(2020, 12, day, 12))
+        for day in range(1, 6)
+    ]
+    TaskFactory()  # Noise
+
+    dao = TaskDao(session=session)
+
+    for count_mode in [CountMode.exact, CountMode.window, CountMode.estimate]:
+        with subtests.test(msg=count_mode.value):
+            pagination = dao.paginate(
+                pagination=PaginationFilters(page=2, per_page=2),
+                user_id=user.id,
+                count_mode=count_mode,
+            )
+
+            assert pagination.items == tasks[2:4]
+            assert pagination.total == 5
+            assert not pagination.total_is_estimate
+            assert pagination.pages == 3
+            assert pagination.has_next
+
+    with subtests.test(msg="window past the last page"):
+        pagination = dao.paginate(
+            pagination=PaginationFilters(page=4, per_page=2),
+            user_id=user.id,
+            count_mode=CountMode.window,
+        )
+
+        assert pagination.items == []
+        assert pagination.total == 5
+
+    with subtests.test(msg="estimate above the threshold"):
+        pagination = dao.paginate(
+            pagination=PaginationFilters(page=1, per_page=2),
+            user_id=user.id,
+            count_mode=CountMode.estimate,
+            estimate_threshold=0,
+        )
+
+        assert pagination.items == tasks[:2]
+        assert pagination.total_is_estimate
+        assert pagination.total >= 0
+
+    with subtests.test(msg="none"):
+        pages = [
+            dao.paginate(
+                pagination=PaginationFilters(page=page, per_page=2),
+                user_id=user.id,
+                count_mode=CountMode.none,
+            )
+            for page in [1, 2, 3]
+        ]
+
+        assert [page.items for page in pages] == [tasks[:2], tasks[2:4], tasks[4:]]
+        assert [page.has_next for page in pages] == [True, True, False]
+        assert all(page.total is None and page.pages is None for page in pages)
+
+
+def test_stream_in_id_order(session):
+    user = UserFactory()
+    task_0 = TaskFactory(user=user, next_event_datetime=datetime(2020, 12, 25, 12))
+    task_1 = TaskFactory(user=user, next_event_datetime=datetime(2020, 12, 24, 12))
+    task_2 = TaskFactory(user=user, next_event_datetime=None)
+    TaskFactory()  # Noise
+
+    tasks = list(TaskDao(session=session).stream(user_id=user.id, batch_size=2))
+
+    assert tasks == [task_0, task_1, task_2]
+
+
+def test_cursor_paginate_follows_default_order_by(session):
+    user = UserFactory()
+    task_0 = TaskFactory(user=user, next_event_datetime=None)
+    task_1 = TaskFactory(user=user, next_event_datetime=datetime(2020, 12, 25, 12))
+    task_2 = TaskFactory(user=user, next_event_datetime=datetime(2020, 12, 24, 12))
+    task_3 = TaskFactory(user=user, next_event_datetime=datetime(2020, 12, 25, 12))
+    task_4 = TaskFactory(user=user, next_event_datetime=None)
+    TaskFactory()  # Noise
+
+    dao = TaskDao(session=session)
+
+    pages = []
+    cursor = None
+    while True:
+        pagination = dao.paginate(
+            pagination=CursorPaginationFilters(cursor=cursor, per_page=2),
+            user_id=user.id,
+        )
+        pages.append(pagination.items)
+        if not pagination.has_next:
+            break
+        cursor = pagination.next_cursor
+
+    assert pages == [[task_2, task_1], [task_3, task_0], [task_4]]
+    assert pagination.total is None
+
+    # Going backwards from the last page returns the previous page in the same order
+    previous = dao.paginate(
+        pagination=CursorPaginationFilters(
+            cursor=pagination.prev_cursor, per_page=2, with_total=True
+        ),
+        user_id=user.id,
+    )
+    assert previous.items == [task_3, task_0]
+    assert previous.has_prev
+    assert previous.has_next
+    assert previous.total == 5
+
+
+def test_cursor_paginate_failure_invalid_cursor(session):
+    with pytest.raises(ServiceValidationError):
+        TaskDao(session=session).paginate(
+            pagination=CursorPaginationFilters(cursor="invalid", per_page=2)
+        )
@@ -1,9 +1,19 @@
-from datetime import datetime
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import text
 
 from app.accounts.tests.factories import UserFactory
+from app.shared.dao import CursorPaginationFilters
 from app.tasks.daos.task_event_dao import TaskEventDao
+from app.tasks.daos.task_metric_rollup_dao import TaskMetricRollupDao
 from app.tasks.models.task_event import TaskEvent, TaskEventAround
-from app.tasks.tests.factories import TaskEventFactory, TaskFactory
+from app.tasks.models.task_metric_rollup import TaskMetricRollupPeriod
+from app.tasks.tests.factories import (
+    TaskEventFactory,
+    TaskEventMetricFactory,
+    TaskFactory,
+)
 
 
 def test_create_event_ok(session):
@@ -11,6 +21,7 @@ def test_create_event_ok(session):
 
     task_event = TaskEventDao(session=session).create(
         task_id=task.id,
+        user_id=task.user_id,
         around=TaskEventAround.specifically,
         at=datetime(2020, 12, 24, 12, 0, 0),
         # In this real case the "effective_datetime" would be the same as "at"
@@ -19,6 +30,7 @@ def test_create_event_ok(session):
     )
 
     assert task_event.task == task
+    assert task_event.user_id == task.user_id
     assert task_event.around == TaskEventAround.specifically
     assert task_event.at == datetime(2020, 12, 24, 12, 0, 0)
     assert task_event.effective_datetime == datetime(2020, 12, 24, 12, 0, 1)
@@ -80,6 +92,57 @@ def test_query_filter_by_user_id(session, subtests):
             assert task_events == expected_task_events
 
 
+def test_query_filter_by_effective_datetime(session, subtests):
+    task = TaskFactory()
+    task_event_1 = TaskEventFactory(task=task, effective_datetime=datetime(2024, 1, 31))
+    task_event_2 = TaskEventFactory(task=task, effective_datetime=datetime(2024, 2, 1))
+    task_event_3 = TaskEventFactory(task=task, effective_datetime=datetime(2024, 3, 1))
+
+    cases = [
+        ({}, [task_event_3, task_event_2, task_event_1]),
+        (
+            {"effective_datetime_from": datetime(2024, 2, 1)},
+            [task_event_3, task_event_2],
+        ),
+        ({"effective_datetime_to": datetime(2024, 3, 1)}, [task_event_2, task_event_1]),
+        (
+            {
+                "effective_datetime_from": datetime(2024, 2, 1),
+                "effective_datetime_to": datetime(2024, 3, 1),
+            },
+            [task_event_2],
+        ),
+    ]
+
+    for filters, expected_task_events in cases:
+        with subtests.test():
+            task_events = TaskEventDao(session=session).list(task_id=task.id, **filters)
+            assert task_events == expected_task_events
+
+
+def test_create_month_partition(session, subtests):
+    dao = TaskEventDao(session=session)
+
+    with subtests.test(msg="created once"):
+        assert dao.create_month_partition(date(2099, 1, 15)) is True
+        assert dao.create_month_partition(date(2099, 1, 1)) is False
+
+        task_event = TaskEventFactory(effective_datetime=datetime(2099, 1, 31, 23, 59))
+        assert (
+            session.scalar(
+                text("SELECT count(*) FROM task_events_2099_01 WHERE id = :id"),
+                {"id": task_event.id},
+            )
+            == 1
+        )
+
+    with subtests.test(msg="skipped while the default partition holds the month"):
+        TaskEventFactory(effective_datetime=datetime(2099, 2, 1))
+
+        assert dao.create_month_partition(date(2099, 2, 1)) is False
+        assert session.scalar(text("SELECT to_regclass('task_events_2099_02')")) is None
+
+
 def test_delete_ok(session):
     task_event = TaskEventFactory()
 
@@ -87,4 +150,108 @@ def test_delete_ok(session):
         id=task_event.id, user_id=task_event.task.user_id
     )
 
-    assert session.get(TaskEvent, task_event.id) is None
+    assert (
+        session.get(TaskEvent, (task_event.id, task_event.effective_datetime)) is None
+    )
+
+
+def test_delete_refreshes_metric_rollups(session):
+    task_event_metric = TaskEventMetricFactory(
+        task_event__effective_datetime=datetime(2024, 1, 2), value=Decimal(4)
+    )
+    # Kept in the same week
+    TaskEventMetricFactory(
+        task=task_event_metric.task_metric.task,
+        task_metric=task_event_metric.task_metric,
+        task_event__effective_datetime=datetime(2024, 1, 3),
+        value=Decimal(1),
+    )
+
+    TaskEventDao(session=session).delete(
+        id=task_event_metric.task_event_id, user_id=task_event_metric.user_id
+    )
+
+    rollup_dao = TaskMetricRollupDao(session=session)
+    assert [
+        (row.bucket, row.count, row.sum)
+        for row in rollup_dao.series(
+            task_metric_id=task_event_metric.task_metric_id,
+            period=TaskMetricRollupPeriod.day,
+        )
+    ] == [(datetime(2024, 1, 3), 1, 1)]
+    assert [
+        (row.bucket, row.count, row.sum)
+        for row in rollup_dao.series(
+            task_metric_id=task_event_metric.task_metric_id,
+            period=TaskMetricRollupPeriod.week,
+        )
+    ] == [(datetime(2024, 1, 1), 1, 1)]
+
+
+def test_cursor_paginate_ties_broken_by_id(session):
+    task = TaskFactory()
+    task_event_1 = TaskEventFactory(task=task, effective_datetime=datetime(2020, 1, 1))
+    task_event_2 = TaskEventFactory(task=task, effective_datetime=datetime(2020, 1, 2))
+    task_event_3 = TaskEventFactory(task=task, effective_datetime=datetime(2020, 1, 2))
+
+    dao = TaskEventDao(session=session)
+    first = dao.paginate(
+        pagination=CursorPaginationFilters(per_page=2), task_id=task.id
+    )
+    second = dao.paginate(
+        pagination=CursorPaginationFilters(cursor=first.next_cursor, per_page=2),
+        task_id=task.id,
+    )
+
+    assert first.items == [task_event_3, task_event_2]
+    assert first.has_next
+    assert not first.has_prev
+    assert second.items == [task_event_1]
+    assert not second.has_next
+    assert second.has_prev
+
+
+def test_create_event_updates_task_event_counters(session, subtests):
+    task = TaskFactory()
+    dao = TaskEventDao(session=session)
+
+    cases = [
+        (datetime(2020, 12, 24), 1, datetime(2020, 12, 24), None),
+        # Newer than the latest
+        (datetime(2020, 12, 26), 2, datetime(2020, 12, 26), datetime(2020, 12, 24)),
+        # Between the latest and the second latest
+        (datetime(2020, 12, 25), 3, datetime(2020, 12, 26), datetime(2020, 12, 25)),
+        # Older than the second latest
+        (datetime(2020, 12, 20), 4, datetime(2020, 12, 26), datetime(2020, 12, 25)),
+    ]
+
+    for effective_datetime, count, latest, second_latest in cases:
+        with subtests.test():
+            dao.create(
+                task_id=task.id,
+                user_id=task.user_id,
+                around=TaskEventAround.specifically,
+                at=effective_datetime,
+                effective_datetime=effective_datetime,
+                created=datetime(2020, 12, 27),
+            )
+            session.refresh(task)
+
+            assert task.event_count == count
+            assert task.latest_event_datetime == latest
+            assert task.second_latest_event_datetime == second_latest
+            assert task.state_version == count
+
+
+def test_delete_event_updates_task_event_counters(session):
+    task = TaskFactory()
+    TaskEventFactory(task=task, effective_datetime=datetime(2020, 12, 24))
+    TaskEventFactory(task=task, effective_datetime=datetime(2020, 12, 25))
+    latest = TaskEventFactory(task=task, effective_datetime=datetime(2020, 12, 26))
+
+    TaskEventDao(session=session).delete(id=latest.id, user_id=task.user_id)
+    session.refresh(task)
+
+    assert task.event_count == 2
+    assert task.latest_event_datetime == datetime(2020, 12, 25)
+    assert task.second_latest_event_datetime == datetime(2020, 12, 24)
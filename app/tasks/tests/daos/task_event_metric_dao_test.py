@@ -1,7 +1,12 @@
+from datetime import datetime
 from decimal import Decimal
 
+import pytest
+
 from app.tasks.daos.task_event_metric_dao import TaskEventMetricDao
+from app.tasks.daos.task_metric_rollup_dao import TaskMetricRollupDao
 from app.tasks.models.task_event_metric import TaskEventMetric
+from app.tasks.models.task_metric_rollup import TaskMetricRollupPeriod
 from app.tasks.tests.factories import (
     TaskEventFactory,
     TaskEventMetricFactory,
@@ -23,11 +28,14 @@ def test_create_task_event_metric_ok(session):
     task_event_metric = TaskEventMetricDao(session=session).create(
         task_metric_id=task_metric.id,
         task_event_id=task_event.id,
+        effective_datetime=task_event.effective_datetime,
+        user_id=task.user_id,
         value=Decimal(10),
     )
 
     assert task_event_metric.task_event == task_event
     assert task_event_metric.task_metric == task_metric
+    assert task_event_metric.user_id == task.user_id
     assert task_event_metric.value == Decimal(10)
 
 
@@ -134,6 +142,89 @@ def test_query_filter_by_user_id(session, subtests):
             assert task_event_metrics == expected_task_event_metrics
 
 
+def test_update_scoped_to_user(session):
+    task_event_metric = TaskEventMetricFactory(value=Decimal(1))
+    other_task_event_metric = TaskEventMetricFactory(value=Decimal(1))
+    user_id = task_event_metric.task_event.task.user_id
+    dao = TaskEventMetricDao(session=session)
+
+    statement = dao.update_statement(user_id=user_id).values(value=Decimal(2))
+    # The owner is joined rather than looked up by nested subqueries
+    assert "EXISTS" not in str(statement)
+
+    session.execute(statement)
+    session.expire_all()
+
+    assert session.get(
+        TaskEventMetric, (task_event_metric.id, task_event_metric.effective_datetime)
+    ).value == Decimal(2)
+    assert session.get(
+        TaskEventMetric,
+        (other_task_event_metric.id, other_task_event_metric.effective_datetime),
+    ).value == Decimal(1)
+
+
+def test_aggregate(session, subtests):
+    task_metric = TaskMetricFactory()
+    TaskEventMetricFactory(value=Decimal(1000))  # Noise, from another metric
+
+    for effective_datetime, value in [
+        (datetime(2024, 1, 1, 8, 0), 1),
+        (datetime(2024, 1, 1, 20, 0), 3),
+        (datetime(2024, 1, 3, 12, 0), 10),
+        (datetime(2024, 2, 1, 12, 0), 100),
+    ]:
+        TaskEventMetricFactory(
+            task=task_metric.task,
+            task_metric=task_metric,
+            task_event__effective_datetime=effective_datetime,
+            value=Decimal(value),
+        )
+
+    dao = TaskEventMetricDao(session=session)
+
+    with subtests.test(msg="per day within the range"):
+        rows = dao.aggregate(
+            task_metric_id=task_metric.id,
+            bucket="day",
+            effective_datetime_from=datetime(2024, 1, 1),
+            effective_datetime_to=datetime(2024, 2, 1),
+        )
+
+        assert [row._asdict() for row in rows] == [
+            {
+                "bucket": datetime(2024, 1, 1),
+                "count": 2,
+                "sum": 4,
+                "avg": 2,
+                "min": 1,
+                "max": 3,
+                "p50": 2,
+                "p90": pytest.approx(2.8),
+                "p99": pytest.approx(2.98),
+            },
+            {
+                "bucket": datetime(2024, 1, 3),
+                "count": 1,
+                "sum": 10,
+                "avg": 10,
+                "min": 10,
+                "max": 10,
+                "p50": 10,
+                "p90": 10,
+                "p99": 10,
+            },
+        ]
+
+    with subtests.test(msg="per week, starting on mondays"):
+        rows = dao.aggregate(task_metric_id=task_metric.id, bucket="week")
+
+        assert [(row.bucket, row.count, row.sum) for row in rows] == [
+            (datetime(2024, 1, 1), 3, 14),
+            (datetime(2024, 1, 29), 1, 100),
+        ]
+
+
 def test_delete_ok(session):
     task_event_metric = TaskEventMetricFactory()
 
@@ -142,4 +233,59 @@ def test_delete_ok(session):
         user_id=task_event_metric.task_event.task.user_id,
     )
 
-    assert session.get(TaskEventMetric, task_event_metric.id) is None
+    assert (
+        session.get(
+            TaskEventMetric,
+            (task_event_metric.id, task_event_metric.effective_datetime),
+        )
+        is None
+    )
+
+
+def test_create_and_delete_maintain_rollups(session, subtests):
+    task = TaskFactory()
+    task_metric = TaskMetricFactory(task=task)
+    task_events = [
+        TaskEventFactory(task=task, effective_datetime=datetime(2024, 1, 2, hour))
+        for hour in (8, 20)
+    ]
+    dao = TaskEventMetricDao(session=session)
+
+    def get_daily_rollups():
+        return [
+            (row.bucket, row.count, row.sum, row.min, row.max)
+            for row in TaskMetricRollupDao(session=session).series(
+                task_metric_id=task_metric.id, period=TaskMetricRollupPeriod.day
+            )
+        ]
+
+    with subtests.test(msg="create"):
+        first = dao.create(
+            task_metric_id=task_metric.id,
+            task_event_id=task_events[0].id,
+            effective_datetime=task_events[0].effective_datetime,
+            user_id=task.user_id,
+            value=Decimal(2),
+        )
+
+        assert get_daily_rollups() == [(datetime(2024, 1, 2), 1, 2, 2, 2)]
+
+    with subtests.test(msg="bulk create"):
+        dao.bulk_create(
+            [
+                dict(
+                    task_metric_id=task_metric.id,
+                    task_event_id=task_events[1].id,
+                    effective_datetime=task_events[1].effective_datetime,
+                    user_id=task.user_id,
+                    value=Decimal(6),
+                )
+            ]
+        )
+
+        assert get_daily_rollups() == [(datetime(2024, 1, 2), 2, 8, 2, 6)]
+
+    with subtests.test(msg="delete"):
+        dao.delete(id=first.id, user_id=task.user_id)
+
+        assert get_daily_rollups() == [(datetime(2024, 1, 2), 1, 6, 6, 6)]
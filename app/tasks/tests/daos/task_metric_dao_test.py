@@ -17,12 +17,14 @@ def test_create_task_metric_ok(session):
 
     task_metric = TaskMetricDao(session=session).create(
         task_id=task.id,
+        user_id=task.user_id,
         name="myname",
         prompt="enter my value",
         required=True,
     )
 
     assert task_metric.task == task
+    assert task_metric.user_id == task.user_id
     assert task_metric.name == "myname"
     assert task_metric.prompt == "enter my value"
     assert task_metric.required is True
@@ -36,6 +38,7 @@ def test_create_task_metric_failure_duplicate_name(session):
     with pytest.raises(IntegrityError) as ctx:
         TaskMetricDao(session=session).create(
             task_id=task.id,
+            user_id=user.id,
             name="myname",
             prompt="enter my value",
             required=True,
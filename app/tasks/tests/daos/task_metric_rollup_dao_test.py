@@ -0,0 +1,135 @@
+from datetime import datetime
+from decimal import Decimal
+
+from app.tasks.daos.task_metric_rollup_dao import TaskMetricRollupDao
+from app.tasks.models.task_metric_rollup import TaskMetricRollupPeriod
+from app.tasks.tests.factories import TaskEventMetricFactory, TaskMetricFactory
+
+
+def get_series(session, task_metric_id, period, **kwargs):
+    return [
+        (row.bucket, row.count, row.sum, row.sum_of_squares, row.min, row.max)
+        for row in TaskMetricRollupDao(session=session).series(
+            task_metric_id=task_metric_id, period=period, **kwargs
+        )
+    ]
+
+
+def test_increment(session, subtests):
+    task_metric = TaskMetricFactory()
+    dao = TaskMetricRollupDao(session=session)
+
+    dao.increment(
+        [
+            (task_metric.id, datetime(2024, 1, 2, 8, 0), Decimal(3)),
+            (task_metric.id, datetime(2024, 1, 2, 20, 0), Decimal(1)),
+            (task_metric.id, datetime(2024, 1, 10, 12, 0), Decimal(5)),
+        ]
+    )
+    # Combined with the existing buckets
+    dao.increment([(task_metric.id, datetime(2024, 1, 4, 12, 0), Decimal(-2))])
+
+    with subtests.test(msg="per day"):
+        assert get_series(session, task_metric.id, TaskMetricRollupPeriod.day) == [
+            (datetime(2024, 1, 2), 2, 4, 10, 1, 3),
+            (datetime(2024, 1, 4), 1, -2, 4, -2, -2),
+            (datetime(2024, 1, 10), 1, 5, 25, 5, 5),
+        ]
+
+    with subtests.test(msg="per week, starting on mondays"):
+        assert get_series(session, task_metric.id, TaskMetricRollupPeriod.week) == [
+            (datetime(2024, 1, 1), 3, 2, 14, -2, 3),
+            (datetime(2024, 1, 8), 1, 5, 25, 5, 5),
+        ]
+
+    with subtests.test(msg="within a range of bucket starts"):
+        assert get_series(
+            session,
+            task_metric.id,
+            TaskMetricRollupPeriod.day,
+            bucket_start_from=datetime(2024, 1, 3),
+            bucket_start_to=datetime(2024, 1, 10),
+        ) == [(datetime(2024, 1, 4), 1, -2, 4, -2, -2)]
+
+
+def test_refresh(session):
+    task_metric = TaskMetricFactory()
+    TaskEventMetricFactory(
+        task=task_metric.task,
+        task_metric=task_metric,
+        task_event__effective_datetime=datetime(2024, 1, 2, 8, 0),
+        value=Decimal(3),
+    )
+    removed = [
+        TaskEventMetricFactory(
+            task=task_metric.task,
+            task_metric=task_metric,
+            task_event__effective_datetime=effective_datetime,
+            value=Decimal(value),
+        )
+        for effective_datetime, value in [
+            (datetime(2024, 1, 2, 20, 0), 7),
+            (datetime(2024, 1, 3, 12, 0), 1),
+        ]
+    ]
+
+    for event_metric in removed:
+        session.delete(event_metric)
+    session.flush()
+
+    TaskMetricRollupDao(session=session).refresh(
+        [
+            (metric.task_metric_id, metric.effective_datetime, metric.value)
+            for metric in removed
+        ]
+    )
+
+    # The extremes are those of the remaining values, the emptied bucket is gone
+    assert get_series(session, task_metric.id, TaskMetricRollupPeriod.day) == [
+        (datetime(2024, 1, 2), 1, 3, 9, 3, 3),
+    ]
+    assert get_series(session, task_metric.id, TaskMetricRollupPeriod.week) == [
+        (datetime(2024, 1, 1), 1, 3, 9, 3, 3),
+    ]
+
+
+def test_rebuild(session):
+    task_metric = TaskMetricFactory()
+    other_task_metric = TaskMetricFactory()
+    for effective_datetime, value in [
+        (datetime(2024, 1, 2, 8, 0), 3),
+        (datetime(2024, 1, 2, 20, 0), 1),
+        (datetime(2024, 1, 10, 12, 0), 5),
+    ]:
+        TaskEventMetricFactory(
+            task=task_metric.task,
+            task_metric=task_metric,
+            task_event__effective_datetime=effective_datetime,
+            value=Decimal(value),
+        )
+    TaskEventMetricFactory(
+        task=other_task_metric.task,
+        task_metric=other_task_metric,
+        task_event__effective_datetime=datetime(2024, 1, 2),
+        value=Decimal(10),
+    )
+
+    dao = TaskMetricRollupDao(session=session)
+    # Drifted away from the event metrics
+    dao.increment([(task_metric.id, datetime(2024, 1, 2), Decimal(100))])
+    dao.increment([(other_task_metric.id, datetime(2024, 1, 2), Decimal(100))])
+
+    dao.rebuild(task_metric.id)
+
+    assert get_series(session, task_metric.id, TaskMetricRollupPeriod.day) == [
+        (datetime(2024, 1, 2), 2, 4, 10, 1, 3),
+        (datetime(2024, 1, 10), 1, 5, 25, 5, 5),
+    ]
+    assert get_series(session, task_metric.id, TaskMetricRollupPeriod.week) == [
+        (datetime(2024, 1, 1), 2, 4, 10, 1, 3),
+        (datetime(2024, 1, 8), 1, 5, 25, 5, 5),
+    ]
+    # The other metrics are left as they are
+    assert get_series(session, other_task_metric.id, TaskMetricRollupPeriod.day) == [
+        (datetime(2024, 1, 2), 2, 110, 10100, 10, 100),
+    ]
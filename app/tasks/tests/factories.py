@@ -6,6 +6,8 @@ from factory.declarations import LazyFunction
 
 from app.accounts.tests.factories import UserFactory
 from app.database import Session
+from app.tasks.daos.task_event_dao import TaskEventDao
+from app.tasks.daos.task_metric_rollup_dao import TaskMetricRollupDao
 from app.tasks.models.category import Category, IconNameEnum
 from app.tasks.models.task import Task, TaskStatus
 from app.tasks.models.task_event import TaskEvent, TaskEventAround
@@ -62,9 +64,20 @@ class TaskEventFactory(alchemy.SQLAlchemyModelFactory):
         sqlalchemy_session_persistence = "flush"
 
     task = SubFactory(TaskFactory)
+    user_id = SelfAttribute("task.user_id")
     around = TaskEventAround.today
     effective_datetime = LazyFunction(datetime.utcnow)
 
+    @classmethod
+    def _create(cls, model_class, *args, **kwargs):
+        task_event = super()._create(model_class, *args, **kwargs)
+
+        # Keep the denormalised event columns of the task in sync like the dao does
+        TaskEventDao(session=cls._meta.sqlalchemy_session).refresh_task_event_counters(
+            task_event.task_id
+        )
+        return task_event
+
 
 class TaskMetricFactory(alchemy.SQLAlchemyModelFactory):
     class Meta:
@@ -73,6 +86,7 @@ class TaskMetricFactory(alchemy.SQLAlchemyModelFactory):
         sqlalchemy_session_persistence = "flush"
 
     task = SubFactory(TaskFactory)
+    user_id = SelfAttribute("task.user_id")
     name = Sequence(lambda n: f"Metric {n}")
     prompt = Sequence(lambda n: f"Enter value for metric {n}")
     required = False
@@ -88,8 +102,26 @@ class TaskEventMetricFactory(alchemy.SQLAlchemyModelFactory):
     task = SubFactory(TaskFactory)
     task_metric = SubFactory(TaskMetricFactory, task=SelfAttribute("..task"))
     task_event = SubFactory(TaskEventFactory, task=SelfAttribute("..task"))
+    effective_datetime = SelfAttribute("task_event.effective_datetime")
+    user_id = SelfAttribute("task_event.user_id")
     value = Sequence(lambda n: Decimal(n))
 
+    @classmethod
+    def _create(cls, model_class, *args, **kwargs):
+        event_metric = super()._create(model_class, *args, **kwargs)
+
+        # Keep the rollups of the metric in sync like the dao does
+        TaskMetricRollupDao(session=cls._meta.sqlalchemy_session).increment(
+            [
+                (
+                    event_metric.task_metric_id,
+                    event_metric.effective_datetime,
+                    event_metric.value,
+                )
+            ]
+        )
+        return event_metric
+
 
 class CategoryFactory(alchemy.SQLAlchemyModelFactory):
     class Meta:
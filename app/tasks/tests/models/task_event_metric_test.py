@@ -9,7 +9,10 @@ def test_create_task_event_metric_failure_duplicate(session):
     existing = TaskEventMetricFactory()
 
     new = TaskEventMetric(
-        task_event=existing.task_event, task_metric=existing.task_metric, value=10
+        task_event=existing.task_event,
+        task_metric=existing.task_metric,
+        user_id=existing.user_id,
+        value=10,
     )
 
     session.add(new)
@@ -18,6 +18,11 @@ def test_delete_task_event_cascade(session):
     session.delete(task_event)
     session.flush()
 
-    assert session.get(TaskEvent, task_event.id) is None
-    assert session.get(TaskEventMetric, event_metric.id) is None
+    assert (
+        session.get(TaskEvent, (task_event.id, task_event.effective_datetime)) is None
+    )
+    assert (
+        session.get(TaskEventMetric, (event_metric.id, event_metric.effective_datetime))
+        is None
+    )
     assert session.get(TaskMetric, task_metric.id) is not None
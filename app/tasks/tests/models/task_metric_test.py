@@ -16,6 +16,7 @@ def test_create_failure_duplicate_metric_name_for_task(session):
 
     task_metric = TaskMetric(
         task=existing.task,
+        user_id=existing.user_id,
         name=existing.name,
         prompt="myprompt",
         required=True,
@@ -39,5 +40,11 @@ def test_delete_task_metric_cascade(session):
     session.flush()
 
     assert session.get(TaskMetric, task_metric.id) is None
-    assert session.get(TaskEventMetric, event_metric.id) is None
-    assert session.get(TaskEvent, task_event.id) is not None
+    assert (
+        session.get(TaskEventMetric, (event_metric.id, event_metric.effective_datetime))
+        is None
+    )
+    assert (
+        session.get(TaskEvent, (task_event.id, task_event.effective_datetime))
+        is not None
+    )
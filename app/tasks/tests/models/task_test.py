@@ -72,7 +72,7 @@ def test_delete_task_cascade_children(session):
     assert session.get(TaskUntil, until.id) is None
     assert session.get(TaskFrequency, frequency.id) is None
     assert session.get(Task, task.id) is None
-    assert session.get(TaskEvent, event.id) is None
+    assert session.get(TaskEvent, (event.id, event.effective_datetime)) is None
 
 
 def test_task_latest_event(session):
@@ -105,3 +105,24 @@ def test_task_second_latest_event(session):
 
     # event_3 is the latest created, but is the second latest effective event datetime
     assert task.second_latest_event == event_3
+
+
+def test_task_event_count(session):
+    task = TaskFactory()
+    TaskEventFactory.create_batch(3, task=task)
+    TaskEventFactory()  # Noise
+
+    assert task.event_count == 3
+
+
+def test_task_latest_events_only_loads_two_latest(session):
+    task = TaskFactory()
+    TaskEventFactory(task=task, effective_datetime=datetime(2020, 12, 24, 12, 0, 0))
+    event_2 = TaskEventFactory(
+        task=task, effective_datetime=datetime(2020, 12, 26, 12, 0, 0)
+    )
+    event_3 = TaskEventFactory(
+        task=task, effective_datetime=datetime(2020, 12, 25, 12, 0, 0)
+    )
+
+    assert task.latest_events == [event_2, event_3]
@@ -197,6 +197,7 @@ def test_get_task_event_metrics(session, subtests):
 
 def test_delete_task_event_metric_ok(session):
     task_event_metric = TaskEventMetricFactory()
+    primary_key = (task_event_metric.id, task_event_metric.effective_datetime)
 
     delete_task_event_metric(
         session=session,
@@ -204,7 +205,7 @@ def test_delete_task_event_metric_ok(session):
         task_event_metric_id=task_event_metric.id,
     )
 
-    assert session.get(TaskEventMetric, task_event_metric.id) is None
+    assert session.get(TaskEventMetric, primary_key) is None
 
 
 def test_delete_task_event_metric_failure_not_visible_to_user(session):
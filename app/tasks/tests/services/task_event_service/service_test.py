@@ -1,27 +1,41 @@
 from datetime import datetime, timedelta
+from decimal import Decimal
 from unittest.mock import patch
 
 import pytest
 from fast_depends import dependency_provider
+from sqlalchemy import text
 from sqlalchemy.exc import NoResultFound
 
 import app.tasks.services.task_event_service._service as task_event_service
+import app.tasks.services.task_service._service as task_service
 from app.accounts.tests.factories import UserFactory
 from app.tasks.models.task import TaskStatus
 from app.tasks.models.task_event import TaskEvent, TaskEventAround
 from app.tasks.models.task_until import UntilType
-from app.tasks.schemas.task_event_schema import TaskEventCreationSchema
+from app.tasks.schemas.task_event_schema import (
+    TaskEventBulkCreationSchema,
+    TaskEventCreationSchema,
+    TaskEventMetricValueSchema,
+    TaskEventWithMetricsCreationSchema,
+)
 from app.tasks.services.task_event_service._dependencies import get_now_datetime
 from app.tasks.services.task_event_service._utils import compute_effective_datetime
+from app.tasks.services.task_service._utils import compute_task_state
 from app.tasks.services.task_event_service.service import (
     create_task_event,
+    create_task_event_partitions,
+    create_task_event_with_metrics,
+    create_task_events,
     delete_task_event,
     get_task_event,
     get_task_events,
+    repair_task_event_counters,
 )
 from app.tasks.tests.factories import (
     TaskEventFactory,
     TaskFactory,
+    TaskMetricFactory,
     TaskUntilFactory,
 )
 
@@ -125,6 +139,109 @@ def test_create_task_event_failure_task_not_visible_to_user(session):
     assert ctx.value.args[0] == "Task not found"
 
 
+def test_create_task_event_with_metrics_ok(session):
+    user = UserFactory()
+    task = TaskFactory(user=user)
+    task_metric = TaskMetricFactory(task=task)
+
+    task_event = create_task_event_with_metrics(
+        session=session,
+        authenticated_user=user,
+        task_event_with_metrics_creation_payload=TaskEventWithMetricsCreationSchema(
+            task_id=task.id,
+            around=TaskEventAround.today,
+            metrics=[
+                TaskEventMetricValueSchema(
+                    task_metric_id=task_metric.id, value=Decimal("1.5")
+                )
+            ],
+        ),
+    )
+
+    assert task_event.task == task
+    assert [(metric.task_metric_id, metric.value) for metric in task_event.metrics] == [
+        (task_metric.id, Decimal("1.5"))
+    ]
+
+
+def test_create_task_event_with_metrics_failure_duplicate_metric():
+    with pytest.raises(ValueError):
+        TaskEventWithMetricsCreationSchema(
+            task_id=1,
+            around=TaskEventAround.today,
+            metrics=[
+                TaskEventMetricValueSchema(task_metric_id=1, value=Decimal("1")),
+                TaskEventMetricValueSchema(task_metric_id=1, value=Decimal("2")),
+            ],
+        )
+
+
+def test_create_task_events_ok__single_recompute_per_task(session):
+    user = UserFactory()
+    task_1 = TaskFactory(
+        status=TaskStatus.ongoing,
+        user=user,
+        until=TaskUntilFactory(type=UntilType.amount, amount=2),
+    )
+    task_2 = TaskFactory(status=TaskStatus.ongoing, user=user)
+
+    with patch.object(
+        task_service, "compute_task_state", wraps=compute_task_state
+    ) as mocked_compute_task_state:
+        task_events = create_task_events(
+            session=session,
+            authenticated_user=user,
+            task_event_bulk_creation_payload=TaskEventBulkCreationSchema(
+                events=[
+                    TaskEventCreationSchema(
+                        task_id=task_id,
+                        around=TaskEventAround.specifically,
+                        at=datetime(2020, 12, day, 12, 0, 0),
+                    )
+                    for task_id, day in [
+                        (task_1.id, 24),
+                        (task_1.id, 25),
+                        (task_2.id, 25),
+                    ]
+                ]
+            ),
+        )
+
+    assert [task_event.task_id for task_event in task_events] == [
+        task_1.id,
+        task_1.id,
+        task_2.id,
+    ]
+    assert mocked_compute_task_state.call_count == 2
+
+    session.refresh(task_1)
+    assert task_1.status == TaskStatus.completed
+    assert task_1.event_count == 2
+    assert task_1.latest_event_datetime == datetime(2020, 12, 25, 12, 0, 0)
+
+
+def test_create_task_events_failure_task_not_visible_to_user(session):
+    user = UserFactory()
+    task = TaskFactory(user=user)
+
+    with pytest.raises(NoResultFound) as ctx:
+        create_task_events(
+            session=session,
+            authenticated_user=user,
+            task_event_bulk_creation_payload=TaskEventBulkCreationSchema(
+                events=[
+                    TaskEventCreationSchema(
+                        task_id=task_id, around=TaskEventAround.today
+                    )
+                    for task_id in (task.id, TaskFactory().id)
+                ]
+            ),
+        )
+
+    assert ctx.value.args[0] == "Task not found"
+    assert session.query(TaskEvent).count() == 0
+
+
 def test_get_task_event_ok(session):
     task_event = TaskEventFactory()
 
@@ -173,6 +290,7 @@ def test_get_task_events_ok(session, subtests):
 
 def test_delete_task_event_ok(session):
     task_event = TaskEventFactory()
+    primary_key = (task_event.id, task_event.effective_datetime)
 
     delete_task_event(
         session=session,
@@ -180,7 +298,7 @@ def test_delete_task_event_ok(session):
         task_event_id=task_event.id,
     )
 
-    assert session.get(TaskEvent, task_event.id) is None
+    assert session.get(TaskEvent, primary_key) is None
 
 
 def test_delete_task_event_ok__task_status_back_to_ongoing(session):
@@ -189,6 +307,7 @@ def test_delete_task_event_ok__task_status_back_to_ongoing(session):
         until=TaskUntilFactory(type=UntilType.amount, amount=1),
     )
     task_event = TaskEventFactory(task=task)
+    primary_key = (task_event.id, task_event.effective_datetime)
 
     delete_task_event(
         session=session,
@@ -196,7 +315,7 @@ def test_delete_task_event_ok__task_status_back_to_ongoing(session):
         task_event_id=task_event.id,
     )
 
-    assert session.get(TaskEvent, task_event.id) is None
+    assert session.get(TaskEvent, primary_key) is None
     session.refresh(task)
     assert task.status == TaskStatus.ongoing
 
@@ -212,3 +331,41 @@ def test_delete_task_event_failure_not_visible_to_user(session):
         )
 
     assert ctx.value.args[0] == "Task Event not found"
+
+
+def test_repair_task_event_counters_ok(session):
+    task = TaskFactory()
+    TaskEventFactory(task=task, effective_datetime=datetime(2020, 12, 24))
+    TaskEventFactory(task=task, effective_datetime=datetime(2020, 12, 25))
+    untouched = TaskFactory()
+
+    # Simulate counters that drifted from the events
+    task.event_count = 10
+    task.latest_event_datetime = None
+    untouched.event_count = 0
+    session.flush()
+
+    repaired = repair_task_event_counters(session=session, batch_size=1)
+
+    session.refresh(task)
+    session.refresh(untouched)
+
+    assert repaired == 2
+    assert task.event_count == 2
+    assert task.latest_event_datetime == datetime(2020, 12, 25)
+    assert task.second_latest_event_datetime == datetime(2020, 12, 24)
+    assert untouched.event_count == 0
+
+
+def test_create_task_event_partitions_ok(session):
+    now = datetime(2098, 11, 20, 12, 0, 0)
+
+    with dependency_provider.scope(get_now_datetime, lambda: now):
+        created = create_task_event_partitions(session=session, months_ahead=2)
+        created_again = create_task_event_partitions(session=session, months_ahead=2)
+
+    # The months up to the next year, for the events and their metrics
+    assert created == 6
+    assert created_again == 0
+    for partition in ("task_events_2099_01", "task_event_metrics_2098_11"):
+        assert session.scalar(text(f"SELECT to_regclass('{partition}')")) is not None
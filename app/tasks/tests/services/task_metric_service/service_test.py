@@ -1,17 +1,27 @@
+from datetime import datetime
+from decimal import Decimal
+
 import pytest
 from sqlalchemy.exc import NoResultFound
 
 from app.accounts.tests.factories import UserFactory
 from app.shared.exceptions import ServiceValidationError
+from app.tasks.daos.task_metric_rollup_dao import TaskMetricRollupDao
 from app.tasks.models.task_metric import TaskMetric
+from app.tasks.models.task_metric_rollup import TaskMetricRollup, TaskMetricRollupPeriod
 from app.tasks.schemas.task_metric_schema import TaskMetricCreationSchema
 from app.tasks.services.task_metric_service.service import (
     create_task_metric,
     delete_task_metric,
     get_task_metric,
     get_task_metrics,
+    rebuild_task_metric_rollups,
+)
+from app.tasks.tests.factories import (
+    TaskEventMetricFactory,
+    TaskFactory,
+    TaskMetricFactory,
 )
-from app.tasks.tests.factories import TaskFactory, TaskMetricFactory
 
 
 def test_create_task_metric_ok(session):
@@ -150,3 +160,52 @@ def test_delete_task_metric_failure_not_visible_to_user(session):
         )
 
     assert ctx.value.args[0] == "Task Metric not found"
+
+
+def test_delete_task_metric_deletes_rollups(session):
+    task_event_metric = TaskEventMetricFactory()
+    task_metric = task_event_metric.task_metric
+
+    delete_task_metric(
+        session=session,
+        authenticated_user=task_metric.task.user,
+        task_metric_id=task_metric.id,
+    )
+
+    assert session.query(TaskMetricRollup).count() == 0
+
+
+def test_rebuild_task_metric_rollups_ok(session):
+    task_metric = TaskMetricFactory()
+    TaskEventMetricFactory(
+        task=task_metric.task,
+        task_metric=task_metric,
+        task_event__effective_datetime=datetime(2024, 1, 2),
+        value=Decimal(3),
+    )
+    untouched = TaskMetricFactory()
+
+    # Simulate rollups that drifted from the event metrics
+    TaskMetricRollupDao(session=session).increment(
+        [(task_metric.id, datetime(2024, 1, 5), Decimal(10))]
+    )
+
+    rebuilt = rebuild_task_metric_rollups(session=session, batch_size=1)
+
+    assert rebuilt == 2
+    for period, bucket in [
+        (TaskMetricRollupPeriod.day, datetime(2024, 1, 2)),
+        (TaskMetricRollupPeriod.week, datetime(2024, 1, 1)),
+    ]:
+        assert [
+            (row.bucket, row.count, row.sum)
+            for row in TaskMetricRollupDao(session=session).series(
+                task_metric_id=task_metric.id, period=period
+            )
+        ] == [(bucket, 1, 3)]
+    assert (
+        TaskMetricRollupDao(session=session).series(
+            task_metric_id=untouched.id, period=TaskMetricRollupPeriod.day
+        )
+        == []
+    )
@@ -0,0 +1,163 @@
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.tasks.services.task_service._queue import (
+    CeleryRecomputeQueue,
+    RecomputeQueue,
+    SyncRecomputeQueue,
+    ThreadRecomputeQueue,
+)
+
+
+def test_recompute_queue_is_abstract():
+    with pytest.raises(TypeError):
+        RecomputeQueue(recompute=MagicMock())
+
+
+def test_sync_recompute_queue_recomputes_in_session():
+    recompute = MagicMock()
+    session = MagicMock()
+
+    SyncRecomputeQueue(recompute=recompute).enqueue(session=session, task_ids=[2, 1, 2])
+
+    recompute.assert_called_once_with(session, [1, 2])
+
+
+def test_thread_recompute_queue_coalesces_changes_within_window():
+    recomputed = threading.Event()
+    calls = []
+
+    def recompute(session, task_ids):
+        calls.append(task_ids)
+        recomputed.set()
+
+    session = MagicMock()
+    queue = ThreadRecomputeQueue(
+        recompute=recompute,
+        session_factory=lambda: session,
+        window_seconds=0.1,
+    )
+
+    queue.enqueue(session=None, task_ids=[1])
+    queue.enqueue(session=None, task_ids=[2, 1])
+    queue.enqueue(session=None, task_ids=[1])
+
+    assert recomputed.wait(timeout=5)
+    assert calls == [[1, 2]]
+    session.close.assert_called_once()
+
+
+def test_thread_recompute_queue_flush():
+    recompute = MagicMock()
+    session = MagicMock()
+    queue = ThreadRecomputeQueue(
+        recompute=recompute,
+        session_factory=lambda: session,
+        window_seconds=60,
+    )
+
+    queue.enqueue(session=None, task_ids=[3, 1])
+    queue.flush()
+    queue.flush()
+
+    recompute.assert_called_once_with(session, [1, 3])
+
+
+def test_thread_recompute_queue_requeues_failed_tasks(caplog):
+    recompute = MagicMock(
+        side_effect=[Exception("Database gone")] * 3 + [1],
+    )
+    session = MagicMock()
+    queue = ThreadRecomputeQueue(
+        recompute=recompute,
+        session_factory=lambda: session,
+        window_seconds=60,
+    )
+
+    queue.enqueue(session=None, task_ids=[3, 1])
+    queue.flush()
+
+    assert "[1, 3]" in caplog.text
+    assert session.rollback.call_count == 3
+
+    # Retried along with the tasks changed in the meantime
+    queue.enqueue(session=None, task_ids=[2])
+    queue.flush()
+
+    assert [call.args for call in recompute.call_args_list] == [
+        (session, [1, 3]),
+        (session, [1]),
+        (session, [3]),
+        (session, [1, 2, 3]),
+    ]
+    assert session.close.call_count == 2
+
+
+def test_thread_recompute_queue_isolates_failing_task(caplog):
+    recomputed = []
+
+    def recompute(session, task_ids):
+        if 2 in task_ids:
+            raise AssertionError("Inconsistent counters")
+        recomputed.extend(task_ids)
+
+    queue = ThreadRecomputeQueue(
+        recompute=MagicMock(side_effect=recompute),
+        session_factory=MagicMock,
+        window_seconds=60,
+        max_attempts=2,
+    )
+
+    queue.enqueue(session=None, task_ids=[1, 2, 3])
+    queue.flush()
+
+    # The other tasks of the batch are written all the same
+    assert recomputed == [1, 3]
+
+    queue.flush()
+
+    assert "Gave up recomputing the state of the tasks [2] after 2" in caplog.text
+
+    # Dropped rather than retried forever
+    queue.flush()
+
+    assert queue.recompute.call_count == 5
+    assert recomputed == [1, 3]
+
+
+def test_celery_recompute_queue_schedules_tasks_not_already_pending():
+    client = MagicMock()
+    # The key of task 2 is already set, its recompute is already scheduled
+    client.pipeline.return_value.execute.return_value = [True, False, True]
+    celery_task = MagicMock()
+    get_state_versions = MagicMock(return_value={3: 7, 1: 4})
+    queue = CeleryRecomputeQueue(
+        recompute=MagicMock(),
+        get_state_versions=get_state_versions,
+        client=client,
+        celery_task=celery_task,
+        window_seconds=2,
+    )
+
+    session = MagicMock()
+    queue.enqueue(session=session, task_ids=[3, 2, 1, 3])
+
+    assert [
+        call.args[0] for call in client.pipeline.return_value.set.call_args_list
+    ] == [
+        "task-state-recompute:task:1",
+        "task-state-recompute:task:2",
+        "task-state-recompute:task:3",
+    ]
+    # The job carries the version of each task once changed
+    get_state_versions.assert_called_once_with(session, [1, 3])
+    celery_task.apply_async.assert_called_once_with(
+        args=[[(1, 4), (3, 7)]], countdown=2
+    )
+
+    queue.release([1, 3])
+    client.delete.assert_called_once_with(
+        "task-state-recompute:task:1", "task-state-recompute:task:3"
+    )
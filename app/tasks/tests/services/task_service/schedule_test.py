@@ -0,0 +1,162 @@
+from datetime import date, datetime, time
+
+import pytest
+
+from app.tasks.models.task_frequency import FrequencyPeriod, FrequencyType, Weekday
+from app.tasks.services.task_service._schedule import (
+    OccurrenceRule,
+    add_periods,
+    get_occurrences,
+)
+
+
+def make_rule(**kwargs) -> OccurrenceRule:
+    return OccurrenceRule(
+        **{
+            "frequency_id": 1,
+            "latest_event_datetime": None,
+            "type": FrequencyType.per,
+            "period": FrequencyPeriod.day,
+            "amount": 1,
+            "use_calendar_period": True,
+            "once_on_date": None,
+            "once_per_weekday": None,
+            "once_at_time": None,
+            "created": datetime(2024, 1, 31, 9, 0),
+            "event_count": 0,
+            **kwargs,
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "value, period, amount, expected",
+    [
+        (datetime(2024, 1, 31), FrequencyPeriod.day, 1, datetime(2024, 2, 1)),
+        (datetime(2024, 1, 31), FrequencyPeriod.week, 2, datetime(2024, 2, 14)),
+        # Clamped to the end of the shorter month
+        (datetime(2024, 1, 31), FrequencyPeriod.month, 1, datetime(2024, 2, 29)),
+        (datetime(2024, 1, 31), FrequencyPeriod.month, 2, datetime(2024, 3, 31)),
+        (datetime(2024, 11, 30), FrequencyPeriod.month, 3, datetime(2025, 2, 28)),
+        (datetime(2024, 2, 29), FrequencyPeriod.year, 1, datetime(2025, 2, 28)),
+    ],
+)
+def test_add_periods(value, period, amount, expected):
+    assert add_periods(value, period, amount) == expected
+
+
+def test_get_occurrences_once_per_day():
+    rule = make_rule(
+        latest_event_datetime=datetime(2024, 2, 3, 18, 0), once_at_time=time(8, 30)
+    )
+
+    assert get_occurrences(rule, start=datetime(2024, 2, 1), limit=3) == (
+        datetime(2024, 2, 4, 8, 30),
+        datetime(2024, 2, 5, 8, 30),
+        datetime(2024, 2, 6, 8, 30),
+    )
+
+
+def test_get_occurrences_once_per_weekday():
+    # Created on a wednesday
+    rule = make_rule(period=FrequencyPeriod.week, once_per_weekday=Weekday.friday)
+
+    assert get_occurrences(
+        rule, start=datetime(2024, 2, 1), end=datetime(2024, 2, 17)
+    ) == (
+        datetime(2024, 2, 2, 12, 0),
+        datetime(2024, 2, 9, 12, 0),
+        datetime(2024, 2, 16, 12, 0),
+    )
+
+
+def test_get_occurrences_per_month_follows_calendar():
+    rule = make_rule(period=FrequencyPeriod.month, amount=1)
+
+    # Starts far from the creation, without replaying the months in between
+    assert get_occurrences(rule, start=datetime(2030, 1, 1), limit=3) == (
+        datetime(2030, 1, 31, 9, 0),
+        datetime(2030, 2, 28, 9, 0),
+        datetime(2030, 3, 31, 9, 0),
+    )
+
+
+def test_get_occurrences_several_per_period():
+    rule = make_rule(
+        period=FrequencyPeriod.day,
+        amount=2,
+        created=datetime(2024, 2, 1, 0, 0),
+    )
+
+    assert get_occurrences(rule, start=datetime(2024, 2, 1, 13, 0), limit=3) == (
+        datetime(2024, 2, 2, 0, 0),
+        datetime(2024, 2, 2, 12, 0),
+        datetime(2024, 2, 3, 0, 0),
+    )
+
+
+def test_get_occurrences_this_period():
+    rule = make_rule(
+        type=FrequencyType.this,
+        period=FrequencyPeriod.day,
+        amount=3,
+        event_count=1,
+        created=datetime(2024, 2, 1, 0, 0),
+        latest_event_datetime=datetime(2024, 2, 1, 5, 59),
+    )
+
+    # The remaining two events spread over what is left of the day
+    assert get_occurrences(rule, start=datetime(2024, 2, 1)) == (
+        datetime(2024, 2, 1, 11, 59),
+        datetime(2024, 2, 1, 17, 59),
+    )
+
+
+def test_get_occurrences_on_date():
+    rule = make_rule(
+        type=FrequencyType.on,
+        period=None,
+        once_on_date=date(2024, 3, 1),
+        once_at_time=time(10, 0),
+    )
+
+    assert get_occurrences(rule, start=datetime(2024, 2, 1)) == (
+        datetime(2024, 3, 1, 10, 0),
+    )
+    assert get_occurrences(rule, start=datetime(2024, 3, 2)) == ()
+
+
+def test_get_occurrences_until(subtests):
+    with subtests.test(msg="date"):
+        rule = make_rule(until_date=date(2024, 2, 3))
+
+        assert get_occurrences(rule, start=datetime(2024, 2, 1)) == (
+            datetime(2024, 2, 1, 12, 0),
+            datetime(2024, 2, 2, 12, 0),
+            datetime(2024, 2, 3, 12, 0),
+        )
+
+    with subtests.test(msg="amount"):
+        rule = make_rule(until_amount=5, event_count=3)
+
+        assert get_occurrences(rule, start=datetime(2024, 2, 10)) == ()
+        assert get_occurrences(rule, start=datetime(2024, 1, 1)) == (
+            datetime(2024, 1, 31, 12, 0),
+            datetime(2024, 2, 1, 12, 0),
+        )
+
+
+def test_get_occurrences_later_in_cached_day():
+    rule = make_rule(
+        period=FrequencyPeriod.day,
+        amount=24,
+        created=datetime(2024, 2, 1, 0, 0),
+    )
+
+    # Cached from the start of the day, then the first two entries are earlier
+    get_occurrences(rule, start=datetime(2024, 2, 2), limit=2)
+
+    assert get_occurrences(rule, start=datetime(2024, 2, 2, 5, 0), limit=2) == (
+        datetime(2024, 2, 2, 5, 0),
+        datetime(2024, 2, 2, 6, 0),
+    )
@@ -7,6 +7,7 @@ from sqlalchemy.exc import NoResultFound
 
 from app.accounts.tests.factories import UserFactory
 from app.shared.exceptions import ServiceValidationError
+from app.shared.metrics import memoization_metrics
 from app.tasks.models.task import Task, TaskStatus
 from app.tasks.models.task_frequency import (
     FrequencyPeriod,
@@ -20,7 +21,10 @@ from app.tasks.schemas.task_schema import (
     TaskUntilCreationSchema,
 )
 from app.tasks.services.task_service import _service, service
-from app.tasks.services.task_service._dependencies import get_datetime_now
+from app.tasks.services.task_service._dependencies import (
+    get_date_now,
+    get_datetime_now,
+)
 from app.tasks.tests.factories import CategoryFactory, TaskEventFactory, TaskFactory
 
 
@@ -350,6 +354,34 @@ def test_complete_task_failure_task_not_ongoing(session):
     assert ctx.value.args[0] == "The task is already completed"
 
 
+def test_get_task_memoized_in_session(session):
+    task = TaskFactory()
+    session.commit()
+    hits = memoization_metrics.hits
+
+    with patch.object(
+        _service.TaskDao, "get", autospec=True, return_value=task
+    ) as m_get:
+        for _ in range(3):
+            assert (
+                service.get_task(
+                    session=session, authenticated_user=task.user, task_id=task.id
+                )
+                == task
+            )
+
+    m_get.assert_called_once()
+    assert memoization_metrics.hits == hits + 2
+
+    # The memo is forgotten with the transaction
+    session.commit()
+    assert (
+        service.get_task(session=session, authenticated_user=task.user, task_id=task.id)
+        == task
+    )
+    assert memoization_metrics.hits == hits + 2
+
+
 @patch.object(
     _service,
     "compute_task_state",
@@ -374,6 +406,93 @@ def test_recompute_task_state_ok(m_compute_task_state, session):
     m_compute_task_state.assert_called_once_with(task=task, now=now)
 
 
+@patch.object(
+    _service,
+    "compute_task_state",
+    return_value=(TaskStatus.ongoing, datetime(2022, 12, 21, 12, 0, 0)),
+)
+def test_recompute_tasks_state_ok(m_compute_task_state, session):
+    user = UserFactory()
+    changed_task = TaskFactory(user=user, status=TaskStatus.completed)
+    unchanged_task = TaskFactory(
+        user=user,
+        status=TaskStatus.ongoing,
+        next_event_datetime=datetime(2022, 12, 21, 12, 0, 0),
+    )
+    other_task = TaskFactory(status=TaskStatus.completed)  # Noise
+
+    now = datetime(2022, 12, 20, 12, 0, 0)
+
+    with dependency_provider.scope(get_datetime_now, lambda: now):
+        updated = service.recompute_tasks_state(
+            session=session, user_id=user.id, chunk_size=1
+        )
+
+    assert updated == 1
+    assert m_compute_task_state.call_count == 2
+
+    session.expire_all()
+    assert session.get(Task, changed_task.id).status == TaskStatus.ongoing
+    assert session.get(Task, changed_task.id).next_event_datetime == datetime(
+        2022, 12, 21, 12, 0, 0
+    )
+    assert session.get(Task, unchanged_task.id).status == TaskStatus.ongoing
+    assert session.get(Task, other_task.id).status == TaskStatus.completed
+
+
+def test_recompute_tasks_state_skips_failing_task(session, caplog):
+    user = UserFactory()
+    first_task, failing_task, last_task = [
+        TaskFactory(user=user, status=TaskStatus.completed) for _ in range(3)
+    ]
+
+    def compute_task_state(task, now):
+        assert task.id != failing_task.id, "Inconsistent counters"
+        return TaskStatus.ongoing, datetime(2022, 12, 21, 12, 0, 0)
+
+    with patch.object(_service, "compute_task_state", compute_task_state):
+        updated = service.recompute_tasks_state(
+            session=session, user_id=user.id, chunk_size=2
+        )
+
+    # The failing chunk is recomputed task by task, the next chunk still run
+    assert updated == 2
+    assert f"the task {failing_task.id}" in caplog.text
+
+    session.expire_all()
+    assert [session.get(Task, task.id).status for task in (first_task, last_task)] == [
+        TaskStatus.ongoing,
+        TaskStatus.ongoing,
+    ]
+    assert session.get(Task, failing_task.id).status == TaskStatus.completed
+
+
+@patch.object(
+    _service,
+    "compute_task_state",
+    return_value=(TaskStatus.ongoing, datetime(2022, 12, 21, 12, 0, 0)),
+)
+def test_recompute_versioned_tasks_state_ok(m_compute_task_state, session):
+    current_task = TaskFactory(status=TaskStatus.completed, state_version=2)
+    # The change the job was scheduled for isn't visible yet
+    lagging_task = TaskFactory(status=TaskStatus.completed, state_version=1)
+
+    now = datetime(2022, 12, 20, 12, 0, 0)
+
+    with dependency_provider.scope(get_datetime_now, lambda: now):
+        lagging_task_ids = service.recompute_versioned_tasks_state(
+            session=session,
+            task_state_versions={current_task.id: 1, lagging_task.id: 2},
+        )
+
+    assert lagging_task_ids == [lagging_task.id]
+    assert m_compute_task_state.call_count == 1
+
+    session.expire_all()
+    assert session.get(Task, current_task.id).status == TaskStatus.ongoing
+    assert session.get(Task, lagging_task.id).status == TaskStatus.completed
+
+
 def test_update_frequency(session):
     task = TaskFactory(
         frequency__type=FrequencyType.per,
@@ -430,3 +549,29 @@ def test_update_task_until(session):
     assert task.until.amount is None
     assert task.until.date == new_date
     assert task.next_event_datetime is not None
+
+
+def test_mark_ongoing_date_tasks_as_completed_ok(session):
+    expired_tasks = TaskFactory.create_batch(
+        3,
+        status=TaskStatus.ongoing,
+        until__type=UntilType.date,
+        until__date=date(2022, 12, 20),
+    )
+    ongoing_task = TaskFactory(
+        status=TaskStatus.ongoing,
+        until__type=UntilType.date,
+        until__date=date(2022, 12, 21),
+    )
+
+    with dependency_provider.scope(get_date_now, lambda: date(2022, 12, 20)):
+        completed = service.mark_ongoing_date_tasks_as_completed(
+            session=session, batch_size=2
+        )
+
+    assert completed == 3
+
+    session.expire_all()
+    for task in expired_tasks:
+        assert session.get(Task, task.id).status == TaskStatus.completed
+    assert session.get(Task, ongoing_task.id).status == TaskStatus.ongoing
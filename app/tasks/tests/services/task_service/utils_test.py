@@ -6,9 +6,11 @@ import pytest
 from app.tasks.models.task import TaskStatus
 from app.tasks.models.task_frequency import FrequencyPeriod, FrequencyType, Weekday
 from app.tasks.models.task_until import UntilType
+from app.tasks.schemas.task_schema import TaskDue
 from app.tasks.services.task_service._utils import (
     compute_approximated_next_event_datetime,
     compute_task_status,
+    get_due_datetime_range,
     get_end_of_current_period,
 )
 from app.tasks.tests.factories import (
@@ -818,3 +820,34 @@ def test_compute_task_status(
     )
 
     assert status == expected_status
+
+
+@pytest.mark.parametrize(
+    "due, within_hours, expected_range",
+    [
+        (TaskDue.overdue, 24, (None, datetime(2024, 7, 4, 15, 30))),
+        (
+            TaskDue.today,
+            24,
+            (datetime(2024, 7, 4), datetime(2024, 7, 5)),
+        ),
+        (
+            TaskDue.upcoming,
+            6,
+            (datetime(2024, 7, 4, 15, 30), datetime(2024, 7, 4, 21, 30)),
+        ),
+        # From the monday to the next one
+        (
+            TaskDue.this_week,
+            24,
+            (datetime(2024, 7, 1), datetime(2024, 7, 8)),
+        ),
+    ],
+)
+def test_get_due_datetime_range(due, within_hours, expected_range):
+    assert (
+        get_due_datetime_range(
+            due=due, now=datetime(2024, 7, 4, 15, 30), within_hours=within_hours
+        )
+        == expected_range
+    )
@@ -0,0 +1,4 @@
+-- Modify "tasks" table
+ALTER TABLE "tasks" ADD COLUMN "event_count" integer NOT NULL DEFAULT 0, ADD COLUMN "latest_event_datetime" timestamp NULL, ADD COLUMN "second_latest_event_datetime" timestamp NULL;
+-- Backfill the denormalised event columns of the existing tasks
+UPDATE "tasks" SET "event_count" = (SELECT count(*) FROM "task_events" WHERE "task_events"."task_id" = "tasks"."id"), "latest_event_datetime" = (SELECT "task_events"."effective_datetime" FROM "task_events" WHERE "task_events"."task_id" = "tasks"."id" ORDER BY "task_events"."effective_datetime" DESC, "task_events"."id" DESC LIMIT 1), "second_latest_event_datetime" = (SELECT "task_events"."effective_datetime" FROM "task_events" WHERE "task_events"."task_id" = "tasks"."id" ORDER BY "task_events"."effective_datetime" DESC, "task_events"."id" DESC OFFSET 1 LIMIT 1);
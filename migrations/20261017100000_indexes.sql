@@ -0,0 +1,12 @@
+-- Create index "ix_categories_parent_category_id" to table: "categories"
+CREATE INDEX "ix_categories_parent_category_id" ON "categories" ("parent_category_id") WHERE (parent_category_id IS NOT NULL);
+-- Create index "ix_user_preferences_user_id" to table: "user_preferences"
+CREATE INDEX "ix_user_preferences_user_id" ON "user_preferences" ("user_id");
+-- Create index "ix_tasks_category_id" to table: "tasks"
+CREATE INDEX "ix_tasks_category_id" ON "tasks" ("category_id");
+-- Create index "ix_tasks_user_id_status_next_event_datetime" to table: "tasks"
+CREATE INDEX "ix_tasks_user_id_status_next_event_datetime" ON "tasks" ("user_id", "status", "next_event_datetime");
+-- Create index "ix_task_events_task_id_effective_datetime" to table: "task_events"
+CREATE INDEX "ix_task_events_task_id_effective_datetime" ON "task_events" ("task_id", "effective_datetime", "id");
+-- Create index "ix_task_event_metrics_task_event_id" to table: "task_event_metrics"
+CREATE INDEX "ix_task_event_metrics_task_event_id" ON "task_event_metrics" ("task_event_id");
@@ -0,0 +1,2 @@
+-- Modify "tasks" table
+ALTER TABLE "tasks" ADD COLUMN "state_version" integer NOT NULL DEFAULT 0;
@@ -0,0 +1,2 @@
+-- Create index "ix_task_untils_date" to table: "task_untils"
+CREATE INDEX "ix_task_untils_date" ON "task_untils" ("date") WHERE (type = 'date'::untiltype);
@@ -0,0 +1,2 @@
+-- Create index "ix_tasks_user_id_next_event_datetime_ongoing" to table: "tasks"
+CREATE INDEX "ix_tasks_user_id_next_event_datetime_ongoing" ON "tasks" ("user_id", "next_event_datetime") INCLUDE ("id", "name", "category_id") WHERE (status = 'ongoing'::taskstatus);
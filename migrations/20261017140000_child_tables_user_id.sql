@@ -0,0 +1,25 @@
+-- Modify "task_events" table
+ALTER TABLE "task_events" ADD COLUMN "user_id" integer NULL;
+-- Backfill the owner of the existing events from their task
+UPDATE "task_events" SET "user_id" = "tasks"."user_id" FROM "tasks" WHERE "tasks"."id" = "task_events"."task_id";
+ALTER TABLE "task_events" ALTER COLUMN "user_id" SET NOT NULL, ADD CONSTRAINT "task_events_user_id_fkey" FOREIGN KEY ("user_id") REFERENCES "users" ("id") ON UPDATE NO ACTION ON DELETE NO ACTION;
+-- Create index "ix_task_events_user_id_task_id_effective_datetime" to table: "task_events"
+CREATE INDEX "ix_task_events_user_id_task_id_effective_datetime" ON "task_events" ("user_id", "task_id", "effective_datetime");
+-- Create index "ix_task_events_user_id_id" to table: "task_events"
+CREATE INDEX "ix_task_events_user_id_id" ON "task_events" ("user_id", "id");
+-- Modify "task_metrics" table
+ALTER TABLE "task_metrics" ADD COLUMN "user_id" integer NULL;
+-- Backfill the owner of the existing metrics from their task
+UPDATE "task_metrics" SET "user_id" = "tasks"."user_id" FROM "tasks" WHERE "tasks"."id" = "task_metrics"."task_id";
+ALTER TABLE "task_metrics" ALTER COLUMN "user_id" SET NOT NULL, ADD CONSTRAINT "task_metrics_user_id_fkey" FOREIGN KEY ("user_id") REFERENCES "users" ("id") ON UPDATE NO ACTION ON DELETE NO ACTION;
+-- Create index "ix_task_metrics_user_id_id" to table: "task_metrics"
+CREATE INDEX "ix_task_metrics_user_id_id" ON "task_metrics" ("user_id", "id");
+-- Create index "ix_task_metrics_user_id_name" to table: "task_metrics"
+CREATE INDEX "ix_task_metrics_user_id_name" ON "task_metrics" ("user_id", "name");
+-- Modify "task_event_metrics" table
+ALTER TABLE "task_event_metrics" ADD COLUMN "user_id" integer NULL;
+-- Backfill the owner of the existing event metrics from their event
+UPDATE "task_event_metrics" SET "user_id" = "task_events"."user_id" FROM "task_events" WHERE "task_events"."id" = "task_event_metrics"."task_event_id";
+ALTER TABLE "task_event_metrics" ALTER COLUMN "user_id" SET NOT NULL, ADD CONSTRAINT "task_event_metrics_user_id_fkey" FOREIGN KEY ("user_id") REFERENCES "users" ("id") ON UPDATE NO ACTION ON DELETE NO ACTION;
+-- Create index "ix_task_event_metrics_user_id_id" to table: "task_event_metrics"
+CREATE INDEX "ix_task_event_metrics_user_id_id" ON "task_event_metrics" ("user_id", "id");
@@ -0,0 +1,49 @@
+-- Create "task_events_partitioned" table, partitioned per month of "effective_datetime"
+CREATE TABLE "task_events_partitioned" ("id" integer NOT NULL DEFAULT nextval('task_events_id_seq'), "created" timestamp NOT NULL, "task_id" integer NOT NULL, "user_id" integer NOT NULL, "around" "taskeventaround" NOT NULL, "at" timestamp NULL, "effective_datetime" timestamp NOT NULL) PARTITION BY RANGE ("effective_datetime");
+-- Create "task_event_metrics_partitioned" table, partitioned like its events
+CREATE TABLE "task_event_metrics_partitioned" ("id" integer NOT NULL DEFAULT nextval('task_event_metrics_id_seq'), "task_metric_id" integer NOT NULL, "task_event_id" integer NOT NULL, "effective_datetime" timestamp NOT NULL, "user_id" integer NOT NULL, "value" double precision NOT NULL) PARTITION BY RANGE ("effective_datetime");
+-- Create the partitions of the months of the existing events, up to three months ahead
+DO $$
+DECLARE
+  month timestamp;
+BEGIN
+  FOR month IN
+    SELECT generate_series(
+      date_trunc('month', least((SELECT min("effective_datetime") FROM "task_events"), localtimestamp)),
+      date_trunc('month', greatest((SELECT max("effective_datetime") FROM "task_events"), localtimestamp)) + interval '3 months',
+      interval '1 month'
+    )
+  LOOP
+    EXECUTE format('CREATE TABLE %I PARTITION OF "task_events_partitioned" FOR VALUES FROM (%L) TO (%L)', 'task_events_' || to_char(month, 'YYYY_MM'), month, month + interval '1 month');
+    EXECUTE format('CREATE TABLE %I PARTITION OF "task_event_metrics_partitioned" FOR VALUES FROM (%L) TO (%L)', 'task_event_metrics_' || to_char(month, 'YYYY_MM'), month, month + interval '1 month');
+  END LOOP;
+END $$;
+-- Create the default partitions, holding the rows outside of the monthly partitions
+CREATE TABLE "task_events_default" PARTITION OF "task_events_partitioned" DEFAULT;
+CREATE TABLE "task_event_metrics_default" PARTITION OF "task_event_metrics_partitioned" DEFAULT;
+-- Copy the existing rows, the event metrics taking the effective datetime of their event
+INSERT INTO "task_events_partitioned" ("id", "created", "task_id", "user_id", "around", "at", "effective_datetime") SELECT "id", "created", "task_id", "user_id", "around", "at", "effective_datetime" FROM "task_events";
+INSERT INTO "task_event_metrics_partitioned" ("id", "task_metric_id", "task_event_id", "effective_datetime", "user_id", "value") SELECT "task_event_metrics"."id", "task_event_metrics"."task_metric_id", "task_event_metrics"."task_event_id", "task_events"."effective_datetime", "task_event_metrics"."user_id", "task_event_metrics"."value" FROM "task_event_metrics" JOIN "task_events" ON "task_events"."id" = "task_event_metrics"."task_event_id";
+-- Drop the unpartitioned tables, keeping their id sequences
+ALTER SEQUENCE "task_events_id_seq" OWNED BY NONE;
+ALTER SEQUENCE "task_event_metrics_id_seq" OWNED BY NONE;
+DROP TABLE "task_event_metrics";
+DROP TABLE "task_events";
+ALTER TABLE "task_events_partitioned" RENAME TO "task_events";
+ALTER TABLE "task_event_metrics_partitioned" RENAME TO "task_event_metrics";
+ALTER SEQUENCE "task_events_id_seq" OWNED BY "task_events"."id";
+ALTER SEQUENCE "task_event_metrics_id_seq" OWNED BY "task_event_metrics"."id";
+-- Modify "task_events" table
+ALTER TABLE "task_events" ADD PRIMARY KEY ("id", "effective_datetime"), ADD CONSTRAINT "task_events_task_id_fkey" FOREIGN KEY ("task_id") REFERENCES "tasks" ("id") ON UPDATE NO ACTION ON DELETE NO ACTION, ADD CONSTRAINT "task_events_user_id_fkey" FOREIGN KEY ("user_id") REFERENCES "users" ("id") ON UPDATE NO ACTION ON DELETE NO ACTION;
+-- Create index "ix_task_events_task_id_effective_datetime" to table: "task_events"
+CREATE INDEX "ix_task_events_task_id_effective_datetime" ON "task_events" ("task_id", "effective_datetime", "id");
+-- Create index "ix_task_events_user_id_task_id_effective_datetime" to table: "task_events"
+CREATE INDEX "ix_task_events_user_id_task_id_effective_datetime" ON "task_events" ("user_id", "task_id", "effective_datetime");
+-- Create index "ix_task_events_user_id_id" to table: "task_events"
+CREATE INDEX "ix_task_events_user_id_id" ON "task_events" ("user_id", "id");
+-- Modify "task_event_metrics" table
+ALTER TABLE "task_event_metrics" ADD PRIMARY KEY ("id", "effective_datetime"), ADD CONSTRAINT "unique_tast_event_metric" UNIQUE ("task_metric_id", "task_event_id", "effective_datetime"), ADD CONSTRAINT "task_event_metrics_task_event_id_fkey" FOREIGN KEY ("task_event_id", "effective_datetime") REFERENCES "task_events" ("id", "effective_datetime") ON UPDATE NO ACTION ON DELETE NO ACTION, ADD CONSTRAINT "task_event_metrics_task_metric_id_fkey" FOREIGN KEY ("task_metric_id") REFERENCES "task_metrics" ("id") ON UPDATE NO ACTION ON DELETE NO ACTION, ADD CONSTRAINT "task_event_metrics_user_id_fkey" FOREIGN KEY ("user_id") REFERENCES "users" ("id") ON UPDATE NO ACTION ON DELETE NO ACTION;
+-- Create index "ix_task_event_metrics_task_event_id" to table: "task_event_metrics"
+CREATE INDEX "ix_task_event_metrics_task_event_id" ON "task_event_metrics" ("task_event_id", "effective_datetime");
+-- Create index "ix_task_event_metrics_user_id_id" to table: "task_event_metrics"
+CREATE INDEX "ix_task_event_metrics_user_id_id" ON "task_event_metrics" ("user_id", "id");
@@ -0,0 +1,2 @@
+-- Create index "ix_task_event_metrics_task_metric_id_effective_datetime" to table: "task_event_metrics"
+CREATE INDEX "ix_task_event_metrics_task_metric_id_effective_datetime" ON "task_event_metrics" ("task_metric_id", "effective_datetime") INCLUDE ("value");
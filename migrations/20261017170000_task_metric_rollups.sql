@@ -0,0 +1,9 @@
+-- Create enum type "taskmetricrollupperiod"
+CREATE TYPE "taskmetricrollupperiod" AS ENUM ('day', 'week');
+-- Create "task_metric_rollups" table
+CREATE TABLE "task_metric_rollups" ("task_metric_id" integer NOT NULL, "period" "taskmetricrollupperiod" NOT NULL, "bucket_start" timestamp NOT NULL, "count" integer NOT NULL, "sum" double precision NOT NULL, "sum_of_squares" double precision NOT NULL, "min" double precision NOT NULL, "max" double precision NOT NULL, PRIMARY KEY ("task_metric_id", "period", "bucket_start"), CONSTRAINT "task_metric_rollups_task_metric_id_fkey" FOREIGN KEY ("task_metric_id") REFERENCES "task_metrics" ("id") ON UPDATE NO ACTION ON DELETE NO ACTION);
+-- Backfill the rollups of the existing event metrics
+INSERT INTO "task_metric_rollups" ("task_metric_id", "period", "bucket_start", "count", "sum", "sum_of_squares", "min", "max")
+SELECT "task_metric_id", "period"::"taskmetricrollupperiod", date_trunc("period", "effective_datetime"), count(*), sum("value"), sum("value" * "value"), min("value"), max("value")
+FROM "task_event_metrics" CROSS JOIN (VALUES ('day'), ('week')) AS "periods" ("period")
+GROUP BY "task_metric_id", "period", date_trunc("period", "effective_datetime");